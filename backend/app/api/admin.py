@@ -0,0 +1,72 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..core.security import Principal, get_current_principal
+from ..services.memory import memory_reporter
+
+router = APIRouter()
+
+def _require_admin(current_user: Principal) -> None:
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=403,
+            detail="Only admin users can inspect process memory"
+        )
+
+@router.get("/memory")
+async def memory_report(
+    *,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Approximate bytes held by the FAISS index and its id mappings, the ALS
+    factors and interaction matrix, the catalog snapshot, the embedding
+    model and every in-process cache, for this worker. Admin only.
+    
+    Sizes marked `mapped` are memory-mapped artifact files shared by all
+    workers through the page cache.
+    """
+    _require_admin(current_user)
+    return memory_reporter.report()
+
+@router.post("/memory/tracemalloc/start")
+async def start_tracemalloc(
+    *,
+    frames: int = Query(1, ge=1, le=25),
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """Start tracing Python allocations in this worker. Admin only."""
+    _require_admin(current_user)
+    memory_reporter.start_tracing(frames)
+    return {"tracing": True}
+
+@router.post("/memory/tracemalloc/stop")
+async def stop_tracemalloc(
+    *,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """Stop tracing and free the trace data. Admin only."""
+    _require_admin(current_user)
+    memory_reporter.stop_tracing()
+    return {"tracing": False}
+
+@router.get("/memory/tracemalloc")
+async def top_allocations(
+    *,
+    top: int = Query(20, ge=1, le=200),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Largest allocation sites since tracing started. Admin only.
+    
+    Returns 409 unless tracing was started with
+    POST /memory/tracemalloc/start.
+    """
+    _require_admin(current_user)
+    if not memory_reporter.tracing:
+        raise HTTPException(
+            status_code=409,
+            detail="tracemalloc is not tracing; start it first"
+        )
+    return memory_reporter.top_allocations(top, group_by)
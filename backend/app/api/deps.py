@@ -1,21 +1,18 @@
 """Dependencies for FastAPI routes."""
-from typing import Generator
+from typing import AsyncIterator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .db.session import SessionLocal
-from .core.config import settings
-from .core.security import get_current_user, get_current_active_user
+from ..db.session import AsyncSessionLocal
+from ..core.config import settings
+from ..core.security import get_current_user, get_current_active_user, get_current_principal
 
-def get_db() -> Generator[Session, None, None]:
-    """Get database session."""
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/token"
-)
\ No newline at end of file
+)
@@ -0,0 +1,26 @@
+from typing import Any
+from fastapi import APIRouter, Response
+
+from ..services.warmup import warmup_service
+
+router = APIRouter()
+
+@router.get("/live")
+async def liveness() -> Any:
+    """
+    The process is up and serving requests.
+    """
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness(response: Response) -> Any:
+    """
+    Whether every configured warmup component is loaded, with per-component status.
+    
+    Returns 503 until warmup has finished successfully. Degraded components
+    (loaded, but with nothing to serve yet) count as ready and set "degraded".
+    """
+    report = warmup_service.report()
+    if not report["ready"]:
+        response.status_code = 503
+    return report
@@ -1,70 +1,175 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.security import get_current_active_user
-from ..db.session import get_db
-from ..db.models import User, Item, Interaction, InteractionType
-from ..schemas.interaction import InteractionCreate, Interaction as InteractionSchema
+from .. import crud
+from ..core.concurrency import stage_executor
+from ..core.config import settings
+from ..core.pagination import decode_cursor, encode_cursor, ndjson_response
+from ..core.security import Principal, get_current_principal
+from ..db.session import AsyncSessionLocal, get_async_db
+from ..db.models import Item
+from ..schemas.interaction import (
+    InteractionCreate,
+    Interaction as InteractionSchema,
+    InteractionBatchCreate,
+    InteractionBatchResult,
+    InteractionEventStatus
+)
+from ..services.interaction_buffer import BufferFull, interaction_buffer
+from ..services.interaction_export import interaction_exporter
 from ..services.recommender import recommender
+from ..services.response_cache import response_cache
+from ..services.user_profiles import user_profile_service
 
 router = APIRouter()
 
+async def _enqueue(rows: List[dict]) -> None:
+    """Hand rows to the write-behind buffer, surfacing backpressure as 503"""
+    try:
+        await interaction_buffer.put_many(rows)
+    except BufferFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Interaction buffer is full, retry later",
+            headers={"Retry-After": "1"}
+        )
+
 @router.post("/", response_model=InteractionSchema)
-def create_interaction(
+async def create_interaction(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     interaction_in: InteractionCreate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Record a user interaction (view/like/complete) with an item.
+    
+    In write-behind mode the event is queued and 202 Accepted is returned;
+    it is written with the next bulk flush.
     """
     # Verify item exists
-    item = db.query(Item).filter(Item.id == interaction_in.item_id).first()
-    if not item:
+    item_id = await db.scalar(select(Item.id).where(Item.id == interaction_in.item_id))
+    if item_id is None:
         raise HTTPException(status_code=404, detail="Item not found")
         
+    if settings.INTERACTION_WRITE_BEHIND:
+        await _enqueue([{
+            "user_id": current_user.id,
+            "item_id": interaction_in.item_id,
+            "interaction_type": interaction_in.interaction_type,
+            "created_at": datetime.utcnow()
+        }])
+        return JSONResponse(status_code=202, content={"status": "accepted"})
+        
     # Create interaction
-    interaction = Interaction(
-        user_id=current_user.id,
-        item_id=interaction_in.item_id,
-        interaction_type=interaction_in.interaction_type
+    interaction = await crud.interaction.create(
+        db, user_id=current_user.id, obj_in=interaction_in
     )
     
-    db.add(interaction)
-    db.commit()
-    db.refresh(interaction)
+    # Cached recommendations and profile for this user no longer reflect their history
+    await response_cache.invalidate_user(current_user.id)
+    user_profile_service.invalidate([current_user.id])
     
     # Background task to update recommender models could be added here
     return interaction
 
+@router.post("/batch", response_model=InteractionBatchResult)
+async def create_interactions_batch(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    batch_in: InteractionBatchCreate,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Record a batch of interactions in one transaction.
+    
+    Events referencing unknown items are rejected individually; the rest are
+    stored. `results` reports the status of each event by its index.
+    """
+    existing = await crud.item.get_existing_ids(db, (e.item_id for e in batch_in.events))
+    
+    now = datetime.utcnow()
+    rows, results = [], []
+    for index, event in enumerate(batch_in.events):
+        if event.item_id not in existing:
+            results.append(InteractionEventStatus(index=index, status="rejected", error="Item not found"))
+            continue
+        rows.append({
+            "user_id": current_user.id,
+            "item_id": event.item_id,
+            "interaction_type": event.interaction_type,
+            "created_at": now
+        })
+        results.append(InteractionEventStatus(index=index, status="accepted"))
+        
+    if settings.INTERACTION_WRITE_BEHIND:
+        await _enqueue(rows)
+        accepted = len(rows)
+    else:
+        accepted = await crud.interaction.create_many(db, rows)
+        if accepted:
+            await response_cache.invalidate_user(current_user.id)
+            user_profile_service.invalidate([current_user.id])
+    
+    return InteractionBatchResult(
+        accepted=accepted,
+        rejected=len(results) - accepted,
+        results=results
+    )
+
 @router.get("/me", response_model=List[InteractionSchema])
-def list_my_interactions(
+async def list_my_interactions(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
-    List all interactions for the current user.
+    List the current user's interactions, newest first.
+    
+    Pages are keyed on (created_at, id); pass the `X-Next-Cursor` response
+    header back as `cursor` to continue. With `format=ndjson` the rest of the
+    history is streamed from a server-side cursor.
     """
-    interactions = (
-        db.query(Interaction)
-        .filter(Interaction.user_id == current_user.id)
-        .order_by(Interaction.created_at.desc())
-        .all()
+    before = decode_cursor(cursor)
+    if format == "ndjson":
+        async def rows():
+            async with AsyncSessionLocal() as stream_db:
+                async for row in crud.interaction.stream_by_user(
+                    stream_db, current_user.id, before=before
+                ):
+                    yield row
+        return ndjson_response(rows())
+        
+    interactions = await crud.interaction.get_multi_by_user(
+        db, current_user.id, before=before, limit=limit
     )
+    if len(interactions) == limit:
+        last = interactions[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["created_at"], last["id"])
     return interactions
 
 @router.post("/retrain")
-def retrain_recommender(
+async def retrain_recommender(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    source: str = Query("db", pattern="^(db|export)$"),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Retrain the collaborative filtering model with latest interactions.
     Admin only.
+    
+    With `source=export` training reads the Arrow interaction export
+    (incrementally updated first) instead of loading every row from the
+    database.
     """
     if current_user.role != "admin":
         raise HTTPException(
@@ -72,10 +177,13 @@ def retrain_recommender(
             detail="Only admin users can trigger retraining"
         )
         
-    # Get all interactions
-    interactions = db.query(Interaction).all()
-    
-    # Retrain collaborative model
-    recommender.fit_collaborative(interactions)
+    if source == "export":
+        # Catch the export up, then train from the memory-mapped files
+        await interaction_exporter.export(db)
+        columns = await stage_executor.run(interaction_exporter.load_columns)
+        await stage_executor.run(recommender.fit_collaborative_from_columns, **columns)
+    else:
+        interactions = await crud.interaction.get_all_for_training(db)
+        await stage_executor.run(recommender.fit_collaborative, interactions)
     
-    return {"message": "Recommender model retrained successfully"}
\ No newline at end of file
+    return {"message": "Recommender model retrained successfully"}
@@ -1,96 +1,120 @@
 from typing import List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
-from sqlalchemy.orm import Session
-import pandas as pd
-import json
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+import os
+import tempfile
 
-from ..core.security import get_current_active_user
-from ..db.session import get_db
-from ..db.models import User, Item, ItemType, DifficultyLevel
-from ..schemas.item import ItemCreate, Item as ItemSchema, ItemWithSimilarity
+from .. import crud
+from ..core.concurrency import stage_executor
+from ..core.pagination import decode_cursor, encode_cursor, ndjson_response
+from ..core.responses import prevalidated
+from ..core.security import Principal, get_current_principal
+from ..db.session import AsyncSessionLocal, get_async_db
+from ..db.models import Item, ItemType, DifficultyLevel
+from ..schemas.item import ItemCreate, Item as ItemSchema, ItemUploadJob, ItemWithSimilarity
 from ..services.embeddings import embedding_service
 from ..services.indexer import indexer_service
+from ..services.item_store import item_store
+from ..services.item_upload import REQUIRED_COLUMNS, item_upload_service, read_header, to_schema
 from ..services.recommender import recommender
+from ..services.search import search_service
 
 router = APIRouter()
 
+UPLOAD_COPY_BUFFER = 1024 * 1024
+
 @router.get("/", response_model=List[ItemSchema])
-def list_items(
+async def list_items(
     *,
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
-    Retrieve items with pagination.
+    Retrieve items with keyset pagination on (created_at, id).
+    
+    Pass the `X-Next-Cursor` response header back as `cursor` to fetch the
+    next page. With `format=ndjson` every item after the cursor is streamed.
     """
-    items = db.query(Item).offset(skip).limit(limit).all()
-    return items
+    after = decode_cursor(cursor)
+    if format == "ndjson":
+        async def rows():
+            async with AsyncSessionLocal() as stream_db:
+                async for row in crud.item.stream(stream_db, after=after):
+                    yield row._asdict()
+        return ndjson_response(rows())
+        
+    page = await crud.item.get_page(db, after=after, limit=limit)
+    headers = {}
+    if len(page) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(page[-1].created_at, page[-1].id)
+    return prevalidated(await item_store.get_items(db, [row.id for row in page]), headers)
 
 @router.get("/search", response_model=List[ItemSchema])
-def search_items(
+async def search_items(
     *,
-    db: Session = Depends(get_db),
-    q: str,
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
-    Search items by title or description.
+    Full-text search over title, description and tags, best match first.
+    
+    Every query word must match; words also match as prefixes, so `yog`
+    finds "yoga".
     """
-    items = db.query(Item).filter(
-        (Item.title.ilike(f"%{q}%")) | 
-        (Item.description.ilike(f"%{q}%"))
-    ).all()
-    return items
+    results = await search_service.search(db, q, limit=limit, offset=offset)
+    return prevalidated(await item_store.get_items(db, [item_id for item_id, _ in results]))
+
+@router.get("/semantic-search", response_model=List[ItemWithSimilarity])
+async def semantic_search_items(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Search items by meaning as well as wording.
+    
+    Full-text and embedding (FAISS) results are fused with reciprocal rank
+    fusion; `similarity_score` is the fused score.
+    """
+    async with stage_executor.stage("search"):
+        results = await search_service.hybrid_search(db, q, limit=limit)
+    return prevalidated(await item_store.get_scored_items(db, results))
 
 @router.get("/{item_id}", response_model=ItemSchema)
-def get_item(
+async def get_item(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     item_id: int,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get item by ID.
     """
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
+    item = await item_store.get_item(db, item_id)
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
 
-def process_upload(db: Session, items_data: List[dict]) -> None:
-    """Background task to process uploaded items"""
-    new_items = []
-    for item_data in items_data:
-        item = Item(
-            title=item_data["title"],
-            type=ItemType[item_data["type"].upper()],
-            description=item_data.get("description"),
-            tags=item_data["tags"],
-            duration=item_data["duration"],
-            difficulty=DifficultyLevel[item_data["difficulty"].upper()],
-            media_url=item_data.get("media_url")
-        )
-        db.add(item)
-        new_items.append(item)
-    
-    db.commit()
-    
-    # Compute embeddings and update index
-    indexer_service.add_items(new_items)
-    indexer_service.save_index()
-
-@router.post("/upload")
+@router.post("/upload", response_model=ItemUploadJob, status_code=202)
 async def upload_items(
     *,
-    db: Session = Depends(get_db),
     file: UploadFile = File(...),
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
-    Upload items from CSV file.
+    Upload items from a CSV file.
+    
+    The file is spooled to disk and processed in chunks in the background;
+    poll `/items/upload/{job_id}` for progress.
     """
     if not file.filename.endswith('.csv'):
         raise HTTPException(
@@ -98,35 +122,47 @@ async def upload_items(
             detail="Only CSV files are supported"
         )
         
-    # Read CSV
-    df = pd.read_csv(file.file)
-    required_columns = ["title", "type", "tags", "duration", "difficulty"]
+    # Copy the upload to a file the background job owns
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "wb") as out:
+        while chunk := await file.read(UPLOAD_COPY_BUFFER):
+            out.write(chunk)
     
-    if not all(col in df.columns for col in required_columns):
+    try:
+        columns = read_header(path)
+    except Exception:
+        columns = []
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        os.unlink(path)
         raise HTTPException(
             status_code=400,
-            detail=f"CSV must contain columns: {', '.join(required_columns)}"
+            detail=f"CSV must contain columns: {', '.join(REQUIRED_COLUMNS)}"
         )
         
-    # Convert DataFrame to list of dicts
-    items_data = []
-    for _, row in df.iterrows():
-        item_dict = row.to_dict()
-        # Convert tags string to list if needed
-        if isinstance(item_dict["tags"], str):
-            item_dict["tags"] = json.loads(item_dict["tags"])
-        items_data.append(item_dict)
-        
-    # Process in background
-    background_tasks.add_task(process_upload, db, items_data)
-    
-    return {"message": "Upload processing started", "items_count": len(items_data)}
+    job = await item_upload_service.create_job(file.filename)
+    background_tasks.add_task(item_upload_service.run, job, path)
+    return to_schema(job.row())
+
+@router.get("/upload/{job_id}", response_model=ItemUploadJob)
+async def get_upload_job(
+    *,
+    job_id: str,
+    current_user: Principal = Depends(get_current_principal)
+) -> Any:
+    """
+    Get the progress of a CSV upload.
+    """
+    job = await item_upload_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
 
 @router.post("/rebuild-index")
-def rebuild_index(
+async def rebuild_index(
     *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Rebuild the FAISS index for all items.
@@ -137,7 +173,9 @@ def rebuild_index(
             detail="Only admin users can rebuild the index"
         )
         
-    items = db.query(Item).all()
-    indexer_service.rebuild_index(items)
+    async with stage_executor.stage("rebuild"):
+        items = await crud.item.get_all(db)
+        await stage_executor.run(indexer_service.rebuild_index, items)
+        await item_store.refresh(db)
     
     return {"message": "Index rebuilt successfully", "items_count": len(items)}
\ No newline at end of file
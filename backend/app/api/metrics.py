@@ -0,0 +1,27 @@
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+from ..core.instrumentation import live_gauges
+
+router = APIRouter()
+
+def _registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    # Under gunicorn, aggregate every worker's counters and histograms from
+    # the shared directory; live gauges come from the worker answering
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(live_gauges)
+    return registry
+
+@router.get("", include_in_schema=False)
+def metrics() -> Response:
+    """
+    Prometheus metrics in the text exposition format.
+    """
+    return Response(generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -1,125 +1,150 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Tuple
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.concurrency import stage_executor
 from app.core.config import settings
-from app.core.security import get_current_active_user
-from app.db.session import get_db
-from app.db.models import User, Item, Interaction
+from app.core.instrumentation import span
+from app.core.responses import RawJSONResponse, dumps
+from app.core.security import Principal, get_current_principal
+from app.db.session import get_async_db
 from app.schemas.item import ItemWithSimilarity
+from app.services.hybrid import hybrid_recommender
 from app.services.recommender import recommender
 from app.services.indexer import indexer_service
+from app.services.item_store import item_store
+from app.services.response_cache import response_cache
+from app.services.user_profiles import user_profile_service
 
 router = APIRouter()
 
+def _artifact_versions() -> tuple:
+    """Versions of the artifacts a response is computed from.
+
+    Artifacts published by another worker are picked up first (both checks
+    are throttled), so a cache hit never serves a key older than this
+    worker could be serving.
+    """
+    indexer_service.maybe_reload()
+    recommender.refresh_als()
+    return (indexer_service.version, recommender.model_version)
+
 @router.get("/content/{item_id}", response_model=List[ItemWithSimilarity])
-def get_content_based_recommendations(
+async def get_content_based_recommendations(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     item_id: int,
     topn: int = settings.DEFAULT_TOP_K,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get content-based recommendations similar to the given item.
     """
-    item = db.query(Item).filter(Item.id == item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-        
-    similar_items = indexer_service.find_similar(item_id, k=topn)
-    
-    # Fetch full items with similarity scores
-    recommendations = []
-    for similar_id, similarity in similar_items:
-        similar_item = db.query(Item).filter(Item.id == similar_id).first()
-        if similar_item:
-            item_dict = ItemWithSimilarity.from_orm(similar_item).dict()
-            item_dict["similarity_score"] = similarity
-            recommendations.append(item_dict)
+    async def compute() -> List[dict]:
+        async with stage_executor.stage("content"):
+            if await item_store.get_item(db, item_id) is None:
+                raise HTTPException(status_code=404, detail="Item not found")
+                
+            similar_items = await stage_executor.run(
+                indexer_service.find_similar, item_id, k=topn
+            )
             
-    return recommendations
+            # Fetch full items with similarity scores in one query
+            with span("hydrate_items"):
+                return await item_store.get_scored_items(db, similar_items)
+
+    # Content similarity does not depend on the caller, so share across users
+    key = await response_cache.make_key(
+        "content", None, {"item_id": item_id, "topn": topn}, _artifact_versions()
+    )
+    return RawJSONResponse(await response_cache.get_or_compute_json(key, compute))
 
 @router.get("/collaborative/{user_id}", response_model=List[ItemWithSimilarity])
-def get_collaborative_recommendations(
+async def get_collaborative_recommendations(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
     topn: int = settings.DEFAULT_TOP_K,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get collaborative filtering recommendations for a user.
     """
-    # Get user's viewed items
-    viewed_items = set(
-        inter.item_id 
-        for inter in db.query(Interaction)
-        .filter(Interaction.user_id == user_id)
-        .all()
-    )
-    
-    # Get recommendations
-    recommended_items = recommender.get_user_recommendations(
-        user_id,
-        n_items=topn,
-        viewed_items=list(viewed_items)
-    )
-    
-    # Fetch full items with scores
-    recommendations = []
-    for item_id, score in recommended_items:
-        item = db.query(Item).filter(Item.id == item_id).first()
-        if item:
-            item_dict = ItemWithSimilarity.from_orm(item).dict()
-            item_dict["similarity_score"] = score
-            recommendations.append(item_dict)
+    async def compute() -> List[dict]:
+        async with stage_executor.stage("collaborative"):
+            # Get user's viewed items
+            with span("user_profile"):
+                viewed_items = await user_profile_service.get_seen_item_ids(db, user_id)
+            
+            # Get recommendations
+            recommended_items = await stage_executor.run(
+                recommender.get_user_recommendations,
+                user_id,
+                n_items=topn,
+                viewed_items=list(viewed_items)
+            )
             
-    return recommendations
+            # Fetch full items with scores in one query
+            with span("hydrate_items"):
+                return await item_store.get_scored_items(db, recommended_items)
+
+    key = await response_cache.make_key(
+        "collaborative", user_id, {"topn": topn}, _artifact_versions()
+    )
+    return RawJSONResponse(await response_cache.get_or_compute_json(key, compute))
 
 @router.get("/hybrid/{user_id}", response_model=List[ItemWithSimilarity])
-def get_hybrid_recommendations(
+async def get_hybrid_recommendations(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user_id: int,
     item_id: Optional[int] = None,
     topn: int = settings.DEFAULT_TOP_K,
     alpha: float = settings.HYBRID_ALPHA,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal)
 ) -> Any:
     """
     Get hybrid recommendations combining collaborative and content-based filtering.
+    
+    Scoring runs under a latency budget; sources that miss it are dropped and
+    the X-Recommendation-Sources header lists the ones that contributed.
     """
-    # Validate item if provided
-    if item_id:
-        item = db.query(Item).filter(Item.id == item_id).first()
-        if not item:
-            raise HTTPException(status_code=404, detail="Item not found")
+    async def compute() -> Tuple[bytes, bool]:
+        # Queueing for the stage counts against the budget too
+        deadline = asyncio.get_running_loop().time() + settings.HYBRID_BUDGET_MS / 1000
+        async with stage_executor.stage("hybrid"):
+            # Validate item if provided
+            if item_id:
+                if await item_store.get_item(db, item_id) is None:
+                    raise HTTPException(status_code=404, detail="Item not found")
+                    
+            # Get user's viewed items
+            with span("user_profile"):
+                viewed_items = await user_profile_service.get_seen_item_ids(db, user_id)
             
-    # Get user's viewed items
-    viewed_items = set(
-        inter.item_id 
-        for inter in db.query(Interaction)
-        .filter(Interaction.user_id == user_id)
-        .all()
-    )
-    
-    # Get hybrid recommendations
-    recommended_items = recommender.get_hybrid_recommendations(
+            result = await hybrid_recommender.recommend(
+                user_id,
+                deadline,
+                item_id=item_id,
+                n_items=topn,
+                alpha=alpha,
+                viewed_items=list(viewed_items)
+            )
+            
+            # Fetch full items with scores in one query
+            with span("hydrate_items"):
+                items = await item_store.get_scored_items(db, result.items)
+            # Sources ride along on the first line so cached bodies keep them;
+            # degraded results are served but not cached
+            return ",".join(result.sources).encode() + b"\n" + dumps(items), not result.degraded
+
+    key = await response_cache.make_key(
+        "hybrid-budgeted",
         user_id,
-        item_id=item_id,
-        n_items=topn,
-        alpha=alpha,
-        viewed_items=list(viewed_items)
+        {"item_id": item_id, "topn": topn, "alpha": alpha},
+        _artifact_versions()
     )
-    
-    # Fetch full items with scores
-    recommendations = []
-    for item_id, score in recommended_items:
-        item = db.query(Item).filter(Item.id == item_id).first()
-        if item:
-            item_dict = ItemWithSimilarity.from_orm(item).dict()
-            item_dict["similarity_score"] = score
-            recommendations.append(item_dict)
-            
-    return recommendations
\ No newline at end of file
+    sources, _, body = (await response_cache.get_or_compute_body(key, compute)).partition(b"\n")
+    return RawJSONResponse(body, headers={"X-Recommendation-Sources": sources.decode()})
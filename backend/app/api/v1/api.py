@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from app.api.admin import router as admin_router
 from app.api.auth import router as auth_router
 from app.api.items import router as items_router
 from app.api.recommend import router as recommend_router
@@ -10,4 +11,5 @@ api_router = APIRouter()
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
 api_router.include_router(items_router, prefix="/items", tags=["items"])
 api_router.include_router(recommend_router, prefix="/recommend", tags=["recommendations"])
-api_router.include_router(interactions_router, prefix="/interactions", tags=["interactions"])
\ No newline at end of file
+api_router.include_router(interactions_router, prefix="/interactions", tags=["interactions"])
+api_router.include_router(admin_router, prefix="/admin", tags=["admin"])
\ No newline at end of file
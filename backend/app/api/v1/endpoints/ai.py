@@ -1,21 +1,70 @@
-from typing import List, Optional
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.api.deps import get_current_user, get_db
-from app.services.ai_recommendation import AIRecommendationService
-from app.services.fitness_coach import FitnessCoachService
-from app.models.user import User
-from app.models.item import Item
-from app.models.interaction import Interaction
-from app.crud.interaction import interaction as interaction_crud
+from app.db.models import User
 from app.crud.item import item as item_crud
+from app.services.item_store import item_store
+from app.services.user_profiles import user_profile_service
 from app.schemas.ai import ContextualRecommendationResponse, ExplanationResponse
 from app.schemas.chat import ChatRequest, ChatResponse
 
+if TYPE_CHECKING:
+    from app.services.ai_recommendation import AIRecommendationService
+    from app.services.fitness_coach import FitnessCoachService
+
 router = APIRouter()
-ai_service = AIRecommendationService(settings.OPENAI_API_KEY)
-fitness_coach = FitnessCoachService(settings.OPENAI_API_KEY)
+
+# The langchain/OpenAI clients are slow to import and build, so they are
+# created on first use (or by the "ai" warmup component), not at import
+@lru_cache(maxsize=None)
+def get_ai_service() -> "AIRecommendationService":
+    from app.services.ai_recommendation import AIRecommendationService
+    
+    return AIRecommendationService(settings.OPENAI_API_KEY)
+
+@lru_cache(maxsize=None)
+def get_fitness_coach() -> "FitnessCoachService":
+    from app.services.fitness_coach import FitnessCoachService
+    
+    return FitnessCoachService(settings.OPENAI_API_KEY)
+
+async def _activity_context(
+    db: AsyncSession,
+    user_id: int,
+    days: int = 30
+) -> Tuple[List[dict], List[dict], List[dict]]:
+    """Recent activities, liked items and completed items from the user's profile row"""
+    profile = await user_profile_service.get(db, user_id)
+    since = datetime.utcnow() - timedelta(days=days)
+    recent = [
+        r for r in profile["recent"]
+        if datetime.fromisoformat(r["created_at"]) >= since
+    ]
+    items = {
+        item["id"]: {"id": item["id"], "title": item["title"], "type": item["type"]}
+        for item in await item_store.get_items(
+            db,
+            [r["item_id"] for r in recent]
+            + profile["liked_item_ids"]
+            + profile["completed_item_ids"]
+        )
+    }
+    recent_activities = [
+        {
+            "interaction_type": r["interaction_type"],
+            "item": items[r["item_id"]],
+            "created_at": r["created_at"],
+        }
+        for r in recent
+        if r["item_id"] in items
+    ]
+    liked_items = [items[i] for i in profile["liked_item_ids"] if i in items]
+    completed_items = [items[i] for i in profile["completed_item_ids"] if i in items]
+    return recent_activities, liked_items, completed_items
 
 @router.get("/recommendations/contextual", response_model=ContextualRecommendationResponse)
 async def get_contextual_recommendations(
@@ -27,55 +76,20 @@ async def get_contextual_recommendations(
     Get AI-powered contextual recommendations based on user history and preferences.
     """
     try:
-        # Get user's recent activity (last 30 days)
-        recent_interactions = await interaction_crud.get_user_recent_interactions(
-            db, user.id, days=30
-        )
-
-        # Get liked and completed items
-        liked_items = await interaction_crud.get_user_interactions_by_type(
-            db, user.id, "like"
-        )
-        completed_items = await interaction_crud.get_user_interactions_by_type(
-            db, user.id, "complete"
-        )
+        # Recent activity (last 30 days) plus liked and completed items
+        recent_activities, liked_items, completed_items = await _activity_context(db, user.id)
 
         # Get available items (excluding those the user has interacted with)
-        user_item_ids = {i.item_id for i in recent_interactions}
+        user_item_ids = {a["item"]["id"] for a in recent_activities}
         available_items = await item_crud.get_multi(
             db, skip_ids=list(user_item_ids)
         )
 
         # Get AI recommendations
-        recommendations = await ai_service.get_contextual_recommendations(
-            recent_activities=[
-                {
-                    "interaction_type": i.interaction_type,
-                    "item": {
-                        "id": i.item.id,
-                        "title": i.item.title,
-                        "type": i.item.type,
-                    },
-                    "created_at": i.created_at.isoformat(),
-                }
-                for i in recent_interactions
-            ],
-            liked_items=[
-                {
-                    "id": i.item.id,
-                    "title": i.item.title,
-                    "type": i.item.type,
-                }
-                for i in liked_items
-            ],
-            completed_items=[
-                {
-                    "id": i.item.id,
-                    "title": i.item.title,
-                    "type": i.item.type,
-                }
-                for i in completed_items
-            ],
+        recommendations = await get_ai_service().get_contextual_recommendations(
+            recent_activities=recent_activities,
+            liked_items=liked_items,
+            completed_items=completed_items,
             goals=user.preferences.get("goals", []),
             fitness_level=user.preferences.get("fitness_level", "beginner"),
             available_items=[
@@ -123,12 +137,10 @@ async def explain_recommendation(
             raise HTTPException(status_code=404, detail="Item not found")
 
         # Get user's recent activity
-        recent_interactions = await interaction_crud.get_user_recent_interactions(
-            db, user.id, days=30
-        )
+        recent_activities, _, _ = await _activity_context(db, user.id)
 
         # Generate explanation
-        explanation = await ai_service.explain_recommendation(
+        explanation = await get_ai_service().explain_recommendation(
             item={
                 "id": item.id,
                 "title": item.title,
@@ -137,18 +149,7 @@ async def explain_recommendation(
                 "difficulty": item.difficulty,
                 "tags": item.tags,
             },
-            recent_activities=[
-                {
-                    "interaction_type": i.interaction_type,
-                    "item": {
-                        "id": i.item.id,
-                        "title": i.item.title,
-                        "type": i.item.type,
-                    },
-                    "created_at": i.created_at.isoformat(),
-                }
-                for i in recent_interactions
-            ],
+            recent_activities=recent_activities,
             goals=user.preferences.get("goals", []),
             fitness_level=user.preferences.get("fitness_level", "beginner")
         )
@@ -170,7 +171,7 @@ async def chat_with_fitness_coach(
     Chat with the AI fitness coach.
     """
     try:
-        response = await fitness_coach.get_response(
+        response = await get_fitness_coach().get_response(
             request.message,
             request.context
         )
@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+class SharedArtifactStore:
+    """Versioned numpy artifacts shared by every worker process through memory-mapped files.
+
+    `publish` writes each array of a new version to `<root>/<name>/<version>/`
+    as an .npy file, then atomically repoints `<root>/<name>/CURRENT`.
+    `load` maps the arrays read-only, so all workers on a host read the
+    same page-cache pages instead of each holding a private copy, and a
+    worker picks up another worker's publish by polling `current_version`.
+    Superseded versions are deleted; processes still mapping them keep
+    their pages until they re-attach.
+    """
+
+    def __init__(self, root: str, keep_versions: int = 2, check_interval_seconds: float = 5.0):
+        self.root = Path(root)
+        self.keep_versions = keep_versions
+        self.check_interval_seconds = check_interval_seconds
+        self._checked: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def _pointer(self, name: str) -> Path:
+        return self.root / name / "CURRENT"
+
+    def publish(self, name: str, arrays: Dict[str, np.ndarray], meta: Optional[dict] = None) -> str:
+        """Write a new version of the named artifact and make it current; returns the version"""
+        version = f"{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        directory = self.root / name / version
+        directory.mkdir(parents=True)
+        for key, array in arrays.items():
+            np.save(directory / f"{key}.npy", np.ascontiguousarray(array))
+        (directory / "meta.json").write_text(json.dumps(meta or {}))
+
+        pointer = self._pointer(name)
+        tmp = pointer.with_suffix(".tmp")
+        tmp.write_text(version)
+        os.replace(tmp, pointer)
+        with self._lock:
+            self._checked[name] = (time.monotonic(), version)
+        self._prune(name, version)
+        logger.info(f"Published {name} artifact version {version}")
+        return version
+
+    def current_version(self, name: str, force: bool = False) -> Optional[str]:
+        """The published version, re-read from disk at most every check_interval_seconds"""
+        now = time.monotonic()
+        checked_at, version = self._checked.get(name, (None, None))
+        if not force and checked_at is not None and now - checked_at < self.check_interval_seconds:
+            return version
+        try:
+            version = self._pointer(name).read_text().strip() or None
+        except FileNotFoundError:
+            version = None
+        with self._lock:
+            self._checked[name] = (now, version)
+        return version
+
+    def load(self, name: str, version: str) -> Tuple[Dict[str, np.ndarray], dict]:
+        """Memory-map every array of a version read-only; returns (arrays, meta).
+
+        Raises FileNotFoundError if the version was pruned, possibly after
+        its CURRENT pointer was read; the whole version disappears at once,
+        so a load never returns part of it.
+        """
+        directory = self.root / name / version
+        arrays = {
+            path.stem: np.load(path, mmap_mode="r")
+            for path in directory.glob("*.npy")
+        }
+        meta = json.loads((directory / "meta.json").read_text())
+        return arrays, meta
+
+    def _prune(self, name: str, current: str) -> None:
+        versions = sorted(
+            (path for path in (self.root / name).iterdir() if path.is_dir() and path.suffix != ".pruned"),
+            key=lambda path: path.stat().st_mtime
+        )
+        for path in versions[:-self.keep_versions]:
+            if path.name != current:
+                # Renamed first so a concurrent load sees all of the version or none
+                pruned = path.with_suffix(".pruned")
+                try:
+                    os.replace(path, pruned)
+                except FileNotFoundError:
+                    continue  # Pruned by another worker's publish
+                shutil.rmtree(pruned, ignore_errors=True)
+
+# Global instance
+artifact_store = SharedArtifactStore(
+    settings.ARTIFACT_DIR,
+    keep_versions=settings.ARTIFACT_KEEP_VERSIONS,
+    check_interval_seconds=settings.ARTIFACT_RELOAD_INTERVAL_SECONDS
+)
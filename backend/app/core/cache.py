@@ -0,0 +1,152 @@
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from itertools import islice
+import threading
+import time
+import weakref
+
+from .instrumentation import live_gauges
+
+# Every live TTLCache, for metrics and memory accounting
+_caches: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+def registered_caches() -> List["TTLCache"]:
+    return list(_caches)
+
+class TTLCache:
+    """Thread-safe bounded LRU cache with per-entry TTL and version invalidation.
+
+    Every entry is stamped with the cache version at write time. Bumping the
+    version invalidates all entries in O(1); stale entries are dropped lazily
+    on read or evicted by the LRU bound.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl_seconds: float = 300.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _lookup(self, key: Hashable, now: float) -> Tuple[bool, Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        expires_at, version, value = entry
+        if version != self.version or expires_at < now:
+            del self._data[key]
+            return False, None
+        self._data.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any, expires_at: float) -> None:
+        self._data[key] = (expires_at, self.version, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or stale"""
+        with self._lock:
+            found, value = self._lookup(key, time.monotonic())
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return a dict of the keys that are cached and fresh"""
+        result = {}
+        with self._lock:
+            now = time.monotonic()
+            for key in keys:
+                found, value = self._lookup(key, now)
+                if found:
+                    result[key] = value
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return result
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._store(key, value, time.monotonic() + ttl)
+
+    def set_many(self, mapping: Dict[Hashable, Any]) -> None:
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl_seconds
+            for key, value in mapping.items():
+                self._store(key, value, expires_at)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def bump_version(self) -> int:
+        """Invalidate every entry currently in the cache"""
+        with self._lock:
+            self.version += 1
+            return self.version
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def sample(self, n: int) -> List[Tuple[Hashable, Any]]:
+        """Up to n (key, value) pairs, most recently used first; for size estimates"""
+        with self._lock:
+            return [
+                (key, entry[2])
+                for key, entry in islice(reversed(self._data.items()), n)
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+def _hit_ratios() -> Dict[Tuple[str], float]:
+    counts: Dict[str, List[int]] = {}
+    for cache in registered_caches():
+        hits_misses = counts.setdefault(cache.name, [0, 0])
+        hits_misses[0] += cache.hits
+        hits_misses[1] += cache.misses
+    return {
+        (name,): hits / (hits + misses) if hits + misses else 0.0
+        for name, (hits, misses) in counts.items()
+    }
+
+def _entries() -> Dict[Tuple[str], int]:
+    entries: Dict[Tuple[str], int] = {}
+    for cache in registered_caches():
+        entries[(cache.name,)] = entries.get((cache.name,), 0) + len(cache)
+    return entries
+
+live_gauges.register(
+    "fitrecs_cache_hit_ratio",
+    "Lifetime hit ratio of each in-process cache",
+    _hit_ratios,
+    ["cache"]
+)
+live_gauges.register(
+    "fitrecs_cache_entries",
+    "Entries held by each in-process cache",
+    _entries,
+    ["cache"]
+)
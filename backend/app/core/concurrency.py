@@ -0,0 +1,208 @@
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import contextvars
+import fcntl
+import functools
+import logging
+
+from .config import settings
+from .metrics import (
+    CPU_EXECUTOR_PENDING,
+    SINGLEFLIGHT_CALLS,
+    SINGLEFLIGHT_IN_FLIGHT,
+    STAGE_IN_FLIGHT,
+    STAGE_QUEUE_DEPTH
+)
+from .instrumentation import span
+from .profiling import call_traced
+
+logger = logging.getLogger(__name__)
+
+def create_detached_task(coro: Awaitable[Any]) -> asyncio.Task:
+    """Start a background task in a fresh context instead of the caller's.
+
+    A task copies the context it is created in, so a long-lived task started
+    while serving a request would otherwise keep that request's span list
+    and profiler for its whole life.
+    """
+    loop = asyncio.get_running_loop()
+    return contextvars.Context().run(loop.create_task, coro)
+
+class StageExecutor:
+    """Bounded executor for CPU-bound scoring with per-stage concurrency limits.
+
+    FAISS searches and ALS scoring run on a dedicated, sized thread pool
+    instead of Starlette's shared pool, and each request stage (content,
+    collaborative, hybrid, ...) admits at most a fixed number of concurrent
+    requests. Requests over the limit wait on the event loop without holding
+    a thread, so a burst on one stage cannot starve cheap endpoints.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        stage_limits: Dict[str, int],
+        default_limit: int = 8
+    ):
+        self.max_workers = max_workers
+        self.stage_limits = stage_limits
+        self.default_limit = default_limit
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="cpu-stage"
+            )
+        return self._executor
+
+    def _semaphore(self, stage: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(stage)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.stage_limits.get(stage, self.default_limit))
+            self._semaphores[stage] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def stage(self, name: str) -> AsyncIterator[None]:
+        """Hold one of the stage's concurrency slots for the duration of the block"""
+        semaphore = self._semaphore(name)
+        queued = STAGE_QUEUE_DEPTH.labels(stage=name)
+        queued.inc()
+        try:
+            with span("stage_wait"):
+                await semaphore.acquire()
+        finally:
+            queued.dec()
+
+        in_flight = STAGE_IN_FLIGHT.labels(stage=name)
+        in_flight.inc()
+        try:
+            yield
+        finally:
+            in_flight.dec()
+            semaphore.release()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Submit a CPU-bound callable to the scoring executor.
+        
+        The caller's context is carried over, so spans and the request
+        profiler see work done on the executor thread. The returned future
+        finishes when the thread does, even if its awaiter was cancelled.
+        """
+        context = contextvars.copy_context()
+        CPU_EXECUTOR_PENDING.inc()
+        future = self.executor.submit(context.run, call_traced, functools.partial(fn, *args, **kwargs))
+        future.add_done_callback(lambda _: CPU_EXECUTOR_PENDING.dec())
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a CPU-bound callable on the scoring executor and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one computation.
+
+    The first caller for a key (the leader) runs the computation; callers
+    arriving while it is in flight (followers) wait for it and receive the
+    same result or exception. Nothing is kept once the call finishes, so
+    this only deduplicates concurrent work; caching is a separate layer.
+    If the leader is cancelled, its followers retry and one becomes leader.
+    The follower share of `fitrecs_singleflight_calls` is the coalesced ratio.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._leaders = SINGLEFLIGHT_CALLS.labels(flight=name, role="leader")
+        self._followers = SINGLEFLIGHT_CALLS.labels(flight=name, role="follower")
+        self._gauge = SINGLEFLIGHT_IN_FLIGHT.labels(flight=name)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future = self._in_flight.get(key)
+            if future is None:
+                break
+            self._followers.inc()
+            try:
+                # Shielded so a cancelled follower does not cancel the shared call
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, not this caller: try again
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self._leaders.inc()
+        self._gauge.inc()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a call without followers does not log it as lost
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+            self._gauge.dec()
+
+class ProcessLock:
+    """Exclusive flock on a file, held by at most one process on the host.
+
+    Used for work that every worker is able to run but only one may run at
+    a time. The kernel releases the lock when its holder exits, crashes
+    included, so a replacement worker can take over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def try_acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        f = open(self.path, "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    async def acquire(self, poll_seconds: float = 0.05) -> None:
+        """Wait for the lock without blocking the event loop"""
+        while not self.try_acquire():
+            await asyncio.sleep(poll_seconds)
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+# Global instance
+stage_executor = StageExecutor(
+    max_workers=settings.CPU_EXECUTOR_WORKERS,
+    stage_limits=settings.STAGE_CONCURRENCY_LIMITS
+)
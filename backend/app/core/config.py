@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 from functools import lru_cache
 import os
 from dotenv import load_dotenv
@@ -22,6 +22,12 @@ class Settings(BaseSettings):
         "DATABASE_URL", 
         "sqlite:///./dev.db"
     )
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_TIMEOUT_SECONDS: int = 30
+    DB_STATEMENT_CACHE_SIZE: int = 500  # asyncpg prepared statements per connection
     
     # Redis
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL", "redis://localhost:6379")
@@ -30,6 +36,11 @@ class Settings(BaseSettings):
     MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
     FAISS_INDEX_PATH: str = "../data/faiss.index"
     ITEM_MAPPING_PATH: str = "../data/item_mapping.json"
+    FAISS_MMAP: bool = True  # Memory-map the saved index so worker processes share its pages
+    ARTIFACT_DIR: str = "../data/artifacts"  # Versioned memory-mapped model artifacts (ALS factors)
+    ARTIFACT_KEEP_VERSIONS: int = 2
+    ARTIFACT_RELOAD_INTERVAL_SECONDS: float = 5.0  # How often workers look for newer artifacts
+    PRELOAD_COMPONENTS: str = "embedding_model,faiss_index,collaborative"  # Loaded in the gunicorn master
     
     # OpenAI (Optional)
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
@@ -37,6 +48,90 @@ class Settings(BaseSettings):
     # Recommendation Settings
     DEFAULT_TOP_K: int = 10
     HYBRID_ALPHA: float = 0.5  # Weight for blending (0 = pure CF, 1 = pure content)
+    HYBRID_BUDGET_MS: float = 150  # Deadline for a hybrid request's scoring, queueing included
+    HYBRID_STAGE_BUDGETS_MS: Dict[str, float] = {  # Slice of the budget each scoring stage may use
+        "collaborative": 100,
+        "content": 100,
+    }
+    HYBRID_STAGE_MAX_RUNNING: int = 8  # Scoring calls per hybrid stage on executor threads, abandoned ones included
+    POPULARITY_WINDOW_DAYS: int = 30  # Interactions counted for the popularity fallback
+    POPULARITY_REFRESH_SECONDS: int = 600
+    POPULARITY_MAX_ITEMS: int = 500
+    
+    # Request concurrency
+    CPU_EXECUTOR_WORKERS: int = os.cpu_count() or 4  # Threads for FAISS/ALS scoring
+    STAGE_CONCURRENCY_LIMITS: Dict[str, int] = {
+        "content": 16,
+        "collaborative": 16,
+        "hybrid": 8,
+        "search": 16,
+        "rebuild": 1,
+    }
+    
+    # Item metadata catalog and cache
+    ITEM_CATALOG_ENABLED: bool = True
+    ITEM_CACHE_ENABLED: bool = True
+    ITEM_CACHE_TTL_SECONDS: int = 300
+    ITEM_CACHE_MAX_SIZE: int = 10000
+    
+    # Search
+    SEARCH_RRF_K: int = 60  # Reciprocal rank fusion damping constant
+    SEARCH_CANDIDATES: int = 50  # Results taken from each retriever before fusion
+    QUERY_EMBEDDING_CACHE_SIZE: int = 10000
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    EMBEDDING_BATCH_MAX_SIZE: int = 32  # Queries encoded per forward pass
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0  # Longest a query waits for batch-mates
+    
+    # Response compression (large recommendation and item lists)
+    GZIP_ENABLED: bool = True
+    GZIP_MIN_SIZE: int = 4096  # Smaller bodies are sent uncompressed
+    GZIP_LEVEL: int = 5  # Most of level 9's ratio on JSON at a fraction of the CPU
+    
+    # Startup warmup; components load in parallel after the app starts serving
+    WARMUP_COMPONENTS: str = "catalog,faiss_index,embedding_model,collaborative,popularity"  # Comma-separated
+    WARMUP_BLOCKING: bool = False  # Finish warmup before accepting requests
+    
+    # Observability
+    METRICS_ENABLED: bool = True  # /metrics endpoint and per-route request histograms
+    SPANS_ENABLED: bool = True  # Per-stage latency histograms (DB, FAISS, ALS, encode, LLM, serialization)
+    SERVER_TIMING_ENABLED: bool = True  # Return each request's spans in a Server-Timing header
+    PROFILE_HEADER: str = "X-Debug-Profile"  # Admin requests with this header return a stack profile
+    PROFILE_INTERVAL_MS: float = 1.0  # Stack sampling period; effective rate is bounded by the GIL switch interval
+    
+    # Authentication caches
+    AUTH_CLAIMS_CACHE_SIZE: int = 10000  # Decoded tokens; entries never outlive the token's exp
+    AUTH_CLAIMS_CACHE_TTL_SECONDS: int = 300
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 50000  # user id -> (id, role)
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # Bounds staleness across workers
+    
+    # Per-user profile aggregates
+    USER_PROFILE_CACHE_TTL_SECONDS: int = 60
+    USER_PROFILE_CACHE_MAX_SIZE: int = 50000
+    
+    # Catalog CSV uploads
+    UPLOAD_CHUNK_ROWS: int = 5000  # Rows parsed, validated and inserted per step
+    UPLOAD_JOB_HISTORY: int = 100  # Finished upload jobs kept for status queries
+    
+    # Write-behind interaction ingestion
+    INTERACTION_WRITE_BEHIND: bool = False
+    INTERACTION_BUFFER_MAX_SIZE: int = 10000
+    INTERACTION_BUFFER_PUT_TIMEOUT_MS: float = 100  # Producer wait before 503 when full
+    INTERACTION_FLUSH_INTERVAL_MS: float = 200
+    INTERACTION_FLUSH_BATCH_SIZE: int = 500
+    INTERACTION_BUFFER_LOG_PATH: Optional[str] = None  # Append log for crash recovery
+    
+    # Columnar interaction export (Arrow IPC) for training and analytics
+    INTERACTION_EXPORT_DIR: str = "../data/interactions"
+    INTERACTION_EXPORT_BATCH_ROWS: int = 100000
+    INTERACTION_EXPORT_LAG_SECONDS: int = 60  # Leave rows this fresh for the next run
+    INTERACTION_EXPORT_INTERVAL_SECONDS: int = 0  # Scheduled export period; 0 disables
+    INTERACTION_VIEW_RETENTION_DAYS: int = 90  # Raw VIEW rows older than this are rolled up daily
+    
+    # Recommendation response cache (Redis, with in-process fallback)
+    RECOMMENDATION_CACHE_ENABLED: bool = True
+    RECOMMENDATION_CACHE_TTL_SECONDS: int = 300
+    RECOMMENDATION_CACHE_LOCK_TIMEOUT_MS: int = 2000
+    RECOMMENDATION_CACHE_LOCAL_MAX_SIZE: int = 5000
     
     class Config:
         case_sensitive = True
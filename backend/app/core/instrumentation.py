@@ -0,0 +1,254 @@
+"""Per-stage latency spans, request timing and scrape-time gauges.
+
+`span(name)` and `@timed(name)` record into `fitrecs_span_seconds{span}`
+and, inside a request wrapped by ServerTimingMiddleware, into that
+request's Server-Timing header. With spans disabled (SPANS_ENABLED or
+`set_spans_enabled`) both reduce to a flag check and a shared no-op
+context manager, well under a microsecond.
+
+Values that already live on service objects (index size, artifact
+versions, cache hit ratios) are not pushed on every change; they are
+registered with `live_gauges` and read when /metrics is scraped.
+"""
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import functools
+import inspect
+import os
+import time
+
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+from .config import settings
+from .metrics import REQUEST_SECONDS, SPAN_SECONDS
+
+_spans_enabled = settings.SPANS_ENABLED
+_span_histograms: Dict[str, Any] = {}
+# (span, seconds) recorded during the current request, when one is collecting
+_request_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_timings", default=None)
+
+def set_spans_enabled(enabled: bool) -> None:
+    global _spans_enabled
+    _spans_enabled = enabled
+
+def spans_enabled() -> bool:
+    return _spans_enabled
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+_NOOP = _NoopSpan()
+
+def _record(name: str, seconds: float) -> None:
+    histogram = _span_histograms.get(name)
+    if histogram is None:
+        histogram = _span_histograms[name] = SPAN_SECONDS.labels(span=name)
+    histogram.observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+def record_request_span(name: str, seconds: float) -> None:
+    """Add a span timed elsewhere to the current request's Server-Timing only.
+
+    For work shared by several requests, such as one batched forward pass:
+    the histogram was observed once where the work ran, and each request
+    that waited on it reports the duration here.
+    """
+    if _spans_enabled:
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, seconds))
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        _record(self.name, time.perf_counter() - self.start)
+
+def span(name: str) -> Any:
+    """Context manager timing a block as one observation of the named span"""
+    if not _spans_enabled:
+        return _NOOP
+    return _Span(name)
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of a sync or async function as the named span"""
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not _spans_enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _record(name, time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _spans_enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+def instrument_engine(engine: Any) -> None:
+    """Time every statement executed on a (sync) SQLAlchemy engine as the db_query span"""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if _spans_enabled:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_start")
+        if starts:
+            _record("db_query", time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def failed(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+class LiveGaugeCollector:
+    """Gauges computed at scrape time from callbacks.
+
+    A callback returns a number, or for labelled gauges a dict mapping
+    label-value tuples to numbers. Being a custom collector, these are also
+    reported correctly by the multiprocess /metrics registry.
+    """
+
+    def __init__(self):
+        self._gauges: Dict[str, tuple] = {}
+
+    def register(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Any],
+        labelnames: Sequence[str] = ()
+    ) -> None:
+        self._gauges[name] = (documentation, callback, list(labelnames))
+
+    def collect(self) -> List[GaugeMetricFamily]:
+        families = []
+        for name, (documentation, callback, labelnames) in self._gauges.items():
+            family = GaugeMetricFamily(name, documentation, labels=labelnames or None)
+            value = callback()
+            if labelnames:
+                for labels, sample in value.items():
+                    family.add_metric(list(labels), sample)
+            elif value is not None:
+                family.add_metric([], value)
+            families.append(family)
+        return families
+
+live_gauges = LiveGaugeCollector()
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    REGISTRY.register(live_gauges)
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request latency per route template and status"""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status: List[Optional[int]] = [None]
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the scope; label by its
+            # template so /items/{item_id} is one series, not one per id
+            route = scope.get("route")
+            REQUEST_SECONDS.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status[0] or 500)
+            ).observe(time.perf_counter() - start)
+
+def server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+    """Server-Timing header value: per-span totals (with call counts) slowest first, then the total"""
+    totals: Dict[str, List[float]] = {}
+    for name, seconds in timings:
+        entry = totals.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    parts = []
+    for name, (seconds, calls) in sorted(totals.items(), key=lambda pair: pair[1][0], reverse=True):
+        part = f"{name};dur={seconds * 1000:.2f}"
+        if calls > 1:
+            part += f';desc="{calls} calls"'
+        parts.append(part)
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+class ServerTimingMiddleware:
+    """ASGI middleware returning the request's spans in a Server-Timing header.
+
+    Spans recorded on executor threads are included as long as the work
+    was submitted through StageExecutor.run, which carries the request's
+    context over. Background tasks must not inherit a request's context
+    (see create_detached_task); work they do for a request is reported
+    with record_request_span. Only spans finished before the response
+    starts count.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not _spans_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        timings: List[Tuple[str, float]] = []
+        start = time.perf_counter()
+
+        async def send_wrapper(message: dict) -> None:
+            if message["type"] == "http.response.start":
+                value = server_timing(timings, time.perf_counter() - start)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", value.encode("latin-1"))
+                ]
+            await send(message)
+
+        token = _request_timings.set(timings)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_timings.reset(token)
@@ -0,0 +1,82 @@
+"""Process-wide Prometheus metric definitions."""
+from prometheus_client import Counter, Gauge, Histogram
+
+REQUEST_SECONDS = Histogram(
+    "fitrecs_request_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+SPAN_SECONDS = Histogram(
+    "fitrecs_span_seconds",
+    "Latency of instrumented stages: db_query, faiss_search, als_recommend, embedding_encode, llm_call, serialization",
+    ["span"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0, 30.0)
+)
+
+STAGE_QUEUE_DEPTH = Gauge(
+    "fitrecs_stage_queue_depth",
+    "Requests waiting for a concurrency slot, per stage",
+    ["stage"]
+)
+STAGE_IN_FLIGHT = Gauge(
+    "fitrecs_stage_in_flight",
+    "Requests currently holding a concurrency slot, per stage",
+    ["stage"]
+)
+CPU_EXECUTOR_PENDING = Gauge(
+    "fitrecs_cpu_executor_pending",
+    "CPU-bound tasks submitted to the scoring executor and not yet finished"
+)
+
+SINGLEFLIGHT_CALLS = Counter(
+    "fitrecs_singleflight_calls",
+    "Calls through a single-flight group; role=follower calls shared another call's result",
+    ["flight", "role"]
+)
+SINGLEFLIGHT_IN_FLIGHT = Gauge(
+    "fitrecs_singleflight_in_flight",
+    "Distinct keys currently being computed, per single-flight group",
+    ["flight"]
+)
+
+HYBRID_STAGE_TIMEOUTS = Counter(
+    "fitrecs_hybrid_stage_timeouts",
+    "Hybrid scoring stages dropped for overrunning their time slice",
+    ["stage"]
+)
+HYBRID_RESPONSES = Counter(
+    "fitrecs_hybrid_responses",
+    "Hybrid responses by contributing sources; anything but the full blend is a fallback",
+    ["sources"]
+)
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "fitrecs_embedding_batch_size",
+    "Distinct query texts encoded per micro-batched forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+EMBEDDING_BATCH_WAIT = Histogram(
+    "fitrecs_embedding_batch_wait_seconds",
+    "Time from the first query joining a batch to the batch being encoded",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05)
+)
+
+INTERACTION_BUFFER_DEPTH = Gauge(
+    "fitrecs_interaction_buffer_depth",
+    "Interactions accepted in write-behind mode and not yet flushed"
+)
+INTERACTION_BUFFER_REJECTED = Counter(
+    "fitrecs_interaction_buffer_rejected",
+    "Interactions refused because the write-behind buffer stayed full"
+)
+INTERACTION_FLUSH_SECONDS = Histogram(
+    "fitrecs_interaction_flush_seconds",
+    "Time to bulk-insert and commit one write-behind batch",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+INTERACTION_FLUSH_BATCH_SIZE = Histogram(
+    "fitrecs_interaction_flush_batch_size",
+    "Interactions written per write-behind flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500)
+)
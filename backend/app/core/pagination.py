@@ -0,0 +1,36 @@
+"""Keyset pagination cursors over (created_at, id) and NDJSON streaming."""
+from datetime import datetime
+from typing import AsyncIterator, Optional, Tuple
+import base64
+import json
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .responses import dumps
+
+Cursor = Tuple[datetime, int]
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Cursor]:
+    """Decode a cursor produced by encode_cursor, or raise a 400"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def ndjson_response(rows: AsyncIterator[dict]) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON without materializing them"""
+    async def lines() -> AsyncIterator[bytes]:
+        async for row in rows:
+            yield dumps(row) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,153 @@
+"""Opt-in sampling profiler for a single request.
+
+An admin request carrying the PROFILE_HEADER header is run under a
+StackSampler, and instead of its normal body the response is the
+request's sampled stacks in collapsed format (`frame;frame;frame count`
+per line), ready for flamegraph.pl or speedscope. The original status is
+returned in X-Profiled-Status.
+
+Only stacks that belong to the profiled request are sampled: the event
+loop thread while the request's task is the one running, and executor
+threads while they run work submitted by the request through
+StageExecutor.run. Other requests served meanwhile are not attributed.
+"""
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, Set
+import asyncio
+import os
+import sys
+import threading
+
+# The sampler of the request being profiled, if any
+_sampler: ContextVar[Optional["StackSampler"]] = ContextVar("profile_sampler", default=None)
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class StackSampler:
+    """Samples one request's stacks from a background thread every interval"""
+
+    def __init__(self, interval_seconds: float = 0.001):
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._threads: Set[int] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, task: asyncio.Task) -> None:
+        loop = task.get_loop()
+        loop_thread = threading.get_ident()
+        self._thread = threading.Thread(
+            target=self._run, args=(loop, loop_thread, task), name="request-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def enter_thread(self) -> None:
+        self._threads.add(threading.get_ident())
+
+    def exit_thread(self) -> None:
+        self._threads.discard(threading.get_ident())
+
+    def _run(self, loop: asyncio.AbstractEventLoop, loop_thread: int, task: asyncio.Task) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            frames = sys._current_frames()
+            threads = set(self._threads)
+            if asyncio.current_task(loop) is task:
+                threads.add(loop_thread)
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is None or thread_id == own:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+def call_traced(fn: Callable[[], Any]) -> Any:
+    """Run fn on an executor thread, sampling it if the submitting request is profiled"""
+    sampler = _sampler.get()
+    if sampler is None:
+        return fn()
+    sampler.enter_thread()
+    try:
+        return fn()
+    finally:
+        sampler.exit_thread()
+
+def _header(scope: dict, name: bytes) -> Optional[bytes]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling single requests on demand; admin callers only"""
+
+    def __init__(self, app: Any, header: str = "x-debug-profile", interval_ms: float = 1.0):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+        self.interval_seconds = interval_ms / 1000
+
+    async def _is_admin(self, scope: dict) -> bool:
+        from fastapi import HTTPException
+
+        from ..db.models import UserRole
+        from .security import get_current_principal
+
+        authorization = (_header(scope, b"authorization") or b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            principal = await get_current_principal(token)
+        except HTTPException:
+            return False
+        return principal.role == UserRole.ADMIN
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or _header(scope, self.header) is None or not await self._is_admin(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def capture(message: dict) -> None:
+            # The profile replaces the response, so the original is discarded
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+
+        sampler = StackSampler(self.interval_seconds)
+        token = _sampler.set(sampler)
+        sampler.start(asyncio.current_task())
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            sampler.stop()
+            _sampler.reset(token)
+
+        body = sampler.collapsed().encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(status[0]).encode()),
+                (b"x-profile-samples", str(sampler.samples).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
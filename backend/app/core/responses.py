@@ -0,0 +1,34 @@
+"""orjson-backed JSON responses for hot endpoints.
+
+Endpoints that return rows already in their response schema's shape (item
+rows from the catalog, cached recommendation bodies) can return these
+directly: FastAPI then skips response_model validation and
+jsonable_encoder, and the body is encoded once by orjson.
+"""
+from typing import Any, Dict, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+
+from .instrumentation import span
+
+# numpy scalars and arrays can reach responses from the recommenders
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+def dumps(content: Any) -> bytes:
+    with span("serialization"):
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+class FastJSONResponse(ORJSONResponse):
+    """JSON response rendered by orjson; content is not validated against any schema"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class RawJSONResponse(Response):
+    """Response for a body that is already serialized JSON, e.g. a cached one"""
+    media_type = "application/json"
+
+def prevalidated(content: Any, headers: Optional[Dict[str, str]] = None) -> FastJSONResponse:
+    """Return content that already matches the endpoint's response_model as-is"""
+    return FastJSONResponse(content, headers=headers)
@@ -1,14 +1,17 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import NamedTuple, Optional
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..core.cache import TTLCache
 from ..core.config import settings
-from ..db.session import get_db
-from ..db.models import User
+from ..db.session import AsyncSessionLocal, get_async_db
+from ..db.models import User, UserRole
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/token")
@@ -33,33 +36,87 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     )
     return encoded_jwt
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
-    credentials_exception = HTTPException(
+class Principal(NamedTuple):
+    """The authenticated caller: all most endpoints need, without loading the user row"""
+    id: int
+    role: UserRole
+
+# token -> decoded claims
+claims_cache = TTLCache(
+    "auth_claims",
+    max_size=settings.AUTH_CLAIMS_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_CLAIMS_CACHE_TTL_SECONDS
+)
+# user id -> Principal
+principal_cache = TTLCache(
+    "auth_principals",
+    max_size=settings.AUTH_PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
-        )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-        
-    user = db.query(User).filter(User.id == int(user_id)).first()
+
+def decode_token(token: str) -> int:
+    """Validate a bearer token and return its user id; decoded claims are cached until exp"""
+    claims = claims_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(
+                token, 
+                settings.SECRET_KEY, 
+                algorithms=[settings.ALGORITHM]
+            )
+        except JWTError:
+            raise _credentials_exception()
+        if claims.get("sub") is None:
+            raise _credentials_exception()
+        remaining = claims["exp"] - time.time() if "exp" in claims else claims_cache.ttl_seconds
+        claims_cache.set(token, claims, min(remaining, claims_cache.ttl_seconds))
+    elif "exp" in claims and claims["exp"] <= time.time():
+        raise _credentials_exception()
+    return int(claims["sub"])
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a cached principal; call after changing a user outside the ORM unit of work"""
+    principal_cache.invalidate(user_id)
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """Authenticate from the token and the principal cache; the users table is read on a miss only"""
+    user_id = decode_token(token)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(User.id, User.role).where(User.id == user_id)
+            )).first()
+        if row is None:
+            raise _credentials_exception()
+        principal = Principal(row.id, row.role)
+        principal_cache.set(user_id, principal)
+    return principal
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """The full user row, for endpoints that need more than id and role"""
+    user = await db.get(User, decode_token(token))
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    principal_cache.set(user.id, Principal(user.id, user.role))
     return user
 
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
-    return current_user
\ No newline at end of file
+    return current_user
@@ -0,0 +1,7 @@
+"""Async data access helpers."""
+from .item import item
+from .interaction import interaction
+from .upload_job import upload_job
+from .user_profile import user_profile
+
+__all__ = ["item", "interaction", "upload_job", "user_profile"]
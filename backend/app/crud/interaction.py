@@ -0,0 +1,295 @@
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Row, Select, delete, func, insert, literal, select, tuple_, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.pagination import Cursor
+from ..db.models import Interaction, InteractionDailyCount, InteractionType, Item
+from ..schemas.interaction import InteractionCreate
+from .user_profile import user_profile
+
+class CRUDInteraction:
+    # Below this many rows COPY setup costs more than a multi-row INSERT
+    copy_min_rows = 100
+
+    async def create(
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        obj_in: InteractionCreate
+    ) -> Interaction:
+        db_obj = Interaction(
+            user_id=user_id,
+            item_id=obj_in.item_id,
+            interaction_type=obj_in.interaction_type
+        )
+        db.add(db_obj)
+        await db.flush()
+        await user_profile.record_interactions(db, [{
+            "user_id": user_id,
+            "item_id": db_obj.item_id,
+            "interaction_type": db_obj.interaction_type,
+            "created_at": db_obj.created_at
+        }])
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def create_many(self, db: AsyncSession, rows: List[dict]) -> int:
+        """Insert interaction rows and update user profiles in one transaction, then commit.
+        
+        Each row holds user_id, item_id, interaction_type and created_at.
+        Postgres (asyncpg) batches of at least `copy_min_rows` are loaded with
+        COPY; everything else goes through a single executemany INSERT.
+        """
+        if not rows:
+            return 0
+        connection = await db.connection()
+        if connection.dialect.driver == "asyncpg" and len(rows) >= self.copy_min_rows:
+            raw = await connection.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Interaction.__tablename__,
+                records=[
+                    (
+                        row["user_id"],
+                        row["item_id"],
+                        # SQLAlchemy stores enum members by name
+                        InteractionType(row["interaction_type"]).name,
+                        row["created_at"]
+                    )
+                    for row in rows
+                ],
+                columns=["user_id", "item_id", "interaction_type", "created_at"]
+            )
+        else:
+            await db.execute(insert(Interaction), rows)
+        await user_profile.record_interactions(db, rows)
+        await db.commit()
+        return len(rows)
+
+    def _user_history_query(self, user_id: int, before: Optional[Cursor]):
+        """Newest-first history of a user, served by the (user_id, created_at, id) index"""
+        query = (
+            select(
+                Interaction.item_id,
+                Interaction.interaction_type,
+                Interaction.id,
+                Interaction.user_id,
+                Interaction.created_at
+            )
+            .where(Interaction.user_id == user_id)
+            .order_by(Interaction.created_at.desc(), Interaction.id.desc())
+        )
+        if before is not None:
+            query = query.where(
+                tuple_(Interaction.created_at, Interaction.id) < tuple_(*before)
+            )
+        return query
+
+    async def get_multi_by_user(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        *,
+        before: Optional[Cursor] = None,
+        limit: int = 100
+    ) -> List[dict]:
+        result = await db.execute(self._user_history_query(user_id, before).limit(limit))
+        return [row._asdict() for row in result]
+
+    async def stream_by_user(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        *,
+        before: Optional[Cursor] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[dict]:
+        """Yield the user's history after the cursor from a server-side cursor"""
+        result = await db.stream(
+            self._user_history_query(user_id, before).execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row._asdict()
+
+    async def get_user_item_ids(self, db: AsyncSession, user_id: int) -> Set[int]:
+        """Ids of every item the user has interacted with"""
+        result = await db.execute(
+            select(Interaction.item_id).where(Interaction.user_id == user_id)
+        )
+        return set(result.scalars())
+
+    async def get_user_recent_interactions(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        days: int = 30
+    ) -> List[Row]:
+        """Recent interactions joined with the title and type of their item"""
+        since = datetime.utcnow() - timedelta(days=days)
+        result = await db.execute(
+            select(
+                Interaction.item_id,
+                Interaction.interaction_type,
+                Interaction.created_at,
+                Item.title,
+                Item.type
+            )
+            .join(Item, Item.id == Interaction.item_id)
+            .where(Interaction.user_id == user_id, Interaction.created_at >= since)
+            .order_by(Interaction.created_at.desc())
+        )
+        return result.all()
+
+    async def get_user_interactions_by_type(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        interaction_type: InteractionType
+    ) -> List[Row]:
+        result = await db.execute(
+            select(Interaction.item_id, Item.title, Item.type)
+            .join(Item, Item.id == Interaction.item_id)
+            .where(
+                Interaction.user_id == user_id,
+                Interaction.interaction_type == InteractionType(interaction_type)
+            )
+            .order_by(Interaction.created_at.desc())
+        )
+        return result.all()
+
+    async def get_type_counts_by_item(
+        self,
+        db: AsyncSession,
+        since: datetime
+    ) -> Dict[Tuple[int, InteractionType], int]:
+        """Interaction counts per (item, type) since a time.
+
+        No index leads on created_at, so this scans the table, or with monthly
+        partitioning only the partitions from `since` on. It backs the
+        periodic popularity refresh, never a request.
+        """
+        result = await db.execute(
+            select(Interaction.item_id, Interaction.interaction_type, func.count())
+            .where(Interaction.created_at >= since)
+            .group_by(Interaction.item_id, Interaction.interaction_type)
+        )
+        return {(item_id, interaction_type): count for item_id, interaction_type, count in result}
+
+    async def get_all_for_training(self, db: AsyncSession) -> List[Row]:
+        """The (user_id, item_id, interaction_type, events) rows ALS trains on.
+
+        Raw interactions count once each; compacted daily rollups carry their count.
+        """
+        result = await db.execute(union_all(
+            select(
+                Interaction.user_id,
+                Interaction.item_id,
+                Interaction.interaction_type,
+                literal(1).label("events")
+            ),
+            select(
+                InteractionDailyCount.user_id,
+                InteractionDailyCount.item_id,
+                InteractionDailyCount.interaction_type,
+                InteractionDailyCount.count.label("events")
+            )
+        ))
+        return result.all()
+
+    async def rollup_views(
+        self,
+        db: AsyncSession,
+        before: datetime,
+        *,
+        max_id: Optional[int] = None
+    ) -> int:
+        """Compact VIEW interactions created before `before` into daily counts.
+
+        Walks the days between the oldest and newest matching views (looked
+        up once), each in its own transaction: the day's views are added to
+        interaction_daily_counts (upserting onto earlier runs' counts) and
+        the raw rows deleted. With `max_id`, only rows up to that id are
+        compacted, e.g. the interaction export's high-water mark.
+        Returns the number of raw rows removed.
+        """
+        conditions = [
+            Interaction.interaction_type == InteractionType.VIEW,
+            Interaction.created_at < before
+        ]
+        if max_id is not None:
+            conditions.append(Interaction.id <= max_id)
+
+        first, last = (await db.execute(
+            select(func.min(Interaction.created_at), func.max(Interaction.created_at)).where(*conditions)
+        )).one()
+        if first is None:
+            return 0
+
+        compacted = 0
+        day = first.date()
+        while day <= last.date():
+            day_start = datetime.combine(day, datetime.min.time())
+            day_conditions = conditions + [
+                Interaction.created_at >= day_start,
+                Interaction.created_at < day_start + timedelta(days=1)
+            ]
+            counts = (
+                select(
+                    literal(day, InteractionDailyCount.day.type),
+                    Interaction.user_id,
+                    Interaction.item_id,
+                    Interaction.interaction_type,
+                    func.count()
+                )
+                .where(*day_conditions)
+                .group_by(Interaction.user_id, Interaction.item_id, Interaction.interaction_type)
+            )
+            await self._add_daily_counts(db, counts)
+            result = await db.execute(delete(Interaction).where(*day_conditions))
+            await db.commit()
+            compacted += result.rowcount
+            day += timedelta(days=1)
+        return compacted
+
+    async def _add_daily_counts(self, db: AsyncSession, counts: Select) -> None:
+        """Add (day, user_id, item_id, interaction_type, count) rows onto interaction_daily_counts"""
+        columns = ["day", "user_id", "item_id", "interaction_type", "count"]
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert_fn = pg_insert if dialect == "postgresql" else sqlite_insert
+            statement = insert_fn(InteractionDailyCount).from_select(columns, counts)
+            statement = statement.on_conflict_do_update(
+                index_elements=columns[:-1],
+                set_={"count": InteractionDailyCount.count + statement.excluded.count}
+            )
+            await db.execute(statement)
+            return
+
+        # No upsert: add to existing counts row by row, insert the rest
+        for day, user_id, item_id, interaction_type, count in (await db.execute(counts)).all():
+            result = await db.execute(
+                update(InteractionDailyCount)
+                .where(
+                    InteractionDailyCount.day == day,
+                    InteractionDailyCount.user_id == user_id,
+                    InteractionDailyCount.item_id == item_id,
+                    InteractionDailyCount.interaction_type == interaction_type
+                )
+                .values(count=InteractionDailyCount.count + count)
+            )
+            if result.rowcount == 0:
+                db.add(InteractionDailyCount(
+                    day=day,
+                    user_id=user_id,
+                    item_id=item_id,
+                    interaction_type=interaction_type,
+                    count=count
+                ))
+        await db.flush()
+
+interaction = CRUDInteraction()
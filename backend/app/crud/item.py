@@ -0,0 +1,122 @@
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import Row, insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.pagination import Cursor
+from ..db.models import Item
+
+# Columns of the Item schema; queries select these instead of ORM entities
+ITEM_COLUMNS = (
+    Item.title,
+    Item.type,
+    Item.description,
+    Item.tags,
+    Item.duration,
+    Item.difficulty,
+    Item.media_url,
+    Item.id,
+    Item.created_at,
+)
+
+class CRUDItem:
+    async def get(self, db: AsyncSession, id: int) -> Optional[Row]:
+        result = await db.execute(select(*ITEM_COLUMNS).where(Item.id == id))
+        return result.first()
+
+    async def get_multi(
+        self,
+        db: AsyncSession,
+        *,
+        skip_ids: Optional[Sequence[int]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Row]:
+        query = select(*ITEM_COLUMNS).order_by(Item.id).offset(skip).limit(limit)
+        if skip_ids:
+            query = query.where(Item.id.not_in(skip_ids))
+        result = await db.execute(query)
+        return result.all()
+
+    async def get_all(self, db: AsyncSession) -> List[Row]:
+        result = await db.execute(select(*ITEM_COLUMNS).order_by(Item.id))
+        return result.all()
+
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        after: Optional[Cursor] = None,
+        limit: int = 100
+    ) -> List[Row]:
+        """Keyset page of (id, created_at) in (created_at, id) order"""
+        query = select(Item.id, Item.created_at).order_by(Item.created_at, Item.id).limit(limit)
+        if after is not None:
+            query = query.where(tuple_(Item.created_at, Item.id) > tuple_(*after))
+        result = await db.execute(query)
+        return result.all()
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        *,
+        after: Optional[Cursor] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Row]:
+        """Yield every item after the cursor from a server-side cursor"""
+        query = (
+            select(*ITEM_COLUMNS)
+            .order_by(Item.created_at, Item.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if after is not None:
+            query = query.where(tuple_(Item.created_at, Item.id) > tuple_(*after))
+        result = await db.stream(query)
+        async for row in result:
+            yield row
+
+    async def search_ids(
+        self, db: AsyncSession, q: str, *, limit: int = 20, offset: int = 0
+    ) -> List[int]:
+        """Unindexed substring match, used where no full-text index exists"""
+        result = await db.execute(
+            select(Item.id)
+            .where(Item.title.ilike(f"%{q}%") | Item.description.ilike(f"%{q}%"))
+            .order_by(Item.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(result.scalars())
+
+    async def create_many(self, db: AsyncSession, rows: List[dict]) -> List[int]:
+        """Insert item rows with one executemany INSERT and commit; ids follow row order"""
+        if not rows:
+            return []
+        result = await db.execute(
+            insert(Item).returning(Item.id, sort_by_parameter_order=True), rows
+        )
+        ids = list(result.scalars())
+        await db.commit()
+        return ids
+
+    async def get_existing_ids(self, db: AsyncSession, ids: Iterable[int]) -> Set[int]:
+        """Subset of ids that exist, checked with a single IN query"""
+        ids = set(ids)
+        if not ids:
+            return set()
+        result = await db.execute(select(Item.id).where(Item.id.in_(ids)))
+        return set(result.scalars())
+
+    async def get_rows_by_ids(self, db: AsyncSession, ids: Sequence[int]) -> Dict[int, dict]:
+        """Fetch items by id with a single IN query, keyed by id"""
+        if not ids:
+            return {}
+        result = await db.execute(select(*ITEM_COLUMNS).where(Item.id.in_(ids)))
+        return {row.id: row._asdict() for row in result}
+
+    async def get_multi_by_ids(self, db: AsyncSession, ids: Sequence[int]) -> List[dict]:
+        """Fetch items by id, keeping the order of ids and dropping missing ones"""
+        rows = await self.get_rows_by_ids(db, ids)
+        return [rows[item_id] for item_id in ids if item_id in rows]
+
+item = CRUDItem()
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import UploadJob
+
+class CRUDUploadJob:
+    async def create(self, db: AsyncSession, values: dict) -> None:
+        db.add(UploadJob(**values))
+        await db.commit()
+
+    async def get(self, db: AsyncSession, job_id: str) -> Optional[dict]:
+        result = await db.execute(
+            select(*UploadJob.__table__.columns).where(UploadJob.id == job_id)
+        )
+        row = result.first()
+        return row._asdict() if row is not None else None
+
+    async def update(self, db: AsyncSession, job_id: str, values: dict) -> None:
+        await db.execute(update(UploadJob).where(UploadJob.id == job_id).values(**values))
+        await db.commit()
+
+    async def prune(self, db: AsyncSession, keep: int) -> None:
+        """Delete finished jobs beyond the `keep` most recent jobs"""
+        newest = select(UploadJob.id).order_by(UploadJob.created_at.desc()).limit(keep)
+        await db.execute(
+            delete(UploadJob)
+            .where(UploadJob.status.in_(["completed", "failed"]))
+            .where(UploadJob.id.not_in(newest))
+        )
+        await db.commit()
+
+upload_job = CRUDUploadJob()
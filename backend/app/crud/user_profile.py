@@ -0,0 +1,174 @@
+from collections import defaultdict
+from datetime import datetime, time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..db.models import Interaction, InteractionDailyCount, InteractionType, UserProfile
+
+# Interactions kept in the recent-activity ring buffer
+RECENT_LIMIT = 50
+
+COUNT_COLUMNS = {
+    InteractionType.VIEW: "view_count",
+    InteractionType.LIKE: "like_count",
+    InteractionType.COMPLETE: "complete_count",
+}
+
+PROFILE_COLUMNS = [column.name for column in UserProfile.__table__.columns]
+
+def _newest_first(new_ids: List[int], existing: List[int]) -> List[int]:
+    """Prepend ids (given oldest first) to a newest-first list without duplicates"""
+    fresh = list(dict.fromkeys(reversed(new_ids)))
+    fresh_set = set(fresh)
+    return fresh + [item_id for item_id in existing if item_id not in fresh_set]
+
+def apply_interactions(profile: UserProfile, rows: Sequence[dict]) -> None:
+    """Fold interaction rows into the profile's aggregates.
+
+    Lists are replaced rather than mutated so the JSON columns are flagged dirty.
+    A row may carry a `count`, as compacted daily rollups do; those count
+    that many times and, having no exact time, stay out of `recent`.
+    """
+    rows = sorted(rows, key=lambda row: row["created_at"])
+    seen = list(profile.seen_item_ids or [])
+    seen_set = set(seen)
+    liked, completed, recent = [], [], []
+    for row in rows:
+        interaction_type = InteractionType(row["interaction_type"])
+        column = COUNT_COLUMNS[interaction_type]
+        setattr(profile, column, (getattr(profile, column) or 0) + row.get("count", 1))
+        if row["item_id"] not in seen_set:
+            seen.append(row["item_id"])
+            seen_set.add(row["item_id"])
+        if interaction_type == InteractionType.LIKE:
+            liked.append(row["item_id"])
+        elif interaction_type == InteractionType.COMPLETE:
+            completed.append(row["item_id"])
+        if "count" in row:
+            continue
+        recent.append({
+            "item_id": row["item_id"],
+            "interaction_type": interaction_type.value,
+            "created_at": row["created_at"].isoformat(),
+        })
+
+    profile.seen_item_ids = seen
+    profile.liked_item_ids = _newest_first(liked, profile.liked_item_ids or [])
+    profile.completed_item_ids = _newest_first(completed, profile.completed_item_ids or [])
+    profile.recent = (recent[::-1] + list(profile.recent or []))[:RECENT_LIMIT]
+    if rows and (profile.last_active_at is None or rows[-1]["created_at"] > profile.last_active_at):
+        profile.last_active_at = rows[-1]["created_at"]
+
+def to_dict(profile: UserProfile) -> dict:
+    return {column: getattr(profile, column) for column in PROFILE_COLUMNS}
+
+class CRUDUserProfile:
+    async def _build(self, db: AsyncSession, user_id: int) -> UserProfile:
+        """Aggregate a user's full history; used once per user, before a profile row exists.
+
+        History is the raw interactions plus the daily counts the view rollup
+        compacted them into, each dated to the start of its day.
+        """
+        result = await db.execute(
+            select(Interaction.item_id, Interaction.interaction_type, Interaction.created_at)
+            .where(Interaction.user_id == user_id)
+            .order_by(Interaction.created_at, Interaction.id)
+        )
+        rows = [row._asdict() for row in result]
+        result = await db.execute(
+            select(
+                InteractionDailyCount.day,
+                InteractionDailyCount.item_id,
+                InteractionDailyCount.interaction_type,
+                InteractionDailyCount.count
+            )
+            .where(InteractionDailyCount.user_id == user_id)
+        )
+        rows += [
+            {
+                "item_id": item_id,
+                "interaction_type": interaction_type,
+                "created_at": datetime.combine(day, time.min),
+                "count": count,
+            }
+            for day, item_id, interaction_type, count in result
+        ]
+        profile = UserProfile(
+            user_id=user_id,
+            view_count=0,
+            like_count=0,
+            complete_count=0,
+            recent=[],
+            seen_item_ids=[],
+            liked_item_ids=[],
+            completed_item_ids=[],
+            updated_at=datetime.utcnow()
+        )
+        apply_interactions(profile, rows)
+        return profile
+
+    async def _insert_if_absent(self, db: AsyncSession, profile: UserProfile) -> bool:
+        """Insert a built profile unless a concurrent writer already did; True if inserted"""
+        values = to_dict(profile)
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = pg_insert(UserProfile).values(values).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            statement = sqlite_insert(UserProfile).values(values).on_conflict_do_nothing()
+        else:
+            statement = insert(UserProfile).values(values)
+        result = await db.execute(statement)
+        return result.rowcount == 1
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[UserProfile]:
+        return await db.get(UserProfile, user_id)
+
+    async def get_or_build(self, db: AsyncSession, user_id: int) -> dict:
+        """Single-row profile read; users without a row get one built in memory.
+
+        Nothing is stored: reads come from unvalidated user ids, and profile
+        rows are only created on the interaction write path. Unknown users
+        and users without history get an empty profile.
+        """
+        profile = await self.get(db, user_id)
+        if profile is None:
+            profile = await self._build(db, user_id)
+        return to_dict(profile)
+
+    async def record_interactions(self, db: AsyncSession, rows: Sequence[dict]) -> None:
+        """Update profiles for interaction rows already written in this transaction.
+
+        Profiles are row-locked (FOR UPDATE on Postgres) so concurrent writers
+        for one user serialize. A user without a profile gets one built from
+        history, which already contains these rows; if a concurrent writer
+        creates it first, these rows are applied to that profile instead.
+        The caller commits.
+        """
+        by_user: Dict[int, List[dict]] = defaultdict(list)
+        for row in rows:
+            by_user[row["user_id"]].append(row)
+        if not by_user:
+            return
+
+        result = await db.execute(
+            select(UserProfile)
+            .where(UserProfile.user_id.in_(by_user.keys()))
+            .with_for_update()
+        )
+        profiles = {profile.user_id: profile for profile in result.scalars()}
+        for user_id, user_rows in by_user.items():
+            profile = profiles.get(user_id)
+            if profile is None:
+                if await self._insert_if_absent(db, await self._build(db, user_id)):
+                    continue
+                profile = (await db.execute(
+                    select(UserProfile).where(UserProfile.user_id == user_id).with_for_update()
+                )).scalar_one()
+            apply_interactions(profile, user_rows)
+        await db.flush()
+
+user_profile = CRUDUserProfile()
@@ -0,0 +1,94 @@
+"""Full-text search index for the items table.
+
+Postgres keeps a weighted ``search_vector`` tsvector column in sync via a
+trigger and indexes it with GIN. SQLite uses an external-content FTS5 table
+maintained by insert/update/delete triggers.
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+POSTGRES_DDL = [
+    "ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    """
+    CREATE OR REPLACE FUNCTION items_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(NEW.tags::text, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS items_search_vector_trigger ON items",
+    """
+    CREATE TRIGGER items_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, tags ON items
+    FOR EACH ROW EXECUTE FUNCTION items_search_vector_update()
+    """,
+    # Backfill existing rows through the trigger
+    "UPDATE items SET title = title",
+    "CREATE INDEX IF NOT EXISTS ix_items_search_vector ON items USING GIN (search_vector)",
+]
+
+POSTGRES_DROP = [
+    "DROP INDEX IF EXISTS ix_items_search_vector",
+    "DROP TRIGGER IF EXISTS items_search_vector_trigger ON items",
+    "DROP FUNCTION IF EXISTS items_search_vector_update()",
+    "ALTER TABLE items DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        title, description, tags,
+        content='items', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts(rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, new.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.tags);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE ON items BEGIN
+        INSERT INTO items_fts(items_fts, rowid, title, description, tags)
+        VALUES ('delete', old.id, old.title, old.description, old.tags);
+        INSERT INTO items_fts(rowid, title, description, tags)
+        VALUES (new.id, new.title, new.description, new.tags);
+    END
+    """,
+    # Index rows that existed before the FTS table
+    "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS items_fts_au",
+    "DROP TRIGGER IF EXISTS items_fts_ad",
+    "DROP TRIGGER IF EXISTS items_fts_ai",
+    "DROP TABLE IF EXISTS items_fts",
+]
+
+def has_fts(connection: Connection) -> bool:
+    inspector = inspect(connection)
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        return any(c["name"] == "search_vector" for c in inspector.get_columns("items"))
+    if dialect == "sqlite":
+        return "items_fts" in inspector.get_table_names()
+    return False
+
+def install_fts(connection: Connection) -> None:
+    """Create the full-text index and triggers if this database lacks them"""
+    dialect = connection.dialect.name
+    if dialect not in ("postgresql", "sqlite") or has_fts(connection):
+        return
+    for statement in POSTGRES_DDL if dialect == "postgresql" else SQLITE_DDL:
+        connection.execute(text(statement))
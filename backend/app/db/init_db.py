@@ -4,7 +4,10 @@ from sqlalchemy.orm import Session
 from .base import Base
 from .session import engine
 from . import models
+from .fts import install_fts
 
 def init_db() -> None:
     """Create database tables."""
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        install_fts(connection)
\ No newline at end of file
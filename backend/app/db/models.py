@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Enum, Date, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -35,6 +35,7 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     interactions = relationship("Interaction", back_populates="user")
+    profile = relationship("UserProfile", back_populates="user", uselist=False)
 
 class Item(Base):
     __tablename__ = "items"
@@ -51,6 +52,11 @@ class Item(Base):
     
     interactions = relationship("Interaction", back_populates="item")
     embedding_index = relationship("EmbeddingIndex", back_populates="item", uselist=False)
+    
+    __table_args__ = (
+        # Keyset pagination over the catalog
+        Index("ix_items_created_at_id", "created_at", "id"),
+    )
 
 class Interaction(Base):
     __tablename__ = "interactions"
@@ -63,6 +69,23 @@ class Interaction(Base):
     
     user = relationship("User", back_populates="interactions")
     item = relationship("Item", back_populates="interactions")
+    
+    __table_args__ = (
+        # Keyset pagination over a user's history, newest first
+        Index("ix_interactions_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Per-item counts by type (popularity, item stats)
+        Index("ix_interactions_item_id_interaction_type", "item_id", "interaction_type"),
+    )
+
+class InteractionDailyCount(Base):
+    """Old VIEW interactions compacted into per-day counts by the rollup job"""
+    __tablename__ = "interaction_daily_counts"
+
+    day = Column(Date, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    interaction_type = Column(Enum(InteractionType), primary_key=True)
+    count = Column(Integer, nullable=False)
 
 class EmbeddingIndex(Base):
     __tablename__ = "embedding_index"
@@ -72,4 +95,36 @@ class EmbeddingIndex(Base):
     faiss_id = Column(Integer, unique=True, nullable=False)  # Position in FAISS index
     embedding = Column(JSON, nullable=True)  # Optional: store raw embedding if needed
     
-    item = relationship("Item", back_populates="embedding_index")
\ No newline at end of file
+    item = relationship("Item", back_populates="embedding_index")
+
+class UserProfile(Base):
+    """Per-user interaction aggregates, maintained in the interaction write path"""
+    __tablename__ = "user_profile"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    view_count = Column(Integer, nullable=False, default=0)
+    like_count = Column(Integer, nullable=False, default=0)
+    complete_count = Column(Integer, nullable=False, default=0)
+    last_active_at = Column(DateTime)
+    recent = Column(JSON, nullable=False, default=list)  # Newest-first ring buffer of interactions
+    seen_item_ids = Column(JSON, nullable=False, default=list)
+    liked_item_ids = Column(JSON, nullable=False, default=list)  # Newest first
+    completed_item_ids = Column(JSON, nullable=False, default=list)  # Newest first
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    user = relationship("User", back_populates="profile")
+
+class UploadJob(Base):
+    """Progress of a catalog CSV upload, readable from any worker"""
+    __tablename__ = "upload_jobs"
+
+    id = Column(String(32), primary_key=True)
+    filename = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # queued, running, completed or failed
+    rows_read = Column(Integer, nullable=False, default=0)
+    items_created = Column(Integer, nullable=False, default=0)
+    items_indexed = Column(Integer, nullable=False, default=0)
+    rows_rejected = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=False, default=list)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime)
@@ -1,18 +1,63 @@
+from typing import AsyncIterator
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url, URL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.orm import Session
 
 from ..core.config import settings
+from ..core.instrumentation import instrument_engine
 from .base import Base
 
+def _pool_options(url: URL) -> dict:
+    """Connection pool settings; SQLite uses SQLAlchemy's default single-file pool"""
+    if url.get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+    }
+
+def get_async_url(database_url: str) -> URL:
+    """Map the configured sync URL onto its async driver (asyncpg / aiosqlite)"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+asyncpg").update_query_dict({
+            "prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)
+        })
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    echo=True if settings.DATABASE_URL.startswith("sqlite") else False
+    echo=settings.DB_ECHO,
+    **_pool_options(make_url(settings.DATABASE_URL))
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_url = get_async_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    async_url,
+    pool_pre_ping=True,
+    echo=settings.DB_ECHO,
+    **_pool_options(async_url)
+)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
 
@@ -21,4 +66,8 @@ def get_db() -> Session:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,14 +1,28 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
+from app.core.concurrency import stage_executor
 from app.core.config import settings
+from app.core.instrumentation import RequestMetricsMiddleware, ServerTimingMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.responses import FastJSONResponse
+from app.api.health import router as health_router
+from app.api.metrics import router as metrics_router
 from app.api.v1.api import api_router
 from app.db.init_db import init_db
+from app.services.embeddings import query_embedding_batcher
+from app.services.interaction_buffer import interaction_buffer
+from app.services.interaction_export import interaction_exporter
+from app.services.warmup import warmup_service
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse,
     debug=True
 )
 
@@ -23,12 +37,65 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Recommendation-Sources", "Server-Timing"],
 )
 
+if settings.GZIP_ENABLED:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.GZIP_MIN_SIZE,
+        compresslevel=settings.GZIP_LEVEL
+    )
+
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+
+if settings.PROFILE_HEADER:
+    app.add_middleware(
+        ProfilingMiddleware,
+        header=settings.PROFILE_HEADER,
+        interval_ms=settings.PROFILE_INTERVAL_MS
+    )
+
+if settings.METRICS_ENABLED:
+    # Outermost, so recorded latency includes compression
+    app.add_middleware(RequestMetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
+app.include_router(health_router, prefix="/health", tags=["health"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics_router, prefix="/metrics", tags=["metrics"])
 
 # Initialize database on startup
 @app.on_event("startup")
-def startup_event():
-    init_db()
\ No newline at end of file
+async def startup_event():
+    init_db()
+    
+    # Load the item catalog, FAISS index and models; /health/ready reports progress
+    components = [name.strip() for name in settings.WARMUP_COMPONENTS.split(",") if name.strip()]
+    if settings.WARMUP_BLOCKING:
+        await warmup_service.warm(components)
+    else:
+        app.state.warmup_task = asyncio.create_task(warmup_service.warm(components))
+        
+    if settings.INTERACTION_WRITE_BEHIND:
+        await interaction_buffer.start()
+        
+    if settings.INTERACTION_EXPORT_INTERVAL_SECONDS > 0:
+        app.state.export_task = asyncio.create_task(
+            interaction_exporter.run_periodically(settings.INTERACTION_EXPORT_INTERVAL_SECONDS)
+        )
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    export_task = getattr(app.state, "export_task", None)
+    if export_task is not None:
+        export_task.cancel()
+    # Flush buffered interactions before the executor and pools go away
+    await interaction_buffer.stop()
+    await query_embedding_batcher.close()
+    stage_executor.shutdown()
\ No newline at end of file
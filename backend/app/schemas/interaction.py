@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 from ..db.models import InteractionType
 
@@ -16,4 +16,17 @@ class Interaction(InteractionBase):
     created_at: datetime
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class InteractionBatchCreate(BaseModel):
+    events: List[InteractionCreate] = Field(..., min_items=1, max_items=1000)
+
+class InteractionEventStatus(BaseModel):
+    index: int
+    status: str  # "accepted" or "rejected"
+    error: Optional[str] = None
+
+class InteractionBatchResult(BaseModel):
+    accepted: int
+    rejected: int
+    results: List[InteractionEventStatus]
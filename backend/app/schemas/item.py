@@ -23,4 +23,16 @@ class Item(ItemBase):
         orm_mode = True
 
 class ItemWithSimilarity(Item):
-    similarity_score: Optional[float] = None
\ No newline at end of file
+    similarity_score: Optional[float] = None
+
+class ItemUploadJob(BaseModel):
+    job_id: str
+    filename: str
+    status: str  # queued, running, completed or failed
+    rows_read: int
+    items_created: int
+    items_indexed: int
+    rows_rejected: int
+    errors: List[str]
+    created_at: datetime
+    finished_at: Optional[datetime] = None
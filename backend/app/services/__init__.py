@@ -1,14 +1,21 @@
-"""Service layer initialization."""
-from .embeddings import embedding_service
-from .indexer import indexer_service
-from .recommender import recommender
-from .fitness_coach import FitnessCoachService
-from .ai_recommendation import ai_recommender
-
-__all__ = [
-    "embedding_service",
-    "indexer_service",
-    "recommender",
-    "FitnessCoachService",
-    "ai_recommender"
-]
\ No newline at end of file
+"""Service layer initialization.
+
+Attributes resolve lazily (PEP 562) so importing one service module does not
+import every service and its ML dependencies.
+"""
+import importlib
+
+_EXPORTS = {
+    "embedding_service": ".embeddings",
+    "indexer_service": ".indexer",
+    "recommender": ".recommender",
+    "FitnessCoachService": ".fitness_coach",
+    "AIRecommendationService": ".ai_recommendation",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -7,6 +7,8 @@ from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 import json
 
+from ..core.instrumentation import span
+
 class ContextualRecommendation(BaseModel):
     item_ids: List[int] = Field(description="List of item IDs to recommend")
     explanation: str = Field(description="Natural language explanation of the recommendations")
@@ -95,14 +97,15 @@ class AIRecommendationService:
         )
 
         # Get recommendations from LLM
-        result = await self.chain.arun(
-            recent_activities=recent_activities_str,
-            liked_items=liked_items_str,
-            completed_items=completed_items_str,
-            goals=", ".join(goals),
-            fitness_level=fitness_level,
-            available_items=available_items_str
-        )
+        with span("llm_call"):
+            result = await self.chain.arun(
+                recent_activities=recent_activities_str,
+                liked_items=liked_items_str,
+                completed_items=completed_items_str,
+                goals=", ".join(goals),
+                fitness_level=fitness_level,
+                available_items=available_items_str
+            )
 
         # Parse the LLM output
         recommendations = self.parser.parse(result)
@@ -122,12 +125,13 @@ class AIRecommendationService:
         recent_activities_str = self._format_activities(recent_activities)
         item_details = json.dumps(item, indent=2)
 
-        explanation = await self.explanation_chain.arun(
-            recent_activities=recent_activities_str,
-            goals=", ".join(goals),
-            fitness_level=fitness_level,
-            item_details=item_details
-        )
+        with span("llm_call"):
+            explanation = await self.explanation_chain.arun(
+                recent_activities=recent_activities_str,
+                goals=", ".join(goals),
+                fitness_level=fitness_level,
+                item_details=item_details
+            )
 
         return explanation.strip()
 
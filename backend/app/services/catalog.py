@@ -0,0 +1,157 @@
+from typing import Dict, List, Optional, Sequence
+import logging
+import sys
+import threading
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud
+from ..db import models
+
+logger = logging.getLogger(__name__)
+
+ITEM_TYPES = list(models.ItemType)
+DIFFICULTY_LEVELS = list(models.DifficultyLevel)
+
+class StringTable:
+    """Interned string storage; columns hold int32 references into it"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        ref = self._index.get(value)
+        if ref is None:
+            ref = len(self.strings)
+            self.strings.append(value)
+            self._index[value] = ref
+        return ref
+
+    def lookup(self, ref: int) -> Optional[str]:
+        return self.strings[ref] if ref >= 0 else None
+
+class CatalogSnapshot:
+    """Immutable columnar view of the items table, sorted by item id"""
+
+    def __init__(self, rows: Sequence):
+        n = len(rows)
+        table = StringTable()
+        type_index = {t: i for i, t in enumerate(ITEM_TYPES)}
+        difficulty_index = {d: i for i, d in enumerate(DIFFICULTY_LEVELS)}
+
+        self.ids = np.empty(n, dtype=np.int64)
+        self.type_codes = np.empty(n, dtype=np.int8)
+        self.difficulty_codes = np.empty(n, dtype=np.int8)
+        self.durations = np.empty(n, dtype=np.int32)
+        self.created_at = np.empty(n, dtype="datetime64[us]")
+        self.title_refs = np.empty(n, dtype=np.int32)
+        self.description_refs = np.empty(n, dtype=np.int32)
+        self.media_url_refs = np.empty(n, dtype=np.int32)
+        self.tag_offsets = np.zeros(n + 1, dtype=np.int32)
+        tag_refs: List[int] = []
+
+        for pos, row in enumerate(sorted(rows, key=lambda r: r.id)):
+            self.ids[pos] = row.id
+            self.type_codes[pos] = type_index[models.ItemType(row.type)]
+            self.difficulty_codes[pos] = (
+                difficulty_index[models.DifficultyLevel(row.difficulty)]
+                if row.difficulty is not None else -1
+            )
+            self.durations[pos] = row.duration if row.duration is not None else -1
+            self.created_at[pos] = (
+                np.datetime64(row.created_at, "us") if row.created_at else np.datetime64("NaT")
+            )
+            self.title_refs[pos] = table.intern(row.title)
+            self.description_refs[pos] = table.intern(row.description)
+            self.media_url_refs[pos] = table.intern(row.media_url)
+            tag_refs.extend(table.intern(tag) for tag in (row.tags or []))
+            self.tag_offsets[pos + 1] = len(tag_refs)
+
+        self.tag_refs = np.asarray(tag_refs, dtype=np.int32)
+        self.strings = table
+        self._nbytes: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Column arrays plus interned strings; computed once, snapshots never change"""
+        if self._nbytes is None:
+            columns = [value for value in vars(self).values() if isinstance(value, np.ndarray)]
+            strings = self.strings.strings
+            self._nbytes = (
+                sum(column.nbytes for column in columns)
+                + sys.getsizeof(strings)
+                + sum(sys.getsizeof(value) for value in strings)
+                + sys.getsizeof(self.strings._index)
+            )
+        return self._nbytes
+
+    def positions(self, item_ids: Sequence[int]) -> np.ndarray:
+        """Map item ids to row positions, -1 for ids not in the snapshot"""
+        query = np.asarray(item_ids, dtype=np.int64)
+        if len(self.ids) == 0 or len(query) == 0:
+            return np.full(len(query), -1, dtype=np.int64)
+        pos = np.searchsorted(self.ids, query)
+        pos[pos >= len(self.ids)] = 0
+        return np.where(self.ids[pos] == query, pos, -1)
+
+    def row(self, pos: int) -> dict:
+        """Serialize the row at pos into the Item schema shape"""
+        strings = self.strings
+        start, end = self.tag_offsets[pos], self.tag_offsets[pos + 1]
+        difficulty = self.difficulty_codes[pos]
+        duration = self.durations[pos]
+        created_at = self.created_at[pos]
+        return {
+            "title": strings.lookup(self.title_refs[pos]),
+            "type": ITEM_TYPES[self.type_codes[pos]],
+            "description": strings.lookup(self.description_refs[pos]),
+            "tags": [strings.strings[ref] for ref in self.tag_refs[start:end]],
+            "duration": int(duration) if duration >= 0 else None,
+            "difficulty": DIFFICULTY_LEVELS[difficulty] if difficulty >= 0 else None,
+            "media_url": strings.lookup(self.media_url_refs[pos]),
+            "id": int(self.ids[pos]),
+            "created_at": None if np.isnat(created_at) else created_at.item(),
+        }
+
+class ItemCatalog:
+    """In-memory columnar item metadata store, swapped atomically on refresh"""
+
+    def __init__(self):
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.snapshot is not None
+
+    async def refresh(self, db: AsyncSession) -> int:
+        """(Re)load the catalog from the items table and return its size"""
+        rows = await crud.item.get_all(db)
+        snapshot = CatalogSnapshot(rows)
+        with self._lock:
+            self.snapshot = snapshot
+            self.version += 1
+        logger.info(f"Item catalog loaded with {len(snapshot)} items (version {self.version})")
+        return len(snapshot)
+
+    def get_rows(self, item_ids: Sequence[int]) -> Dict[int, dict]:
+        """Resolve item ids to serialized rows; ids not in the catalog are omitted"""
+        snapshot = self.snapshot
+        if snapshot is None:
+            return {}
+        rows = {}
+        for item_id, pos in zip(item_ids, snapshot.positions(item_ids)):
+            if pos >= 0:
+                rows[item_id] = snapshot.row(pos)
+        return rows
+
+# Global instance
+item_catalog = ItemCatalog()
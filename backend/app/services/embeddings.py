@@ -1,27 +1,50 @@
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 import numpy as np
-from sentence_transformers import SentenceTransformer
+import asyncio
 import logging
+import re
+import time
 
+from ..core.cache import TTLCache
+from ..core.concurrency import create_detached_task, stage_executor
 from ..core.config import settings
+from ..core.instrumentation import record_request_span, span
+from ..core.metrics import EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_WAIT
 from ..db import models
 
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
 logger = logging.getLogger(__name__)
 
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-fold a search query so equivalent queries share a cache entry"""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
 class EmbeddingService:
-    def __init__(self):
+    def __init__(self, query_cache: Optional[TTLCache] = None):
         self._model = None
+        self.query_cache = query_cache
         
     @property
-    def model(self) -> SentenceTransformer:
+    def model(self) -> "SentenceTransformer":
         if self._model is None:
+            # Imported on first use: sentence_transformers pulls in torch
+            from sentence_transformers import SentenceTransformer
+            
             logger.info(f"Loading model {settings.MODEL_NAME}")
             self._model = SentenceTransformer(settings.MODEL_NAME)
         return self._model
         
     def compute_embedding(self, text: str) -> np.ndarray:
         """Compute embedding for a single text string"""
-        return self.model.encode([text])[0]
+        with span("embedding_encode"):
+            return self.model.encode([text])[0]
+        
+    def compute_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Compute embeddings for a list of texts in one forward pass"""
+        with span("embedding_encode"):
+            return self.model.encode(texts)
         
     def compute_item_embedding(self, item: models.Item) -> np.ndarray:
         """Compute embedding for a fitness content item"""
@@ -64,7 +87,8 @@ class EmbeddingService:
                 batch_ids.append(item.id)
                 
             # Compute embeddings for the batch
-            batch_embeddings = self.model.encode(texts)
+            with span("embedding_encode"):
+                batch_embeddings = self.model.encode(texts)
             
             # Store results
             for item_id, embedding in zip(batch_ids, batch_embeddings):
@@ -72,5 +96,117 @@ class EmbeddingService:
                 
         return embeddings
 
+class QueryEmbeddingBatcher:
+    """Coalesces concurrent query embeddings into batched forward passes.
+    
+    Callers await `embed`; a single worker task takes the first queued query,
+    waits up to `max_wait_ms` for more (or until `max_batch_size`), then
+    encodes the distinct texts in one `model.encode` call on the CPU executor.
+    While a batch is encoding, new queries queue up and form the next batch.
+    Each caller's request reports the encode of the batch it waited on.
+    """
+
+    def __init__(self, service: EmbeddingService, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.service = service
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = create_detached_task(self._run())
+        return self._queue
+
+    async def embed(self, query: str) -> np.ndarray:
+        """Embed a search query, sharing a forward pass with concurrent callers"""
+        key = normalize_query(query)
+        cache = self.service.query_cache
+        if cache is not None:
+            embedding = cache.get(key)
+            if embedding is not None:
+                return embedding
+
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_worker().put_nowait((key, future))
+        embedding, seconds = await future
+        record_request_span("embedding_encode", seconds)
+        return embedding
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        queue = self._queue
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        EMBEDDING_BATCH_WAIT.observe(loop.time() - started)
+        return batch
+
+    def _encode(self, texts: List[str]) -> Tuple[np.ndarray, float]:
+        start = time.perf_counter()
+        vectors = self.service.compute_embeddings(texts)
+        return vectors, time.perf_counter() - start
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            texts = list(dict.fromkeys(key for key, _ in batch))
+            EMBEDDING_BATCH_SIZE.observe(len(texts))
+            try:
+                vectors, seconds = await stage_executor.run(self._encode, texts)
+            except Exception as e:
+                logger.error(f"Batched query embedding failed: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            embeddings = dict(zip(texts, vectors))
+            if self.service.query_cache is not None:
+                self.service.query_cache.set_many(embeddings)
+            for key, future in batch:
+                if not future.done():
+                    future.set_result((embeddings[key], seconds))
+
+    async def close(self) -> None:
+        """Stop the worker task; queries still queued are cancelled"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._worker = None
+
 # Global instance
-embedding_service = EmbeddingService()
\ No newline at end of file
+embedding_service = EmbeddingService(
+    TTLCache(
+        "query_embeddings",
+        max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+    )
+)
+query_embedding_batcher = QueryEmbeddingBatcher(
+    embedding_service,
+    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+    max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS
+)
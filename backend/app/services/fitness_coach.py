@@ -4,6 +4,8 @@ from langchain.chains import ConversationChain
 from langchain.memory import ConversationBufferMemory
 from langchain.llms import OpenAI
 
+from ..core.instrumentation import span
+
 class FitnessCoachService:
     def __init__(self, api_key: str, model_name: str = "gpt-4"):
         self.llm = OpenAI(openai_api_key=api_key, model_name=model_name)
@@ -48,5 +50,6 @@ class FitnessCoachService:
                     )
 
         # Get response from the model
-        response = await self.conversation.arun(input=message)
+        with span("llm_call"):
+            response = await self.conversation.arun(input=message)
         return response.strip()
\ No newline at end of file
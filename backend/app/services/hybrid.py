@@ -0,0 +1,134 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import asyncio
+import logging
+
+from ..core.concurrency import stage_executor
+from ..core.config import settings
+from ..core.metrics import HYBRID_RESPONSES, HYBRID_STAGE_TIMEOUTS
+from .indexer import indexer_service
+from .popularity import popularity_service
+from .recommender import recommender
+
+logger = logging.getLogger(__name__)
+
+class HybridResult(NamedTuple):
+    items: List[Tuple[int, float]]
+    sources: List[str]  # Sources that contributed: collaborative, content or popularity
+    degraded: bool  # A stage was dropped, so a full blend may have scored differently
+
+class HybridRecommender:
+    """Hybrid recommendations under a latency budget.
+
+    Collaborative and content scoring run concurrently, each limited to its
+    slice of the time left before the request's deadline. A stage that
+    overruns or fails is dropped and the response is blended from what
+    remains; with neither source available it falls back to the
+    precomputed popularity ranking.
+
+    FAISS and ALS calls cannot be interrupted, so a dropped stage still
+    finishes on its executor thread. Each stage therefore holds one of its
+    `max_running` slots until its thread is done, not until the request
+    gives up; a call dropped while still queued for a thread is cancelled.
+    Under overload, abandoned work cannot pile up past `max_running` per
+    stage.
+    """
+
+    def __init__(self, stage_budgets_ms: Dict[str, float], max_running: int = 8):
+        self.stage_budgets = {stage: ms / 1000 for stage, ms in stage_budgets_ms.items()}
+        self.max_running = max_running
+        self._running: Dict[str, asyncio.Semaphore] = {}
+
+    def _slots(self, stage: str) -> asyncio.Semaphore:
+        semaphore = self._running.get(stage)
+        if semaphore is None:
+            semaphore = self._running[stage] = asyncio.Semaphore(self.max_running)
+        return semaphore
+
+    async def _run_stage(
+        self,
+        stage: str,
+        deadline: float,
+        fn: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any
+    ) -> Optional[List[Tuple[int, float]]]:
+        """Run a scoring stage within its slice; None if it was dropped"""
+        loop = asyncio.get_running_loop()
+        timeout = min(self.stage_budgets.get(stage, float("inf")), deadline - loop.time())
+        if timeout <= 0:
+            HYBRID_STAGE_TIMEOUTS.labels(stage=stage).inc()
+            return None
+        expires = loop.time() + timeout
+        slots = self._slots(stage)
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout)
+        except asyncio.TimeoutError:
+            HYBRID_STAGE_TIMEOUTS.labels(stage=stage).inc()
+            return None
+
+        # Released when the thread is done, or once a call still queued for
+        # a thread is cancelled, not when this request stops waiting
+        def release(_: Any) -> None:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(slots.release)
+
+        scoring = stage_executor.submit(fn, *args, **kwargs)
+        scoring.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(scoring), expires - loop.time())
+        except asyncio.TimeoutError:
+            HYBRID_STAGE_TIMEOUTS.labels(stage=stage).inc()
+            return None
+        except Exception as e:
+            logger.error(f"Hybrid {stage} stage failed: {str(e)}")
+            return None
+
+    async def recommend(
+        self,
+        user_id: int,
+        deadline: float,
+        item_id: Optional[int] = None,
+        n_items: int = 10,
+        alpha: float = 0.5,
+        viewed_items: List[int] = None
+    ) -> HybridResult:
+        """Blend whatever sources finish before `deadline` (event loop time)"""
+        stages = [
+            self._run_stage(
+                "collaborative",
+                deadline,
+                recommender.get_user_recommendations,
+                user_id,
+                n_items=n_items * 2,  # Get more for blending
+                viewed_items=viewed_items
+            )
+        ]
+        if item_id:
+            stages.append(self._run_stage("content", deadline, indexer_service.find_similar, item_id, k=n_items * 2))
+        results = await asyncio.gather(*stages)
+        cf_recs = results[0] or []
+        cb_recs = (results[1] or []) if item_id else []
+        degraded = any(result is None for result in results)
+
+        sources = []
+        if cf_recs:
+            sources.append("collaborative")
+        if cb_recs:
+            sources.append("content")
+        if sources:
+            # A lone source keeps its own ranking rather than being scaled by alpha
+            weight = alpha if len(sources) == 2 else float(bool(cf_recs))
+            items = recommender.blend(cf_recs, cb_recs, n_items=n_items, alpha=weight, viewed_items=viewed_items)
+        else:
+            items = popularity_service.top(n_items, exclude=viewed_items or [])
+            if items:
+                sources.append("popularity")
+
+        HYBRID_RESPONSES.labels(sources="+".join(sources) or "none").inc()
+        return HybridResult(items, sources, degraded)
+
+# Global instance
+hybrid_recommender = HybridRecommender(
+    settings.HYBRID_STAGE_BUDGETS_MS,
+    max_running=settings.HYBRID_STAGE_MAX_RUNNING
+)
@@ -1,70 +1,165 @@
-from typing import Dict, List, Optional
-import faiss
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 import numpy as np
 import json
 import os
 import logging
+import time
+import uuid
 from datetime import datetime
 
 from ..core.config import settings
+from ..core.instrumentation import live_gauges, span
 from ..db import models
 from .embeddings import embedding_service
 
+if TYPE_CHECKING:
+    import faiss
+
 logger = logging.getLogger(__name__)
 
 class IndexerService:
     def __init__(self):
-        self.index: Optional[faiss.Index] = None
-        self.item_mapping: Dict[int, int] = {}  # item_id -> faiss_id
-        self.reverse_mapping: Dict[int, int] = {}  # faiss_id -> item_id
+        # (index, item_id -> faiss_id, faiss_id -> item_id), swapped as one reference
+        # so a search running on an executor thread never pairs an index with
+        # another index's mappings
+        self._state: Optional[Tuple["faiss.Index", Dict[int, int], Dict[int, int]]] = None
+        self.version = uuid.uuid4().hex  # Snapshot token, changes with the index contents
+        self.mmapped = False  # Index vectors are a read-only view of the saved file
+        self.dirty = False  # Local changes not yet saved; blocks reloading over them
+        self._checked_at = 0.0
+        
+    @property
+    def index(self) -> Optional["faiss.Index"]:
+        return self._state[0] if self._state is not None else None
+        
+    @property
+    def item_mapping(self) -> Dict[int, int]:
+        return self._state[1] if self._state is not None else {}
+        
+    @property
+    def reverse_mapping(self) -> Dict[int, int]:
+        return self._state[2] if self._state is not None else {}
         
     def initialize_index(self, dimension: int = 384) -> None:
         """Initialize a new FAISS index"""
-        self.index = faiss.IndexFlatL2(dimension)
-        self.item_mapping = {}
-        self.reverse_mapping = {}
+        import faiss
+        
+        self._state = (faiss.IndexFlatL2(dimension), {}, {})
+        self.version = uuid.uuid4().hex
+        self.mmapped = False
+        self.dirty = True
+        
+    def _read_mapping(self) -> Optional[dict]:
+        if not os.path.exists(settings.ITEM_MAPPING_PATH):
+            return None
+        with open(settings.ITEM_MAPPING_PATH, 'r') as f:
+            return json.load(f)
         
     def load_index(self) -> bool:
-        """Load saved index and mappings from disk"""
+        """Load saved index and mappings from disk.
+        
+        With FAISS_MMAP the vectors are memory-mapped rather than read, so
+        every worker process serves from the same page-cache pages.
+        """
+        import faiss
+        
         try:
-            if os.path.exists(settings.FAISS_INDEX_PATH):
-                self.index = faiss.read_index(settings.FAISS_INDEX_PATH)
+            mapping_data = self._read_mapping()
+            index_path = settings.FAISS_INDEX_PATH
+            if mapping_data and mapping_data.get('index_file'):
+                index_path = os.path.join(os.path.dirname(settings.FAISS_INDEX_PATH), mapping_data['index_file'])
+            if not os.path.exists(index_path):
+                return False
                 
-                if os.path.exists(settings.ITEM_MAPPING_PATH):
-                    with open(settings.ITEM_MAPPING_PATH, 'r') as f:
-                        mapping_data = json.load(f)
-                        self.item_mapping = {
-                            int(k): int(v) 
-                            for k, v in mapping_data['item_mapping'].items()
-                        }
-                        self.reverse_mapping = {
-                            int(v): int(k) 
-                            for k, v in self.item_mapping.items()
-                        }
-                return True
+            # Needs a faiss build with in-place mmap support (IO_FLAG_MMAP_IFC)
+            mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+            if settings.FAISS_MMAP and mmap_flag is not None:
+                index = faiss.read_index(index_path, mmap_flag)
+            else:
+                index = faiss.read_index(index_path)
+                
+            item_mapping = {}
+            if mapping_data:
+                item_mapping = {
+                    int(k): int(v) 
+                    for k, v in mapping_data['item_mapping'].items()
+                }
+            self._state = (index, item_mapping, {v: k for k, v in item_mapping.items()})
+            self.version = (mapping_data or {}).get('version') or uuid.uuid4().hex
+            self.mmapped = settings.FAISS_MMAP and mmap_flag is not None
+            self.dirty = False
+            return True
         except Exception as e:
             logger.error(f"Error loading index: {e}")
             return False
             
-        return False
+    def maybe_reload(self) -> None:
+        """Pick up an index saved by another worker, checked at most every
+        ARTIFACT_RELOAD_INTERVAL_SECONDS"""
+        now = time.monotonic()
+        if self.dirty or now - self._checked_at < settings.ARTIFACT_RELOAD_INTERVAL_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            mapping_data = self._read_mapping()
+        except ValueError:
+            # Caught mid-write by a non-atomic writer; try again next interval
+            return
+        if mapping_data and mapping_data.get('version') not in (None, self.version):
+            logger.info(f"Reloading index version {mapping_data['version']}")
+            self.load_index()
+        
+    def _ensure_writable(self) -> None:
+        """Swap a memory-mapped index for a private copy before modifying it"""
+        import faiss
+        
+        if self.mmapped:
+            index, item_mapping, reverse_mapping = self._state
+            self._state = (faiss.deserialize_index(faiss.serialize_index(index)), item_mapping, reverse_mapping)
+            self.mmapped = False
         
     def save_index(self) -> None:
-        """Save index and mappings to disk"""
-        if self.index is None:
+        """Save index and mappings to disk.
+        
+        Each save writes a new versioned index file and then atomically
+        replaces the mapping that names it, so a reader never pairs an index
+        with the wrong mapping. Processes still mapping an older file keep
+        it until they reload; all but the previous file are removed.
+        """
+        state = self._state
+        if state is None:
             return
+        index, item_mapping, _ = state
             
         # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(settings.FAISS_INDEX_PATH), exist_ok=True)
+        index_dir = os.path.dirname(settings.FAISS_INDEX_PATH)
+        os.makedirs(index_dir, exist_ok=True)
         
         # Save FAISS index
-        faiss.write_index(self.index, settings.FAISS_INDEX_PATH)
+        import faiss
+        
+        index_path = f"{settings.FAISS_INDEX_PATH}.{self.version}"
+        faiss.write_index(index, index_path + ".tmp")
+        os.replace(index_path + ".tmp", index_path)
         
         # Save mapping
-        with open(settings.ITEM_MAPPING_PATH, 'w') as f:
+        previous = self._read_mapping() or {}
+        tmp_path = settings.ITEM_MAPPING_PATH + ".tmp"
+        with open(tmp_path, 'w') as f:
             json.dump({
-                'item_mapping': self.item_mapping,
+                'item_mapping': item_mapping,
+                'version': self.version,
+                'index_file': os.path.basename(index_path),
                 'updated_at': datetime.utcnow().isoformat()
             }, f)
+        os.replace(tmp_path, settings.ITEM_MAPPING_PATH)
+        self.dirty = False
+        
+        keep = {os.path.basename(index_path), previous.get('index_file')}
+        prefix = os.path.basename(settings.FAISS_INDEX_PATH) + "."
+        for name in os.listdir(index_dir or "."):
+            if name.startswith(prefix) and not name.endswith(".tmp") and name not in keep:
+                os.unlink(os.path.join(index_dir, name))
             
     def add_items(self, items: List[models.Item]) -> None:
         """Add new items to the index"""
@@ -79,16 +174,28 @@ class IndexerService:
         # Compute embeddings in batch
         embeddings = embedding_service.compute_batch_embeddings(items)
         
-        # Add to FAISS index
-        for item in items:
-            if item.id not in self.item_mapping and item.id in embeddings:
-                embedding = embeddings[item.id]
-                faiss_id = self.index.ntotal
-                self.index.add(embedding.reshape(1, -1))
+        # Add to FAISS index in one call
+        new_ids = [
+            item.id for item in items
+            if item.id not in self.item_mapping and item.id in embeddings
+        ]
+        if new_ids:
+            self._ensure_writable()
+            index, item_mapping, reverse_mapping = self._state
+            first_faiss_id = index.ntotal
+            index.add(np.vstack([embeddings[item_id] for item_id in new_ids]))
+            
+            # New mappings are swapped in whole; until then searches skip the
+            # new vectors, whose ids the old mappings do not know
+            item_mapping = dict(item_mapping)
+            reverse_mapping = dict(reverse_mapping)
+            for offset, item_id in enumerate(new_ids):
+                item_mapping[item_id] = first_faiss_id + offset
+                reverse_mapping[first_faiss_id + offset] = item_id
+            self._state = (index, item_mapping, reverse_mapping)
                 
-                # Update mappings
-                self.item_mapping[item.id] = faiss_id
-                self.reverse_mapping[faiss_id] = item.id
+        self.version = uuid.uuid4().hex
+        self.dirty = True
                 
     def rebuild_index(self, items: List[models.Item]) -> None:
         """Rebuild the entire index from scratch"""
@@ -108,17 +215,21 @@ class IndexerService:
         k: int = 10
     ) -> List[tuple[int, float]]:
         """Search for similar items given a query embedding"""
-        if self.index is None or self.index.ntotal == 0:
+        self.maybe_reload()
+        state = self._state
+        if state is None or state[0].ntotal == 0:
             return []
+        index, _, reverse_mapping = state
             
         # Search in FAISS index
-        D, I = self.index.search(query_embedding.reshape(1, -1), k)
+        with span("faiss_search"):
+            D, I = index.search(query_embedding.reshape(1, -1), k)
         
         # Convert to item IDs with scores
         results = []
         for dist, faiss_id in zip(D[0], I[0]):
-            if faiss_id in self.reverse_mapping:
-                item_id = self.reverse_mapping[faiss_id]
+            if faiss_id in reverse_mapping:
+                item_id = reverse_mapping[faiss_id]
                 similarity = 1.0 / (1.0 + dist)  # Convert distance to similarity
                 results.append((item_id, similarity))
                 
@@ -130,25 +241,41 @@ class IndexerService:
         k: int = 10
     ) -> List[tuple[int, float]]:
         """Find similar items to a given item"""
-        if self.index is None or item_id not in self.item_mapping:
+        self.maybe_reload()
+        state = self._state
+        if state is None or item_id not in state[1]:
             return []
+        index, item_mapping, reverse_mapping = state
             
         # Get query item's vector
-        faiss_id = self.item_mapping[item_id]
-        query_vector = self.index.reconstruct(faiss_id)
+        faiss_id = item_mapping[item_id]
+        query_vector = index.reconstruct(faiss_id)
         
         # Search
-        D, I = self.index.search(query_vector.reshape(1, -1), k + 1)
+        with span("faiss_search"):
+            D, I = index.search(query_vector.reshape(1, -1), k + 1)
         
         # Convert results (skip first result as it's the query item)
         results = []
         for dist, faiss_id in zip(D[0][1:], I[0][1:]):
-            if faiss_id in self.reverse_mapping:
-                similar_id = self.reverse_mapping[faiss_id]
+            if faiss_id in reverse_mapping:
+                similar_id = reverse_mapping[faiss_id]
                 similarity = 1.0 / (1.0 + dist)
                 results.append((similar_id, similarity))
                 
         return results
 
 # Global instance
-indexer_service = IndexerService()
\ No newline at end of file
+indexer_service = IndexerService()
+
+live_gauges.register(
+    "fitrecs_index_size",
+    "Vectors in the served FAISS index",
+    lambda: indexer_service.index.ntotal if indexer_service.index is not None else 0
+)
+live_gauges.register(
+    "fitrecs_index_info",
+    "Version of the served FAISS index (always 1)",
+    lambda: {(indexer_service.version,): 1},
+    ["version"]
+)
\ No newline at end of file
@@ -0,0 +1,292 @@
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+import asyncio
+import glob
+import itertools
+import json
+import logging
+import os
+import time
+
+from .. import crud
+from ..core.concurrency import ProcessLock
+from ..core.config import settings
+from ..core.metrics import (
+    INTERACTION_BUFFER_DEPTH,
+    INTERACTION_BUFFER_REJECTED,
+    INTERACTION_FLUSH_BATCH_SIZE,
+    INTERACTION_FLUSH_SECONDS
+)
+from ..db.models import InteractionType
+from ..db.session import AsyncSessionLocal
+from .response_cache import response_cache
+from .user_profiles import user_profile_service
+
+logger = logging.getLogger(__name__)
+
+class BufferFull(Exception):
+    """Raised when the write-behind buffer stays full past the put timeout"""
+
+class InteractionBuffer:
+    """Write-behind buffer that turns per-event interaction writes into bulk inserts.
+
+    Accepted rows wait in a bounded in-process queue and are flushed with
+    `crud.interaction.create_many` every `flush_interval_ms`, or sooner once
+    `flush_batch_size` rows are queued. Producers block for up to
+    `put_timeout_ms` when the queue is full, then get `BufferFull`.
+
+    With `log_path` set, every accepted row is appended to a JSON-lines log
+    as it is queued, and a checkpoint line is written after each
+    committed flush. `start` replays rows logged after the last checkpoint,
+    so a crash loses nothing that was acknowledged; a crash between commit
+    and checkpoint replays that batch once more (at-least-once).
+    
+    Each worker process claims its own log slot (`log_path`, then
+    `log_path.1`, `log_path.2`, ...) by locking it. A slot left by a dead
+    worker is unlocked, so the worker that replaces it claims and replays it.
+    Slots nobody claims, such as the higher ones after a restart with fewer
+    workers, are merged into the log of the worker that starts next.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        flush_interval_ms: float = 200,
+        flush_batch_size: int = 500,
+        put_timeout_ms: float = 100,
+        log_path: Optional[str] = None,
+        session_factory: Callable[[], Any] = AsyncSessionLocal
+    ):
+        self.max_size = max_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.flush_batch_size = flush_batch_size
+        self.put_timeout = put_timeout_ms / 1000.0
+        self.log_path = log_path
+        self.session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._retry: List[dict] = []
+        self._worker: Optional[asyncio.Task] = None
+        self._log = None
+        self._log_slot: Optional[ProcessLock] = None
+        self.log_file: Optional[str] = None  # This process's slot of the append log
+        self._seq = 0
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self) -> None:
+        """Replay un-flushed rows from the append log and start the flush loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._batch_ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._stopping = False
+        self._flush_lock = asyncio.Lock()
+        if self.log_path:
+            self.log_file, self._log_slot = self._claim_log_slot()
+            replayed, self._seq = self._read_log(self.log_file)
+            self._log = open(self.log_file, "a", encoding="utf-8")
+            replayed += self._merge_orphaned_logs()
+            if replayed:
+                logger.info(f"Replaying {len(replayed)} logged interactions")
+                self._retry = replayed
+                await self.flush()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and flush everything still buffered"""
+        if self._worker is not None:
+            self._stopping = True
+            self._batch_ready.set()
+            await self._worker
+            self._worker = None
+        if self._queue is not None:
+            await self.flush()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self._log_slot is not None:
+            self._log_slot.release()
+            self._log_slot = None
+
+    def _claim_log_slot(self) -> Tuple[str, ProcessLock]:
+        """Lock the first log slot no live process holds"""
+        for slot in itertools.count():
+            path = self.log_path if slot == 0 else f"{self.log_path}.{slot}"
+            lock = ProcessLock(f"{path}.lock")
+            if lock.try_acquire():
+                return path, lock
+
+    def _merge_orphaned_logs(self) -> List[dict]:
+        """Move un-flushed rows from every other unclaimed slot into this process's log.
+
+        The rows are appended and synced before the orphaned log is removed,
+        so a crash in between replays them twice at worst, never zero times.
+        """
+        prefix = f"{self.log_path}."
+        paths = [self.log_path] + [
+            path for path in glob.glob(glob.escape(prefix) + "*") if path[len(prefix):].isdigit()
+        ]
+        merged = []
+        for path in paths:
+            if path == self.log_file or not os.path.exists(path):
+                continue
+            lock = ProcessLock(f"{path}.lock")
+            if not lock.try_acquire():
+                continue
+            try:
+                rows, _ = self._read_log(path)
+                for row in rows:
+                    self._append_log(row)
+                os.fsync(self._log.fileno())
+                os.remove(path)
+            finally:
+                lock.release()
+            if rows:
+                logger.info(f"Merged {len(rows)} logged interactions from unclaimed {path}")
+            merged += rows
+        return merged
+
+    async def put_many(self, rows: List[dict]) -> None:
+        """Queue interaction rows, waiting up to put_timeout_ms for space.
+
+        Each row holds user_id, item_id, interaction_type and created_at.
+        Either every row is queued or, on `BufferFull`, none is.
+        """
+        if not self.running:
+            raise RuntimeError("Interaction buffer is not running")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.put_timeout
+        while self.max_size - self._queue.qsize() < len(rows):
+            remaining = deadline - loop.time()
+            if remaining <= 0 or len(rows) > self.max_size:
+                INTERACTION_BUFFER_REJECTED.inc(len(rows))
+                raise BufferFull("Interaction buffer is full")
+            self._batch_ready.set()
+            self._space.clear()
+            try:
+                await asyncio.wait_for(self._space.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        # Queue and log without yielding so log order always matches queue order
+        for row in rows:
+            self._queue.put_nowait(row)
+            self._append_log(row)
+        INTERACTION_BUFFER_DEPTH.set(self._queue.qsize())
+        if self._queue.qsize() >= self.flush_batch_size:
+            self._batch_ready.set()
+
+    async def put(self, row: dict) -> None:
+        await self.put_many([row])
+
+    async def flush(self) -> int:
+        """Write all queued rows in batches of flush_batch_size; returns rows written"""
+        written = 0
+        async with self._flush_lock:
+            while True:
+                batch, self._retry = self._retry, []
+                while len(batch) < self.flush_batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                INTERACTION_BUFFER_DEPTH.set(self._queue.qsize())
+                self._space.set()
+                if not batch:
+                    break
+                try:
+                    await self._write(batch)
+                except Exception as e:
+                    logger.error(f"Interaction flush failed, will retry: {str(e)}")
+                    self._retry = batch
+                    break
+                written += len(batch)
+            self._checkpoint()
+        return written
+
+    async def _write(self, batch: List[dict]) -> None:
+        start = time.perf_counter()
+        async with self.session_factory() as db:
+            await crud.interaction.create_many(db, batch)
+        INTERACTION_FLUSH_SECONDS.observe(time.perf_counter() - start)
+        INTERACTION_FLUSH_BATCH_SIZE.observe(len(batch))
+        user_ids = {row["user_id"] for row in batch}
+        user_profile_service.invalidate(user_ids)
+        for user_id in user_ids:
+            await response_cache.invalidate_user(user_id)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    def _append_log(self, row: dict) -> None:
+        if self._log is None:
+            return
+        self._seq += 1
+        self._log.write(json.dumps({
+            "seq": self._seq,
+            "user_id": row["user_id"],
+            "item_id": row["item_id"],
+            "interaction_type": InteractionType(row["interaction_type"]).value,
+            "created_at": row["created_at"].isoformat()
+        }) + "\n")
+        self._log.flush()
+
+    def _checkpoint(self) -> None:
+        """Record that every logged row up to now is committed"""
+        if self._log is None or self._retry:
+            return
+        if self._queue.empty():
+            # Nothing outstanding: start a fresh log instead of growing this one
+            self._log.truncate(0)
+            self._log.seek(0)
+        else:
+            # Rows still queued were logged after the committed ones; checkpoint
+            # at the last committed position so they replay after a crash
+            self._log.write(json.dumps({"checkpoint": self._seq - self._queue.qsize()}) + "\n")
+            self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def _read_log(self, path: str) -> Tuple[List[dict], int]:
+        """Rows logged after the last checkpoint, and the last sequence number"""
+        if not os.path.exists(path):
+            return [], 0
+        entries, checkpoint = [], 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn final write from a crash
+                    continue
+                if "checkpoint" in entry:
+                    checkpoint = entry["checkpoint"]
+                else:
+                    entries.append(entry)
+        last_seq = max((entry["seq"] for entry in entries), default=0)
+        rows = [
+            {
+                "user_id": entry["user_id"],
+                "item_id": entry["item_id"],
+                "interaction_type": InteractionType(entry["interaction_type"]),
+                "created_at": datetime.fromisoformat(entry["created_at"])
+            }
+            for entry in entries
+            if entry["seq"] > checkpoint
+        ]
+        return rows, last_seq
+
+# Global instance
+interaction_buffer = InteractionBuffer(
+    max_size=settings.INTERACTION_BUFFER_MAX_SIZE,
+    flush_interval_ms=settings.INTERACTION_FLUSH_INTERVAL_MS,
+    flush_batch_size=settings.INTERACTION_FLUSH_BATCH_SIZE,
+    put_timeout_ms=settings.INTERACTION_BUFFER_PUT_TIMEOUT_MS,
+    log_path=settings.INTERACTION_BUFFER_LOG_PATH
+)
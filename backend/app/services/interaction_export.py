@@ -0,0 +1,235 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import takewhile
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Sequence
+import asyncio
+import json
+import logging
+import os
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.concurrency import ProcessLock, stage_executor
+from ..core.config import settings
+from ..db.models import Interaction, InteractionType
+from ..db.session import AsyncSessionLocal
+from .recommender import INTERACTION_WEIGHTS
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Fixed dictionary so every file encodes interaction_type with the same codes
+INTERACTION_TYPES = list(InteractionType)
+TYPE_CODES = {member: code for code, member in enumerate(INTERACTION_TYPES)}
+WEIGHTS_BY_CODE = np.array([INTERACTION_WEIGHTS[member] for member in INTERACTION_TYPES], np.float32)
+
+# pyarrow is imported on first export or load, not with the app
+@lru_cache(maxsize=None)
+def type_dictionary() -> "pa.Array":
+    import pyarrow as pa
+    
+    return pa.array([member.value for member in INTERACTION_TYPES], pa.string())
+
+@lru_cache(maxsize=None)
+def arrow_schema() -> "pa.Schema":
+    import pyarrow as pa
+    
+    return pa.schema([
+        ("id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("item_id", pa.int64()),
+        ("interaction_type", pa.dictionary(pa.int8(), pa.string())),
+        ("created_at", pa.timestamp("us")),
+    ])
+
+class InteractionExporter:
+    """Incremental export of the interactions table to Arrow IPC files.
+
+    Rows with an id above the high-water mark in `_manifest.json` are written
+    to `month=YYYY-MM/part-<first id>.arrow`, partitioned by created_at.
+    Arrow IPC files can be memory-mapped, so training reads the columns
+    without copying them through the database driver or the ORM.
+
+    Rows younger than `lag_seconds` are left for the next run: ids are
+    assigned at insert but become visible at commit, so a fresh row can
+    still be followed by a lower id from a slower transaction.
+    
+    Runs hold an exclusive lock on `_export.lock`, so exports started by
+    several workers (or the export script) never interleave.
+    """
+
+    def __init__(self, export_dir: str, batch_rows: int = 100000, lag_seconds: int = 60):
+        self.export_dir = Path(export_dir)
+        self.batch_rows = batch_rows
+        self.lag_seconds = lag_seconds
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.export_dir / "_manifest.json"
+
+    def read_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {"high_water_mark": 0, "rows": 0}
+        return json.loads(self.manifest_path.read_text())
+
+    def write_manifest(self, manifest: dict) -> None:
+        """Atomically replace the manifest; also used by tools that write export files"""
+        tmp = self.manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, self.manifest_path)
+
+    def _write_batch(self, rows: Sequence) -> None:
+        """Write one batch of (id, user_id, item_id, interaction_type, created_at) rows"""
+        n = len(rows)
+        self.write_columns(
+            np.fromiter((row[0] for row in rows), np.int64, n),
+            np.fromiter((row[1] for row in rows), np.int64, n),
+            np.fromiter((row[2] for row in rows), np.int64, n),
+            np.fromiter((TYPE_CODES[row[3]] for row in rows), np.int8, n),
+            np.array([row[4] for row in rows], dtype="datetime64[us]")
+        )
+
+    def write_columns(
+        self,
+        ids: np.ndarray,
+        user_ids: np.ndarray,
+        item_ids: np.ndarray,
+        codes: np.ndarray,
+        created_at: np.ndarray
+    ) -> None:
+        """Write interaction columns into month partitions.
+
+        `codes` index INTERACTION_TYPES; `ids` must be ascending and must not
+        overlap ids already written, since files are named by first id.
+        """
+        import pyarrow as pa
+        
+        schema = arrow_schema()
+        months = created_at.astype("datetime64[M]")
+
+        for month in np.unique(months):
+            mask = months == month
+            batch = pa.record_batch([
+                pa.array(ids[mask]),
+                pa.array(user_ids[mask]),
+                pa.array(item_ids[mask]),
+                pa.DictionaryArray.from_arrays(pa.array(codes[mask]), type_dictionary()),
+                pa.array(created_at[mask]),
+            ], schema=schema)
+
+            partition = self.export_dir / f"month={month}"
+            partition.mkdir(parents=True, exist_ok=True)
+            # Named by first id so re-running after a crash overwrites, not duplicates
+            path = partition / f"part-{ids[mask][0]:012d}.arrow"
+            tmp = path.with_suffix(".tmp")
+            with pa.OSFile(str(tmp), "wb") as sink:
+                with pa.ipc.new_file(sink, schema) as writer:
+                    writer.write_batch(batch)
+            os.replace(tmp, path)
+
+    async def export(self, db: AsyncSession) -> int:
+        """Export interactions added since the last run; returns rows exported"""
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        lock = ProcessLock(str(self.export_dir / "_export.lock"))
+        await lock.acquire()
+        try:
+            return await self._export(db)
+        finally:
+            lock.release()
+
+    async def _export(self, db: AsyncSession) -> int:
+        manifest = self.read_manifest()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lag_seconds)
+
+        query = (
+            select(
+                Interaction.id,
+                Interaction.user_id,
+                Interaction.item_id,
+                Interaction.interaction_type,
+                Interaction.created_at
+            )
+            .where(Interaction.id > manifest["high_water_mark"])
+            .order_by(Interaction.id)
+            .execution_options(yield_per=self.batch_rows)
+        )
+        result = await db.stream(query)
+        exported = 0
+        async for partition in result.partitions():
+            # Only the unbroken run before the first row inside the lag window:
+            # created_at is not monotonic in id, and the mark must not skip a row
+            rows = list(takewhile(lambda row: row.created_at <= cutoff, partition))
+            if rows:
+                await stage_executor.run(self._write_batch, rows)
+                manifest["high_water_mark"] = rows[-1].id
+                manifest["rows"] += len(rows)
+                manifest["updated_at"] = datetime.utcnow().isoformat()
+                self.write_manifest(manifest)
+                exported += len(rows)
+            if len(rows) < len(partition):
+                # Reached rows inside the lag window; the next run resumes here
+                break
+        await result.close()
+
+        logger.info(f"Exported {exported} interactions up to id {manifest['high_water_mark']}")
+        return exported
+
+    def files(self) -> List[Path]:
+        return sorted(self.export_dir.glob("month=*/part-*.arrow"))
+
+    def load_columns(self) -> Dict[str, np.ndarray]:
+        """Memory-map every export file and return user_ids, item_ids and weights.
+
+        The mapped columns are read in place; only the concatenation across
+        files and the weight lookup allocate.
+        """
+        import pyarrow as pa
+        
+        user_ids, item_ids, weights = [], [], []
+        for path in self.files():
+            table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+            for batch in table.to_batches():
+                user_ids.append(batch.column("user_id").to_numpy())
+                item_ids.append(batch.column("item_id").to_numpy())
+                weights.append(WEIGHTS_BY_CODE[batch.column("interaction_type").indices.to_numpy()])
+        if not user_ids:
+            empty = np.array([], np.int64)
+            return {"user_ids": empty, "item_ids": empty, "weights": np.array([], np.float32)}
+        return {
+            "user_ids": np.concatenate(user_ids),
+            "item_ids": np.concatenate(item_ids),
+            "weights": np.concatenate(weights),
+        }
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Scheduled export loop; run as a background task in every worker.
+
+        Only the worker holding `_scheduler.lock` exports; the others retry
+        the lock each interval and take over if that worker exits.
+        """
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        scheduler = ProcessLock(str(self.export_dir / "_scheduler.lock"))
+        try:
+            while True:
+                await asyncio.sleep(interval_seconds)
+                if not scheduler.try_acquire():
+                    continue
+                try:
+                    async with AsyncSessionLocal() as db:
+                        await self.export(db)
+                except Exception as e:
+                    logger.error(f"Scheduled interaction export failed: {str(e)}")
+        finally:
+            scheduler.release()
+
+# Global instance
+interaction_exporter = InteractionExporter(
+    settings.INTERACTION_EXPORT_DIR,
+    batch_rows=settings.INTERACTION_EXPORT_BATCH_ROWS,
+    lag_seconds=settings.INTERACTION_EXPORT_LAG_SECONDS
+)
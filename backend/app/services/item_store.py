@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud
+from ..core.cache import TTLCache
+from ..core.config import settings
+from .catalog import ItemCatalog, item_catalog
+
+logger = logging.getLogger(__name__)
+
+class ItemStore:
+    """Batched item metadata lookup backed by the columnar catalog and an optional cache"""
+
+    def __init__(
+        self,
+        cache: Optional[TTLCache] = None,
+        catalog: Optional[ItemCatalog] = None
+    ):
+        self.cache = cache
+        self.catalog = catalog
+
+    async def _load(self, db: AsyncSession, item_ids: Sequence[int]) -> Dict[int, dict]:
+        """Resolve item ids to serialized rows with at most one IN query"""
+        ids = list(dict.fromkeys(item_ids))
+        if not ids:
+            return {}
+
+        rows = self.catalog.get_rows(ids) if self.catalog is not None else {}
+        missing = [item_id for item_id in ids if item_id not in rows]
+        if missing and self.cache is not None:
+            rows.update(self.cache.get_many(missing))
+            missing = [item_id for item_id in missing if item_id not in rows]
+        if missing:
+            fetched = await crud.item.get_rows_by_ids(db, missing)
+            if self.cache is not None:
+                self.cache.set_many(fetched)
+            rows.update(fetched)
+
+        return rows
+
+    async def get_items(self, db: AsyncSession, item_ids: Sequence[int]) -> List[dict]:
+        """Fetch serialized items in the given order, dropping missing ids"""
+        rows = await self._load(db, item_ids)
+        return [rows[item_id] for item_id in dict.fromkeys(item_ids) if item_id in rows]
+
+    async def get_item(self, db: AsyncSession, item_id: int) -> Optional[dict]:
+        rows = await self._load(db, [item_id])
+        return rows.get(item_id)
+
+    async def get_scored_items(
+        self,
+        db: AsyncSession,
+        scored_ids: Sequence[Tuple[int, float]]
+    ) -> List[dict]:
+        """Serialize (item_id, score) pairs in recommender order, dropping missing items"""
+        rows = await self._load(db, [item_id for item_id, _ in scored_ids])
+        return [
+            {**rows[item_id], "similarity_score": float(score)}
+            for item_id, score in scored_ids
+            if item_id in rows
+        ]
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Reload the catalog and drop cached rows after items were added or changed"""
+        if self.catalog is not None:
+            await self.catalog.refresh(db)
+        self.invalidate()
+
+    def invalidate(self, item_ids: Optional[Sequence[int]] = None) -> None:
+        """Drop cached rows for the given ids, or everything when no ids are given"""
+        if self.cache is None:
+            return
+        if item_ids is None:
+            self.cache.bump_version()
+            logger.info("Item cache invalidated")
+            return
+        for item_id in item_ids:
+            self.cache.invalidate(item_id)
+
+# Global instance
+item_store = ItemStore(
+    TTLCache(
+        "items",
+        max_size=settings.ITEM_CACHE_MAX_SIZE,
+        ttl_seconds=settings.ITEM_CACHE_TTL_SECONDS
+    ) if settings.ITEM_CACHE_ENABLED else None,
+    catalog=item_catalog if settings.ITEM_CATALOG_ENABLED else None
+)
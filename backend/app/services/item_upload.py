@@ -0,0 +1,238 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import uuid
+
+from .. import crud
+from ..core.concurrency import stage_executor
+from ..core.config import settings
+from ..db.models import DifficultyLevel, Item, ItemType
+from ..db.session import AsyncSessionLocal
+from .indexer import indexer_service
+from .item_store import item_store
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ["title", "type", "tags", "duration", "difficulty"]
+MAX_REPORTED_ERRORS = 20
+
+ITEM_TYPES = {member.value: member for member in ItemType}
+DIFFICULTIES = {member.value: member for member in DifficultyLevel}
+
+def _parse_tags(value: str) -> Optional[List[str]]:
+    """Tags are a JSON list, or a comma-separated string"""
+    value = value.strip()
+    if value.startswith("["):
+        try:
+            tags = json.loads(value)
+        except ValueError:
+            return None
+        return [str(tag) for tag in tags] if isinstance(tags, list) else None
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+def validate_chunk(df: "pd.DataFrame", first_row: int) -> Tuple[List[dict], List[str]]:
+    """Validate a chunk of string columns; returns item rows and per-row errors.
+
+    Column checks run vectorized over the whole chunk; only rows that pass
+    every check are converted to dicts. `first_row` is the 1-based number
+    of the chunk's first data row, used in error messages.
+    """
+    import pandas as pd
+    
+    title = df["title"].str.strip()
+    item_type = df["type"].str.strip().str.lower()
+    difficulty = df["difficulty"].str.strip().str.lower()
+    duration = pd.to_numeric(df["duration"], errors="coerce")
+    tags = df["tags"].map(_parse_tags)
+
+    checks = {
+        "missing title": title.str.len() > 0,
+        "unknown type": item_type.isin(ITEM_TYPES.keys()),
+        "unknown difficulty": difficulty.isin(DIFFICULTIES.keys()),
+        "duration must be a positive whole number": (duration > 0) & (duration % 1 == 0),
+        "tags must be a JSON list or comma-separated": tags.notna(),
+    }
+    valid = pd.Series(True, index=df.index)
+    for check in checks.values():
+        valid &= check.fillna(False).astype(bool)
+
+    errors = []
+    for position in (~valid).to_numpy().nonzero()[0][:MAX_REPORTED_ERRORS]:
+        failed = [message for message, check in checks.items() if not check.iloc[position]]
+        errors.append(f"row {first_row + position}: {', '.join(failed)}")
+
+    empty = pd.Series("", index=df.index)
+    description = df.get("description", empty)
+    media_url = df.get("media_url", empty)
+    rows = []
+    for position in valid.to_numpy().nonzero()[0]:
+        rows.append({
+            "title": title.iloc[position],
+            "type": ITEM_TYPES[item_type.iloc[position]],
+            "description": description.iloc[position] or None,
+            "tags": tags.iloc[position],
+            "duration": int(duration.iloc[position]),
+            "difficulty": DIFFICULTIES[difficulty.iloc[position]],
+            "media_url": media_url.iloc[position] or None,
+        })
+    return rows, errors
+
+def read_header(path: str) -> List[str]:
+    import pandas as pd
+    
+    return list(pd.read_csv(path, nrows=0).columns)
+
+class UploadJob:
+    """Progress of one catalog CSV upload, as tracked by the worker running it"""
+
+    def __init__(self, filename: str):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.status = "queued"
+        self.rows_read = 0
+        self.items_created = 0
+        self.items_indexed = 0
+        self.rows_rejected = 0
+        self.errors: List[str] = []
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    def row(self) -> dict:
+        """Values of the upload_jobs row"""
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "rows_read": self.rows_read,
+            "items_created": self.items_created,
+            "items_indexed": self.items_indexed,
+            "rows_rejected": self.rows_rejected,
+            "errors": list(self.errors),
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+def to_schema(row: dict) -> dict:
+    """An upload_jobs row in the ItemUploadJob schema shape"""
+    row = dict(row)
+    row["job_id"] = row.pop("id")
+    return row
+
+class ItemUploadService:
+    """Streams uploaded catalog CSVs into the database and FAISS index chunk by chunk.
+
+    Each chunk is parsed and validated on the CPU executor, bulk inserted on
+    a dedicated session, then embedded and indexed in the background while
+    the next chunk is parsed. At most one chunk is being indexed at a time,
+    so memory stays bounded by roughly two chunks whatever the file size.
+    
+    Progress is written to the upload_jobs table after every chunk, so any
+    worker can answer status queries for a job another worker is running.
+    """
+
+    def __init__(
+        self,
+        chunk_rows: int = 5000,
+        history: int = 100,
+        session_factory: Callable[[], Any] = AsyncSessionLocal
+    ):
+        self.chunk_rows = chunk_rows
+        self.history = history
+        self.session_factory = session_factory
+
+    async def create_job(self, filename: str) -> UploadJob:
+        job = UploadJob(filename)
+        async with self.session_factory() as db:
+            await crud.upload_job.create(db, job.row())
+            await crud.upload_job.prune(db, self.history)
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        async with self.session_factory() as db:
+            row = await crud.upload_job.get(db, job_id)
+        return to_schema(row) if row is not None else None
+
+    async def _save(self, job: UploadJob) -> None:
+        async with self.session_factory() as db:
+            await crud.upload_job.update(db, job.id, job.row())
+
+    async def _index_chunk(self, job: UploadJob, rows: List[dict], ids: List[int]) -> None:
+        items = [Item(id=item_id, **row) for item_id, row in zip(ids, rows)]
+        await stage_executor.run(indexer_service.add_items, items)
+        job.items_indexed += len(items)
+        await self._save(job)
+
+    async def run(self, job: UploadJob, path: str) -> None:
+        """Process the CSV at `path`, then delete it"""
+        # pandas is imported on first upload, not with the app
+        import pandas as pd
+        
+        job.status = "running"
+        indexing: Optional[asyncio.Task] = None
+        try:
+            await self._save(job)
+            reader: Iterator[pd.DataFrame] = pd.read_csv(
+                path,
+                chunksize=self.chunk_rows,
+                dtype=str,
+                keep_default_na=False
+            )
+            while True:
+                chunk = await stage_executor.run(next, reader, None)
+                if chunk is None:
+                    break
+                first_row = job.rows_read + 1
+                job.rows_read += len(chunk)
+                rows, errors = await stage_executor.run(validate_chunk, chunk, first_row)
+                job.rows_rejected += len(chunk) - len(rows)
+                job.errors.extend(errors[:MAX_REPORTED_ERRORS - len(job.errors)])
+                if not rows:
+                    await self._save(job)
+                    continue
+
+                async with self.session_factory() as db:
+                    ids = await crud.item.create_many(db, rows)
+                job.items_created += len(ids)
+                await self._save(job)
+
+                # Index this chunk while the next one is parsed and inserted
+                if indexing is not None:
+                    await indexing
+                indexing = asyncio.create_task(self._index_chunk(job, rows, ids))
+
+            if indexing is not None:
+                await indexing
+                indexing = None
+            await stage_executor.run(indexer_service.save_index)
+            async with self.session_factory() as db:
+                await item_store.refresh(db)
+            job.status = "completed"
+        except Exception as e:
+            logger.error(f"Upload job {job.id} failed: {str(e)}")
+            if indexing is not None:
+                indexing.cancel()
+            job.status = "failed"
+            job.errors.append(str(e))
+        finally:
+            job.finished_at = datetime.utcnow()
+            os.unlink(path)
+            try:
+                await self._save(job)
+            except Exception as e:
+                logger.error(f"Could not record the end of upload job {job.id}: {str(e)}")
+        logger.info(
+            f"Upload job {job.id} {job.status}: {job.items_created} created, "
+            f"{job.rows_rejected} rejected"
+        )
+
+# Global instance
+item_upload_service = ItemUploadService(
+    chunk_rows=settings.UPLOAD_CHUNK_ROWS,
+    history=settings.UPLOAD_JOB_HISTORY
+)
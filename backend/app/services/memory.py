@@ -0,0 +1,199 @@
+from typing import Any, Dict, List, Optional
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+from ..core.cache import TTLCache, registered_caches
+from ..core.instrumentation import live_gauges
+from .catalog import item_catalog
+from .embeddings import embedding_service
+from .indexer import indexer_service
+from .recommender import recommender
+
+# Cache entries measured per cache; the total is extrapolated from the sample
+CACHE_SAMPLE_SIZE = 32
+
+def deep_sizeof(value: Any, depth: int = 4) -> int:
+    """Approximate bytes held by a value; containers are walked to `depth`"""
+    if isinstance(value, np.ndarray):
+        return sys.getsizeof(value) + (0 if isinstance(value, np.memmap) else value.nbytes)
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, depth - 1) + deep_sizeof(v, depth - 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, depth - 1) for v in value)
+    return size
+
+def int_dict_bytes(mapping: Dict[int, int]) -> int:
+    """Bytes of an int -> int dict without walking it: table plus two int objects per entry"""
+    return sys.getsizeof(mapping) + len(mapping) * 2 * sys.getsizeof(2 ** 30)
+
+def array_entry(array: Optional[np.ndarray]) -> Dict[str, Any]:
+    """Size of an array; memory-mapped arrays live in the page cache, shared across workers"""
+    if array is None:
+        return {"bytes": 0, "mapped": False}
+    return {"bytes": int(array.nbytes), "mapped": isinstance(array, np.memmap)}
+
+def cache_entry(cache: TTLCache) -> Dict[str, Any]:
+    sample = cache.sample(CACHE_SAMPLE_SIZE)
+    per_entry = sum(deep_sizeof(key) + deep_sizeof(value) for key, value in sample) / len(sample) if sample else 0
+    return {
+        "entries": len(cache),
+        "max_size": cache.max_size,
+        "bytes": int(sys.getsizeof(cache._data) + per_entry * len(cache)),
+    }
+
+class MemoryReporter:
+    """Byte sizes of the artifacts and caches resident in this process.
+
+    Every figure comes from array shapes, container lengths or a small
+    sample of cache entries, so a report costs well under a millisecond
+    per component and can be scraped continuously. Python object sizes
+    are estimates; array and index sizes are exact.
+    """
+
+    def _faiss(self) -> Dict[str, Any]:
+        state = indexer_service._state
+        if state is None:
+            return {"bytes": 0, "vectors": 0, "mapped": False, "mappings_bytes": 0}
+        index, item_mapping, reverse_mapping = state
+        code_size = getattr(index, "code_size", index.d * 4)
+        return {
+            "bytes": int(index.ntotal * code_size),
+            "vectors": int(index.ntotal),
+            "dimension": int(index.d),
+            "mapped": indexer_service.mmapped,
+            "mappings_bytes": int_dict_bytes(item_mapping) + int_dict_bytes(reverse_mapping),
+        }
+
+    def _als(self) -> Dict[str, Any]:
+        state = recommender._als_state
+        if state is None:
+            return {
+                "user_factors": array_entry(None),
+                "item_factors": array_entry(None),
+                "interaction_matrix": array_entry(None),
+                "id_arrays": array_entry(None),
+            }
+        model, matrix, user_ids, item_ids = state
+        return {
+            "user_factors": array_entry(model.user_factors),
+            "item_factors": array_entry(model.item_factors),
+            "interaction_matrix": {
+                "bytes": int(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes),
+                "mapped": isinstance(matrix.data, np.memmap),
+                "nnz": int(matrix.nnz),
+            },
+            "id_arrays": {
+                "bytes": int(user_ids.nbytes + item_ids.nbytes),
+                "mapped": isinstance(user_ids, np.memmap),
+            },
+        }
+
+    def _transformer(self) -> Dict[str, Any]:
+        model = embedding_service._model
+        if model is None:
+            return {"loaded": False, "bytes": 0}
+        try:
+            tensors = list(model.parameters()) + list(model.buffers())
+        except AttributeError:
+            return {"loaded": True, "bytes": None}
+        return {
+            "loaded": True,
+            "bytes": int(sum(t.numel() * t.element_size() for t in tensors)),
+            "parameters": int(sum(t.numel() for t in model.parameters())),
+        }
+
+    def _catalog(self) -> Dict[str, Any]:
+        snapshot = item_catalog.snapshot
+        if snapshot is None:
+            return {"items": 0, "bytes": 0}
+        return {"items": len(snapshot), "bytes": snapshot.nbytes}
+
+    def _process(self) -> Dict[str, Any]:
+        """Resident and shared bytes of this worker, from /proc where available"""
+        try:
+            with open("/proc/self/statm") as f:
+                _, resident, shared = (int(field) for field in f.read().split()[:3])
+        except OSError:
+            return {"rss_bytes": None, "shared_bytes": None}
+        page_size = os.sysconf("SC_PAGE_SIZE")
+        return {"rss_bytes": resident * page_size, "shared_bytes": shared * page_size}
+
+    def report(self) -> Dict[str, Any]:
+        caches: Dict[str, Dict[str, Any]] = {}
+        for cache in registered_caches():
+            entry = cache_entry(cache)
+            if cache.name in caches:
+                # Same-named instances (e.g. per-test caches) are summed
+                for key in entry:
+                    entry[key] += caches[cache.name][key]
+            caches[cache.name] = entry
+        return {
+            "faiss_index": self._faiss(),
+            "als": self._als(),
+            "transformer": self._transformer(),
+            "catalog": self._catalog(),
+            "caches": caches,
+            "process": self._process(),
+            "tracemalloc": self.tracing,
+        }
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start_tracing(self, frames: int = 1) -> None:
+        """Start tracemalloc; allocations slow down noticeably until `stop_tracing`"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop_tracing(self) -> None:
+        tracemalloc.stop()
+
+    def top_allocations(self, limit: int = 20, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """Largest allocation sites since tracing started; empty unless tracing"""
+        if not self.tracing:
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        return [
+            {
+                "location": str(stat.traceback[0]),
+                "bytes": stat.size,
+                "blocks": stat.count,
+            }
+            for stat in snapshot.statistics(group_by)[:limit]
+        ]
+
+    def _artifact_bytes(self) -> Dict[tuple, float]:
+        report = self.report()
+        faiss_index, als = report["faiss_index"], report["als"]
+        values = {
+            ("faiss_index",): faiss_index["bytes"],
+            ("faiss_mappings",): faiss_index["mappings_bytes"],
+            ("als_user_factors",): als["user_factors"]["bytes"],
+            ("als_item_factors",): als["item_factors"]["bytes"],
+            ("als_interaction_matrix",): als["interaction_matrix"]["bytes"],
+            ("catalog",): report["catalog"]["bytes"],
+        }
+        if report["transformer"]["bytes"] is not None:
+            values[("transformer",)] = report["transformer"]["bytes"]
+        for name, cache in report["caches"].items():
+            values[(f"cache:{name}",)] = cache["bytes"]
+        return values
+
+# Global instance
+memory_reporter = MemoryReporter()
+
+live_gauges.register(
+    "fitrecs_resident_bytes",
+    "Approximate bytes held by each in-process artifact and cache",
+    memory_reporter._artifact_bytes,
+    ["artifact"]
+)
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import time
+
+from .. import crud
+from ..core.concurrency import create_detached_task
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from .recommender import INTERACTION_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+class PopularityService:
+    """Precomputed most-popular items, the last-resort recommendation source.
+
+    Items are ranked by weighted interactions over the last `window_days`
+    and held in memory, so serving them never touches the database. The
+    ranking is recomputed in the background once older than
+    `refresh_seconds`.
+    """
+
+    def __init__(
+        self,
+        window_days: int = 30,
+        refresh_seconds: float = 600,
+        max_items: int = 500,
+        session_factory: Callable[[], Any] = AsyncSessionLocal
+    ):
+        self.window_days = window_days
+        self.refresh_seconds = refresh_seconds
+        self.max_items = max_items
+        self.session_factory = session_factory
+        self.items: List[Tuple[int, float]] = []  # (item_id, score in [0, 1]), best first
+        self._refreshed_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> None:
+        since = datetime.utcnow() - timedelta(days=self.window_days)
+        async with self.session_factory() as db:
+            counts = await crud.interaction.get_type_counts_by_item(db, since)
+        scores = {}
+        for (item_id, interaction_type), count in counts.items():
+            scores[item_id] = scores.get(item_id, 0.0) + INTERACTION_WEIGHTS[interaction_type] * count
+        ranked = sorted(scores.items(), key=lambda pair: pair[1], reverse=True)[:self.max_items]
+        top_score = ranked[0][1] if ranked else 1.0
+        self.items = [(item_id, score / top_score) for item_id, score in ranked]
+        self._refreshed_at = time.monotonic()
+        logger.info(f"Popularity ranking refreshed with {len(self.items)} items")
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Popularity refresh failed: {str(e)}")
+            # Back off for a full interval instead of retrying on every request
+            self._refreshed_at = time.monotonic()
+
+    def top(self, n_items: int, exclude: Sequence[int] = ()) -> List[Tuple[int, float]]:
+        """Most popular items not in exclude; schedules a refresh if the ranking is stale.
+
+        Must be called from the event loop.
+        """
+        stale = self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.refresh_seconds
+        if stale and (self._refreshing is None or self._refreshing.done()):
+            self._refreshing = create_detached_task(self._refresh_in_background())
+        excluded = set(exclude)
+        results = []
+        for item_id, score in self.items:
+            if item_id not in excluded:
+                results.append((item_id, score))
+                if len(results) >= n_items:
+                    break
+        return results
+
+# Global instance
+popularity_service = PopularityService(
+    window_days=settings.POPULARITY_WINDOW_DAYS,
+    refresh_seconds=settings.POPULARITY_REFRESH_SECONDS,
+    max_items=settings.POPULARITY_MAX_ITEMS
+)
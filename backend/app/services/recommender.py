@@ -1,22 +1,34 @@
 import numpy as np
-from typing import List, Dict, Tuple
-from sentence_transformers import SentenceTransformer
-import faiss
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
 import json
 import os
-from implicit.als import AlternatingLeastSquares
-from scipy.sparse import csr_matrix, lil_matrix
 import logging
+import time
+import uuid
 from datetime import datetime
 
+from ..core.artifacts import SharedArtifactStore, artifact_store
 from ..core.config import settings
+from ..core.instrumentation import live_gauges, span
 from ..db import models
 from ..schemas import item as item_schemas
 
+if TYPE_CHECKING:
+    from scipy.sparse import csr_matrix
+    from sentence_transformers import SentenceTransformer
+
 logger = logging.getLogger(__name__)
 
+# Implicit-feedback confidence per interaction type
+INTERACTION_WEIGHTS = {
+    models.InteractionType.VIEW: 1.0,
+    models.InteractionType.LIKE: 3.0,
+    models.InteractionType.COMPLETE: 5.0
+}
+
 class RecommenderService:
-    def __init__(self):
+    def __init__(self, artifacts: Optional[SharedArtifactStore] = None):
+        self.artifacts = artifacts  # Shares trained ALS factors across worker processes
         self.model = None
         self.faiss_index = None
         self.item_mapping = {}  # item_id -> faiss_id
@@ -24,19 +36,31 @@ class RecommenderService:
         self.als_model = None
         self.user_factors = None
         self.item_factors = None
+        self.interaction_matrix = None
+        self.model_version = uuid.uuid4().hex  # Changes on every collaborative retrain
+        self.als_version: Optional[str] = None  # Published artifact version currently attached
+        self.train_seconds: Optional[float] = None  # Duration of the last ALS fit
+        # (model, interaction matrix, sorted user ids, item ids), swapped as one reference
+        self._als_state: Optional[tuple] = None
         
-    def get_model(self) -> SentenceTransformer:
+    def get_model(self) -> "SentenceTransformer":
         if self.model is None:
+            from sentence_transformers import SentenceTransformer
+            
             logger.info("Loading sentence transformer model...")
             self.model = SentenceTransformer(settings.MODEL_NAME)
         return self.model
         
     def create_faiss_index(self, dimension: int = 384) -> None:
         """Initialize a new FAISS index"""
+        import faiss
+        
         self.faiss_index = faiss.IndexFlatL2(dimension)
         
     def load_faiss_index(self) -> bool:
         """Load FAISS index from disk if it exists"""
+        import faiss
+        
         try:
             if os.path.exists(settings.FAISS_INDEX_PATH):
                 self.faiss_index = faiss.read_index(settings.FAISS_INDEX_PATH)
@@ -52,6 +76,8 @@ class RecommenderService:
     def save_faiss_index(self) -> None:
         """Save FAISS index and mapping to disk"""
         if self.faiss_index and self.item_mapping:
+            import faiss
+            
             os.makedirs(os.path.dirname(settings.FAISS_INDEX_PATH), exist_ok=True)
             faiss.write_index(self.faiss_index, settings.FAISS_INDEX_PATH)
             with open(settings.ITEM_MAPPING_PATH, 'w') as f:
@@ -88,7 +114,8 @@ class RecommenderService:
         faiss_id = self.item_mapping[item_id]
         item_vector = self.faiss_index.reconstruct(faiss_id)
         
-        D, I = self.faiss_index.search(item_vector.reshape(1, -1), k + 1)
+        with span("faiss_search"):
+            D, I = self.faiss_index.search(item_vector.reshape(1, -1), k + 1)
         
         # Convert faiss IDs back to item IDs and include similarity scores
         similar_items = []
@@ -105,31 +132,42 @@ class RecommenderService:
     def build_interaction_matrix(
         self, 
         interactions: List[models.Interaction]
-    ) -> Tuple[csr_matrix, Dict[int, int], Dict[int, int]]:
+    ) -> Tuple["csr_matrix", Dict[int, int], Dict[int, int]]:
         """Build user-item interaction matrix for collaborative filtering"""
-        # Create mappings for users and items
-        unique_users = sorted(set(inter.user_id for inter in interactions))
-        unique_items = sorted(set(inter.item_id for inter in interactions))
-        
-        user_to_idx = {uid: idx for idx, uid in enumerate(unique_users)}
-        item_to_idx = {iid: idx for idx, iid in enumerate(unique_items)}
-        
-        # Create sparse matrix
-        matrix = lil_matrix((len(unique_users), len(unique_items)), dtype=np.float32)
-        
-        # Fill matrix with interaction weights
-        for inter in interactions:
-            user_idx = user_to_idx[inter.user_id]
-            item_idx = item_to_idx[inter.item_id]
-            # Weight by interaction type
-            weight = {
-                models.InteractionType.VIEW: 1.0,
-                models.InteractionType.LIKE: 3.0,
-                models.InteractionType.COMPLETE: 5.0
-            }[inter.interaction_type]
-            matrix[user_idx, item_idx] += weight
-            
-        return matrix.tocsr(), user_to_idx, item_to_idx
+        n = len(interactions)
+        user_ids = np.fromiter((inter.user_id for inter in interactions), np.int64, n)
+        item_ids = np.fromiter((inter.item_id for inter in interactions), np.int64, n)
+        # Daily rollup rows stand for `events` interactions; raw rows for one
+        weights = np.fromiter(
+            (
+                INTERACTION_WEIGHTS[inter.interaction_type] * getattr(inter, "events", 1)
+                for inter in interactions
+            ),
+            np.float32,
+            n
+        )
+        return self.build_interaction_matrix_from_columns(user_ids, item_ids, weights)
+
+    def build_interaction_matrix_from_columns(
+        self,
+        user_ids: np.ndarray,
+        item_ids: np.ndarray,
+        weights: np.ndarray
+    ) -> Tuple["csr_matrix", Dict[int, int], Dict[int, int]]:
+        """Build the user-item matrix from parallel column arrays; repeated pairs are summed"""
+        from scipy.sparse import coo_matrix
+        
+        unique_users, user_idx = np.unique(user_ids, return_inverse=True)
+        unique_items, item_idx = np.unique(item_ids, return_inverse=True)
+        
+        matrix = coo_matrix(
+            (weights.astype(np.float32, copy=False), (user_idx, item_idx)),
+            shape=(len(unique_users), len(unique_items))
+        ).tocsr()
+        
+        user_to_idx = {int(uid): idx for idx, uid in enumerate(unique_users)}
+        item_to_idx = {int(iid): idx for idx, iid in enumerate(unique_items)}
+        return matrix, user_to_idx, item_to_idx
 
     def fit_collaborative(
         self, 
@@ -138,22 +176,126 @@ class RecommenderService:
         iterations: int = 15
     ) -> None:
         """Train ALS model on interaction data"""
-        interaction_matrix, user_mapping, item_mapping = self.build_interaction_matrix(interactions)
+        self._fit_als(self.build_interaction_matrix(interactions), factors, iterations)
+        
+    def fit_collaborative_from_columns(
+        self,
+        user_ids: np.ndarray,
+        item_ids: np.ndarray,
+        weights: np.ndarray,
+        factors: int = 50,
+        iterations: int = 15
+    ) -> None:
+        """Train ALS model from column arrays, e.g. memory-mapped interaction exports"""
+        matrix = self.build_interaction_matrix_from_columns(user_ids, item_ids, weights)
+        self._fit_als(matrix, factors, iterations)
+        
+    def _fit_als(
+        self,
+        matrix: Tuple["csr_matrix", Dict[int, int], Dict[int, int]],
+        factors: int,
+        iterations: int
+    ) -> None:
+        from implicit.als import AlternatingLeastSquares
+        
+        interaction_matrix, user_mapping, item_mapping = matrix
         
-        self.als_model = AlternatingLeastSquares(
+        start = time.perf_counter()
+        model = AlternatingLeastSquares(
             factors=factors,
             iterations=iterations,
             calculate_training_loss=True
         )
         
-        self.als_model.fit(interaction_matrix)
+        model.fit(interaction_matrix)
+        train_seconds = time.perf_counter() - start
         
-        # Store learned factors and mappings
-        self.user_factors = self.als_model.user_factors
-        self.item_factors = self.als_model.item_factors
-        self.user_mapping = user_mapping
-        self.item_mapping_als = item_mapping
-        self.reverse_item_mapping_als = {v: k for k, v in item_mapping.items()}
+        # Mappings come from np.unique, so ids are already in row order and sorted
+        user_ids = np.fromiter(user_mapping.keys(), np.int64, len(user_mapping))
+        item_ids = np.fromiter(item_mapping.keys(), np.int64, len(item_mapping))
+        model_version = uuid.uuid4().hex
+        if self.artifacts is not None:
+            # Publish for the other workers, then serve from the shared mapping too
+            version = self.artifacts.publish(
+                "als",
+                {
+                    "user_factors": model.user_factors,
+                    "item_factors": model.item_factors,
+                    "user_ids": user_ids,
+                    "item_ids": item_ids,
+                    "matrix_data": interaction_matrix.data,
+                    "matrix_indices": interaction_matrix.indices,
+                    "matrix_indptr": interaction_matrix.indptr,
+                },
+                {
+                    "model_version": model_version,
+                    "factors": factors,
+                    "shape": list(interaction_matrix.shape),
+                    "trained_at": datetime.utcnow().isoformat(),
+                    "train_seconds": train_seconds,
+                }
+            )
+            self.attach_als(version)
+            return
+        
+        self._set_als(model, interaction_matrix, user_ids, item_ids, model_version)
+        self.train_seconds = train_seconds
+        
+    def _set_als(self, model, interaction_matrix, user_ids, item_ids, model_version: str) -> None:
+        self.als_model = model
+        self.interaction_matrix = interaction_matrix
+        self.user_factors = model.user_factors
+        self.item_factors = model.item_factors
+        self._als_state = (model, interaction_matrix, user_ids, item_ids)
+        self.model_version = model_version
+        
+    def attach_als(self, version: Optional[str] = None) -> bool:
+        """Serve ALS from a published artifact version (default: the current one).
+        
+        Factors, ids and the interaction matrix stay memory-mapped, so every
+        worker attached to a version shares one copy. Returns True if a new
+        version was attached. A version pruned before it could be mapped is
+        replaced by the then-current one; if that fails too, the attached
+        version keeps serving.
+        """
+        from implicit.als import AlternatingLeastSquares
+        from scipy.sparse import csr_matrix
+        
+        if self.artifacts is None:
+            return False
+        version = version or self.artifacts.current_version("als", force=True)
+        for _ in range(3):
+            if version is None or version == self.als_version:
+                return False
+            try:
+                arrays, meta = self.artifacts.load("als", version)
+                break
+            except FileNotFoundError:
+                logger.warning(f"ALS artifact version {version} was pruned before it was attached")
+                version = self.artifacts.current_version("als", force=True)
+        else:
+            return False
+        model = AlternatingLeastSquares(factors=meta["factors"])
+        model.user_factors = arrays["user_factors"]
+        model.item_factors = arrays["item_factors"]
+        interaction_matrix = csr_matrix(
+            (arrays["matrix_data"], arrays["matrix_indices"], arrays["matrix_indptr"]),
+            shape=tuple(meta["shape"]),
+            copy=False
+        )
+        self._set_als(model, interaction_matrix, arrays["user_ids"], arrays["item_ids"], meta["model_version"])
+        self.train_seconds = meta.get("train_seconds")
+        self.als_version = version
+        logger.info(f"Attached ALS artifact version {version}")
+        return True
+        
+    def refresh_als(self) -> None:
+        """Attach a newer ALS version published by another worker, if any"""
+        if self.artifacts is None:
+            return
+        version = self.artifacts.current_version("als")
+        if version is not None and version != self.als_version:
+            self.attach_als(version)
         
     def get_user_recommendations(
         self, 
@@ -163,21 +305,26 @@ class RecommenderService:
         viewed_items: List[int] = None
     ) -> List[Tuple[int, float]]:
         """Get collaborative filtering recommendations for a user"""
-        if user_id not in self.user_mapping:
+        self.refresh_als()
+        if self._als_state is None:
+            return []
+        model, interaction_matrix, user_ids, item_ids = self._als_state
+        user_idx = int(np.searchsorted(user_ids, user_id))
+        if user_idx >= len(user_ids) or user_ids[user_idx] != user_id:
             return []
             
-        user_idx = self.user_mapping[user_id]
-        scores = self.als_model.recommend(
-            user_idx,
-            interaction_matrix[user_idx],
-            N=n_items + len(viewed_items) if viewed_items else n_items,
-            filter_already_liked_items=filter_viewed
-        )
+        with span("als_recommend"):
+            scores = model.recommend(
+                user_idx,
+                interaction_matrix[user_idx],
+                N=n_items + len(viewed_items) if viewed_items else n_items,
+                filter_already_liked_items=filter_viewed
+            )
         
         # Convert back to item IDs and scores
         recommendations = []
         for item_idx, score in zip(scores[0], scores[1]):
-            item_id = self.reverse_item_mapping_als[item_idx]
+            item_id = int(item_ids[item_idx])
             if not filter_viewed or item_id not in (viewed_items or []):
                 recommendations.append((item_id, float(score)))
                 if len(recommendations) >= n_items:
@@ -208,6 +355,17 @@ class RecommenderService:
         else:
             cb_recs = []
             
+        return self.blend(cf_recs, cb_recs, n_items=n_items, alpha=alpha, viewed_items=viewed_items)
+        
+    @staticmethod
+    def blend(
+        cf_recs: List[Tuple[int, float]],
+        cb_recs: List[Tuple[int, float]],
+        n_items: int = 10,
+        alpha: float = 0.5,
+        viewed_items: List[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Blend collaborative and content scores after min-max normalizing each"""
         # Normalize scores within each method
         def normalize_scores(recs):
             if not recs:
@@ -245,4 +403,16 @@ class RecommenderService:
         return blended_scores[:n_items]
 
 # Global instance
-recommender = RecommenderService()
\ No newline at end of file
+recommender = RecommenderService(artifacts=artifact_store)
+
+live_gauges.register(
+    "fitrecs_als_model_info",
+    "Version of the served ALS model (always 1)",
+    lambda: {(recommender.model_version,): 1},
+    ["version"]
+)
+live_gauges.register(
+    "fitrecs_als_train_seconds",
+    "Duration of the last ALS fit behind the served model",
+    lambda: recommender.train_seconds
+)
\ No newline at end of file
@@ -0,0 +1,218 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+
+from ..core.cache import TTLCache
+from ..core.concurrency import SingleFlight
+from ..core.config import settings
+from ..core.instrumentation import live_gauges
+from ..core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """Recommendation response cache in Redis with an in-process LRU fallback.
+
+    Keys embed a per-user generation counter plus the index and model
+    versions, so recording an interaction or publishing a new snapshot
+    makes old entries unreachable without scanning for them.
+
+    Values are stored as serialized JSON bytes, so a hit is served without
+    decoding or re-encoding the response body. Concurrent misses for one
+    key in this process share a single computation, cache enabled or not.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 300,
+        lock_timeout_ms: int = 2000,
+        local_max_size: int = 5000,
+        retry_seconds: int = 30,
+        client: Any = None
+    ):
+        self.enabled = enabled
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.lock_timeout_ms = lock_timeout_ms
+        self.retry_seconds = retry_seconds
+        self.local = TTLCache("recommendations", max_size=local_max_size, ttl_seconds=ttl_seconds)
+        self._client = client
+        self._redis_down_until = 0.0
+        self._generations: Dict[str, int] = {}
+        self.flights = SingleFlight("recommendations")
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def redis(self) -> Any:
+        """Redis client, or None while Redis is unconfigured or marked unavailable"""
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._client is None and self.redis_url:
+            import redis.asyncio
+
+            self._client = redis.asyncio.Redis.from_url(
+                self.redis_url,
+                socket_timeout=0.1,
+                socket_connect_timeout=0.1
+            )
+        return self._client
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning(f"Redis unavailable, using local response cache: {error}")
+        self._redis_down_until = time.monotonic() + self.retry_seconds
+
+    async def _generation(self, user_id: Optional[int]) -> int:
+        if user_id is None:
+            return 0
+        key = f"rec:gen:{user_id}"
+        client = self.redis
+        if client is not None:
+            try:
+                value = await client.get(key)
+                return int(value) if value is not None else 0
+            except Exception as e:
+                self._redis_failed(e)
+        return self._generations.get(key, 0)
+
+    async def make_key(
+        self,
+        endpoint: str,
+        user_id: Optional[int],
+        params: Dict[str, Any],
+        versions: Sequence[Any]
+    ) -> str:
+        """Build a cache key from the request scope and artifact versions"""
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode()
+        ).hexdigest()[:16]
+        scope = "*" if user_id is None else user_id
+        version = ":".join(str(v) for v in versions)
+        generation = await self._generation(user_id)
+        return f"rec:{endpoint}:{scope}:{generation}:{version}:{digest}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        client = self.redis
+        if client is not None:
+            try:
+                return await client.get(key)
+            except Exception as e:
+                self._redis_failed(e)
+        return self.local.get(key)
+
+    async def set(self, key: str, body: bytes) -> None:
+        client = self.redis
+        if client is not None:
+            try:
+                await client.set(key, body, ex=self.ttl_seconds)
+                return
+            except Exception as e:
+                self._redis_failed(e)
+        self.local.set(key, body)
+
+    async def invalidate_user(self, user_id: int) -> None:
+        """Make every cached response for the user unreachable"""
+        key = f"rec:gen:{user_id}"
+        self._generations[key] = self._generations.get(key, 0) + 1
+        client = self.redis
+        if client is not None:
+            try:
+                await client.incr(key)
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def _acquire_fill_lock(self, key: str) -> bool:
+        """Take the cross-process lock for filling key; True if Redis is unavailable"""
+        client = self.redis
+        if client is None:
+            return True
+        try:
+            return bool(await client.set(f"{key}:lock", 1, nx=True, px=self.lock_timeout_ms))
+        except Exception as e:
+            self._redis_failed(e)
+            return True
+
+    async def _release_fill_lock(self, key: str) -> None:
+        client = self.redis
+        if client is not None:
+            try:
+                await client.delete(f"{key}:lock")
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def _fill(self, key: str, compute: Callable[[], Awaitable[Tuple[bytes, bool]]]) -> bytes:
+        body = await self.get(key)
+        if body is not None:
+            return body
+
+        locked = await self._acquire_fill_lock(key)
+        if not locked:
+            deadline = time.monotonic() + self.lock_timeout_ms / 1000
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+                body = await self.get(key)
+                if body is not None:
+                    return body
+
+        try:
+            body, cacheable = await compute()
+            if cacheable:
+                await self.set(key, body)
+        finally:
+            if locked:
+                await self._release_fill_lock(key)
+        return body
+
+    async def get_or_compute_body(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Tuple[bytes, bool]]]
+    ) -> bytes:
+        """Return the cached body for key, computing it at most once per key.
+
+        `compute` returns the serialized body and whether it may be cached,
+        so degraded responses can be served without being stored.
+        Concurrent misses in this process join one single-flight call; misses
+        in other processes wait for the Redis fill lock holder to publish the
+        value, up to the lock timeout, before computing it themselves. With
+        the cache disabled, concurrent identical calls are still coalesced.
+        """
+        if not self.enabled:
+            body, _ = await self.flights.do(key, compute)
+            return body
+
+        body = await self.get(key)
+        if body is not None:
+            self.hits += 1
+            return body
+        self.misses += 1
+        return await self.flights.do(key, lambda: self._fill(key, compute))
+
+    async def get_or_compute_json(self, key: str, compute: Callable[[], Awaitable[Any]]) -> bytes:
+        """Like get_or_compute_body for a compute returning a JSON-serializable value"""
+        async def compute_body() -> Tuple[bytes, bool]:
+            return dumps(await compute()), True
+
+        return await self.get_or_compute_body(key, compute_body)
+
+# Global instance
+response_cache = ResponseCache(
+    enabled=settings.RECOMMENDATION_CACHE_ENABLED,
+    redis_url=settings.REDIS_URL,
+    ttl_seconds=settings.RECOMMENDATION_CACHE_TTL_SECONDS,
+    lock_timeout_ms=settings.RECOMMENDATION_CACHE_LOCK_TIMEOUT_MS,
+    local_max_size=settings.RECOMMENDATION_CACHE_LOCAL_MAX_SIZE
+)
+
+live_gauges.register(
+    "fitrecs_response_cache_hit_ratio",
+    "Share of recommendation requests served from the response cache (Redis or local)",
+    lambda: response_cache.hits / (response_cache.hits + response_cache.misses)
+    if response_cache.hits + response_cache.misses else 0.0
+)
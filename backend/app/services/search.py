@@ -0,0 +1,119 @@
+from typing import Dict, List, Sequence, Tuple
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud
+from ..core.concurrency import stage_executor
+from ..core.config import settings
+from ..db.fts import has_fts
+from .embeddings import query_embedding_batcher
+from .indexer import indexer_service
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_TERMS = 8
+
+POSTGRES_SEARCH = text("""
+    SELECT id, ts_rank(search_vector, query) AS score
+    FROM items, to_tsquery('english', :query) AS query
+    WHERE search_vector @@ query
+    ORDER BY score DESC, id
+    LIMIT :limit OFFSET :offset
+""")
+
+# bm25() is lower-is-better; weights follow column order (title, description, tags)
+SQLITE_SEARCH = text("""
+    SELECT rowid AS id, -bm25(items_fts, 10.0, 4.0, 1.0) AS score
+    FROM items_fts
+    WHERE items_fts MATCH :query
+    ORDER BY score DESC, id
+    LIMIT :limit OFFSET :offset
+""")
+
+def tokenize(q: str) -> List[str]:
+    """Split a user query into lowercase word terms safe to embed in an FTS query"""
+    return re.findall(r"\w+", q.lower())[:MAX_QUERY_TERMS]
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Tuple[int, float]]],
+    k: int = 60
+) -> List[Tuple[int, float]]:
+    """Fuse ranked (item_id, score) lists by summing 1 / (k + rank) per list.
+    
+    Only ranks are used, so retrievers with incomparable score scales
+    (BM25, ts_rank, L2 distance) can be combined without normalization.
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, (item_id, _) in enumerate(ranking, start=1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda pair: (-pair[1], pair[0]))
+
+class SearchService:
+    """Ranked item search: lexical full-text, FAISS nearest neighbours, and their fusion"""
+
+    def __init__(self):
+        self._fts_available: Dict[str, bool] = {}
+
+    async def _use_fts(self, db: AsyncSession, dialect: str) -> bool:
+        if dialect not in self._fts_available:
+            available = await db.run_sync(lambda session: has_fts(session.connection()))
+            if not available:
+                logger.warning("No full-text index on %s, falling back to ILIKE search", dialect)
+            self._fts_available[dialect] = available
+        return self._fts_available[dialect]
+
+    async def search(
+        self,
+        db: AsyncSession,
+        q: str,
+        *,
+        limit: int = 20,
+        offset: int = 0
+    ) -> List[Tuple[int, float]]:
+        """Return (item_id, score) pairs, best match first; every term must prefix-match"""
+        terms = tokenize(q)
+        if not terms:
+            return []
+
+        dialect = db.get_bind().dialect.name
+        if not await self._use_fts(db, dialect):
+            ids = await crud.item.search_ids(db, q.strip(), limit=limit, offset=offset)
+            return [(item_id, 1.0) for item_id in ids]
+
+        if dialect == "postgresql":
+            statement = POSTGRES_SEARCH
+            query = " & ".join(f"{term}:*" for term in terms)
+        else:
+            statement = SQLITE_SEARCH
+            query = " ".join(f'"{term}"*' for term in terms)
+
+        result = await db.execute(statement, {"query": query, "limit": limit, "offset": offset})
+        return [(row.id, float(row.score)) for row in result]
+
+    async def semantic_search(self, q: str, *, limit: int = 20) -> List[Tuple[int, float]]:
+        """Nearest items to the query embedding in the FAISS index"""
+        if not q.strip():
+            return []
+        embedding = await query_embedding_batcher.embed(q)
+        return await stage_executor.run(indexer_service.search, embedding, limit)
+
+    async def hybrid_search(
+        self,
+        db: AsyncSession,
+        q: str,
+        *,
+        limit: int = 20
+    ) -> List[Tuple[int, float]]:
+        """Fuse lexical and semantic candidates with reciprocal rank fusion"""
+        candidates = max(limit, settings.SEARCH_CANDIDATES)
+        lexical = await self.search(db, q, limit=candidates)
+        semantic = await self.semantic_search(q, limit=candidates)
+        fused = reciprocal_rank_fusion([lexical, semantic], k=settings.SEARCH_RRF_K)
+        return fused[:limit]
+
+# Global instance
+search_service = SearchService()
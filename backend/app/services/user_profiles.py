@@ -0,0 +1,46 @@
+from typing import Optional, Sequence
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .. import crud
+from ..core.cache import TTLCache
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class UserProfileService:
+    """Cached reads of the per-user aggregates in the user_profile table"""
+
+    def __init__(self, cache: Optional[TTLCache] = None):
+        self.cache = cache
+
+    async def get(self, db: AsyncSession, user_id: int) -> dict:
+        """Profile of a user: interaction counts, last activity, recent and seen/liked/completed items"""
+        if self.cache is not None:
+            profile = self.cache.get(user_id)
+            if profile is not None:
+                return profile
+        profile = await crud.user_profile.get_or_build(db, user_id)
+        if self.cache is not None:
+            self.cache.set(user_id, profile)
+        return profile
+
+    async def get_seen_item_ids(self, db: AsyncSession, user_id: int) -> set:
+        return set((await self.get(db, user_id))["seen_item_ids"])
+
+    def invalidate(self, user_ids: Sequence[int]) -> None:
+        """Drop cached profiles after their interactions were written"""
+        if self.cache is None:
+            return
+        for user_id in user_ids:
+            self.cache.invalidate(user_id)
+
+# Global instance
+user_profile_service = UserProfileService(
+    TTLCache(
+        "user_profiles",
+        max_size=settings.USER_PROFILE_CACHE_MAX_SIZE,
+        ttl_seconds=settings.USER_PROFILE_CACHE_TTL_SECONDS
+    )
+)
@@ -0,0 +1,176 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+import asyncio
+import importlib
+import logging
+import time
+
+from ..core.concurrency import stage_executor
+from ..db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+class ComponentDegraded(Exception):
+    """Raised by a warmup component that loaded but has nothing to serve yet"""
+
+class ComponentStatus:
+    def __init__(self):
+        self.state = "pending"  # pending, warming, ready, degraded or failed
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.finished_at: Optional[datetime] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "seconds": self.seconds,
+            "error": self.error,
+            "finished_at": self.finished_at,
+        }
+
+class WarmupService:
+    """Warms named startup components concurrently and tracks their readiness.
+
+    Heavy dependencies are imported lazily, so without warmup the first
+    request to touch them pays for the import and model load. Components
+    are async callables; blocking work runs on the CPU stage executor so
+    several components load in parallel. A degraded component (say, no
+    FAISS index built yet) does not hold back readiness, since its
+    endpoints fall back, but is reported as such.
+    """
+
+    def __init__(self):
+        self._components: Dict[str, Callable[[], Awaitable[None]]] = {}
+        self.status: Dict[str, ComponentStatus] = {}
+        self.started = False
+
+    def register(self, name: str, warm: Callable[[], Awaitable[None]]) -> None:
+        self._components[name] = warm
+
+    @property
+    def components(self) -> List[str]:
+        return list(self._components)
+
+    async def _warm(self, name: str) -> None:
+        status = self.status[name]
+        status.state = "warming"
+        start = time.perf_counter()
+        try:
+            await self._components[name]()
+            status.state = "ready"
+        except ComponentDegraded as e:
+            logger.warning(f"Warmup of {name} degraded: {str(e)}")
+            status.state = "degraded"
+            status.error = str(e)
+        except Exception as e:
+            logger.error(f"Warmup of {name} failed: {str(e)}")
+            status.state = "failed"
+            status.error = str(e)
+        status.seconds = round(time.perf_counter() - start, 3)
+        status.finished_at = datetime.utcnow()
+        logger.info(f"Warmup of {name}: {status.state} in {status.seconds}s")
+
+    async def warm(self, names: List[str]) -> None:
+        """Warm the given components in parallel; unknown names fail immediately"""
+        self.started = True
+        for name in names:
+            self.status[name] = ComponentStatus()
+            if name not in self._components:
+                self.status[name].state = "failed"
+                self.status[name].error = "unknown component"
+        await asyncio.gather(*[
+            self._warm(name) for name in names if name in self._components
+        ])
+
+    @property
+    def ready(self) -> bool:
+        return self.started and all(
+            status.state in ("ready", "degraded") for status in self.status.values()
+        )
+
+    @property
+    def degraded(self) -> bool:
+        return any(status.state == "degraded" for status in self.status.values())
+
+    def report(self) -> dict:
+        return {
+            "ready": self.ready,
+            "degraded": self.degraded,
+            "components": {name: status.to_dict() for name, status in self.status.items()},
+        }
+
+async def _warm_catalog() -> None:
+    from .item_store import item_store
+
+    async with AsyncSessionLocal() as db:
+        await item_store.refresh(db)
+
+async def _warm_faiss_index() -> None:
+    from .indexer import indexer_service
+
+    if indexer_service.index is None and not await stage_executor.run(indexer_service.load_index):
+        raise ComponentDegraded("no saved FAISS index; content recommendations are empty until one is built")
+
+async def _warm_embedding_model() -> None:
+    from .embeddings import embedding_service
+
+    # One encode also initializes the model's kernels, not just its weights
+    await stage_executor.run(embedding_service.compute_embedding, "warmup")
+
+async def _warm_collaborative() -> None:
+    from .recommender import recommender
+
+    await stage_executor.run(importlib.import_module, "implicit.als")
+    await stage_executor.run(importlib.import_module, "scipy.sparse")
+    await stage_executor.run(recommender.attach_als)
+
+async def _warm_popularity() -> None:
+    from .popularity import popularity_service
+
+    await popularity_service.refresh()
+
+async def _warm_ai() -> None:
+    from ..api.v1.endpoints.ai import get_ai_service, get_fitness_coach
+
+    await stage_executor.run(get_ai_service)
+    await stage_executor.run(get_fitness_coach)
+
+def preload(names: List[str]) -> List[str]:
+    """Load read-only model state in the current process before workers fork.
+
+    Meant for the gunicorn master with preload_app, so workers inherit the
+    weights, FAISS index and ALS factors as shared copy-on-write or
+    memory-mapped pages instead of loading a copy each. Runs synchronously
+    and only reads files: database connections, event loops and thread
+    pools do not survive fork, and inference is left to each worker's
+    warmup so no BLAS/OpenMP threads exist in the master. Returns the
+    components loaded.
+    """
+    from .embeddings import embedding_service
+    from .indexer import indexer_service
+    from .recommender import recommender
+
+    loaders = {
+        "embedding_model": lambda: embedding_service.model,
+        "faiss_index": indexer_service.load_index,
+        "collaborative": recommender.attach_als,
+    }
+    loaded = []
+    for name in names:
+        if name not in loaders:
+            logger.warning(f"Cannot preload {name}; it is warmed in each worker instead")
+            continue
+        start = time.perf_counter()
+        loaders[name]()
+        loaded.append(name)
+        logger.info(f"Preloaded {name} in {time.perf_counter() - start:.3f}s")
+    return loaded
+
+# Global instance
+warmup_service = WarmupService()
+warmup_service.register("catalog", _warm_catalog)
+warmup_service.register("faiss_index", _warm_faiss_index)
+warmup_service.register("embedding_model", _warm_embedding_model)
+warmup_service.register("collaborative", _warm_collaborative)
+warmup_service.register("popularity", _warm_popularity)
+warmup_service.register("ai", _warm_ai)
@@ -0,0 +1,86 @@
+import numpy as np
+
+from app.core.artifacts import SharedArtifactStore
+from app.services.recommender import RecommenderService
+
+def test_publish_maps_current_version_and_prunes(tmp_path):
+    store = SharedArtifactStore(str(tmp_path), keep_versions=2, check_interval_seconds=60)
+    assert store.current_version("als") is None
+
+    versions = [
+        store.publish("als", {"factors": np.full((3, 2), n, np.float32)}, {"n": n})
+        for n in range(3)
+    ]
+    assert store.current_version("als") == versions[-1]
+    arrays, meta = store.load("als", versions[-1])
+    assert isinstance(arrays["factors"], np.memmap)
+    assert not arrays["factors"].flags.writeable
+    assert arrays["factors"][0, 0] == 2 and meta == {"n": 2}
+    remaining = sorted(path.name for path in (tmp_path / "als").iterdir() if path.is_dir())
+    assert remaining == sorted(versions[1:])
+
+def test_workers_attach_published_als(tmp_path):
+    store = SharedArtifactStore(str(tmp_path), check_interval_seconds=0)
+    rng = np.random.default_rng(0)
+    user_ids = rng.integers(1, 30, 500) * 3
+    item_ids = rng.integers(1, 60, 500) * 7
+    weights = np.ones(500, np.float32)
+
+    trainer = RecommenderService(artifacts=store)
+    trainer.fit_collaborative_from_columns(user_ids, item_ids, weights, factors=4, iterations=2)
+    assert isinstance(trainer.user_factors, np.memmap)
+
+    # Another worker picks the model up on its next request
+    worker = RecommenderService(artifacts=store)
+    user_id = int(user_ids[0])
+    recommendations = worker.get_user_recommendations(user_id, n_items=5)
+    assert recommendations == trainer.get_user_recommendations(user_id, n_items=5)
+    assert worker.model_version == trainer.model_version
+    assert worker.get_user_recommendations(2, n_items=5) == []  # unknown user
+
+def test_attach_falls_back_when_a_version_is_pruned(tmp_path):
+    store = SharedArtifactStore(str(tmp_path), keep_versions=1, check_interval_seconds=60)
+    rng = np.random.default_rng(0)
+    user_ids = rng.integers(1, 30, 500)
+    item_ids = rng.integers(1, 60, 500)
+    weights = np.ones(500, np.float32)
+
+    trainer = RecommenderService(artifacts=store)
+    trainer.fit_collaborative_from_columns(user_ids, item_ids, weights, factors=4, iterations=2)
+    stale = trainer.als_version
+    trainer.fit_collaborative_from_columns(user_ids, item_ids, weights, factors=4, iterations=2)
+    assert not (tmp_path / "als" / stale).exists()
+
+    # A worker that read CURRENT before the last publish attaches the newer version
+    worker = RecommenderService(artifacts=store)
+    assert worker.attach_als(stale)
+    assert worker.als_version == trainer.als_version
+
+    # With nothing newer to fall back to, the attached version keeps serving
+    assert not worker.attach_als("0-missing")
+    assert worker.als_version == trainer.als_version
+    assert worker.get_user_recommendations(int(user_ids[0]), n_items=3)
+
+def test_search_keeps_the_mapping_of_the_index_it_searched():
+    import faiss
+
+    from app.services.indexer import IndexerService
+
+    vectors = np.eye(2, dtype=np.float32)
+    old_index, new_index = faiss.IndexFlatL2(2), faiss.IndexFlatL2(2)
+    old_index.add(vectors)
+    new_index.add(vectors)
+    indexer = IndexerService()
+    indexer.dirty = True  # No reloading from disk
+
+    class ReloadedMidSearch:
+        ntotal = 2
+
+        def search(self, query, k):
+            # Another thread reloads a different index while this one searches
+            indexer._state = (new_index, {7: 0, 8: 1}, {0: 7, 1: 8})
+            return old_index.search(query, k)
+
+    indexer._state = (ReloadedMidSearch(), {1: 0, 2: 1}, {0: 1, 1: 2})
+    assert [item_id for item_id, _ in indexer.search(vectors[0], k=2)] == [1, 2]
+    assert indexer.item_mapping == {7: 0, 8: 1}
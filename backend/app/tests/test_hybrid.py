@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.concurrency import StageExecutor
+from app.services import hybrid
+from app.services.hybrid import HybridRecommender
+
+@pytest.fixture
+def sources(monkeypatch):
+    """Stub scoring sources; set `delays` to make one overrun its slice"""
+    delays = {"collaborative": 0.0, "content": 0.0}
+
+    def cf(user_id, n_items, viewed_items):
+        time.sleep(delays["collaborative"])
+        return [(1, 0.9), (2, 0.5), (3, 0.1)]
+
+    def content(item_id, k):
+        time.sleep(delays["content"])
+        return [(3, 0.8), (4, 0.6), (6, 0.4)]
+
+    monkeypatch.setattr(hybrid.recommender, "get_user_recommendations", cf)
+    monkeypatch.setattr(hybrid.indexer_service, "find_similar", content)
+    monkeypatch.setattr(hybrid.popularity_service, "items", [(7, 1.0), (8, 0.5), (9, 0.2)])
+    monkeypatch.setattr(hybrid.popularity_service, "_refreshed_at", time.monotonic())
+    return delays
+
+def deadline(seconds: float) -> float:
+    return asyncio.get_running_loop().time() + seconds
+
+@pytest.mark.asyncio
+async def test_blends_both_sources_within_budget(sources):
+    recommender = HybridRecommender({"collaborative": 100, "content": 100})
+    result = await recommender.recommend(1, deadline(1), item_id=5, n_items=3, alpha=0.4, viewed_items=[2])
+
+    assert result.sources == ["collaborative", "content"] and not result.degraded
+    assert [item_id for item_id, _ in result.items] == [3, 1, 4]
+
+@pytest.mark.asyncio
+async def test_slow_stage_is_dropped(sources):
+    sources["content"] = 0.2
+    recommender = HybridRecommender({"collaborative": 100, "content": 50})
+    result = await recommender.recommend(1, deadline(1), item_id=5, n_items=2)
+
+    assert result.sources == ["collaborative"] and result.degraded
+    assert result.items == [(1, 1.0), (2, 0.5)]
+
+@pytest.mark.asyncio
+async def test_falls_back_to_popularity_when_budget_is_spent(sources):
+    recommender = HybridRecommender({"collaborative": 100, "content": 100})
+    result = await recommender.recommend(1, deadline(0), item_id=5, n_items=2, viewed_items=[7])
+
+    assert result.sources == ["popularity"] and result.degraded
+    assert result.items == [(8, 0.5), (9, 0.2)]
+
+@pytest.mark.asyncio
+async def test_abandoned_stage_holds_its_slot_until_its_thread_finishes(sources, monkeypatch):
+    calls = []
+
+    def content(item_id, k):
+        calls.append(item_id)
+        time.sleep(0.2)
+        return [(3, 0.8)]
+
+    executor = StageExecutor(max_workers=4, stage_limits={})
+    monkeypatch.setattr(hybrid, "stage_executor", executor)
+    monkeypatch.setattr(hybrid.indexer_service, "find_similar", content)
+    recommender = HybridRecommender({"collaborative": 100, "content": 50}, max_running=1)
+
+    first = await recommender.recommend(1, deadline(1), item_id=5, n_items=2)
+    # The first call is still running on its thread, so this one never starts
+    second = await recommender.recommend(1, deadline(1), item_id=6, n_items=2)
+    assert first.degraded and second.degraded
+    assert calls == [5]
+
+    await asyncio.sleep(0.2)
+    sources["content"] = 0.0
+    monkeypatch.setattr(hybrid.indexer_service, "find_similar", lambda item_id, k: [(3, 0.8)])
+    third = await recommender.recommend(1, deadline(1), item_id=7, n_items=2)
+    assert third.sources == ["collaborative", "content"] and not third.degraded
+    executor.shutdown()
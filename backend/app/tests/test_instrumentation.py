@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+from prometheus_client import CollectorRegistry, generate_latest
+
+from app.core import instrumentation
+from app.core.instrumentation import LiveGaugeCollector, set_spans_enabled, span, timed
+from app.core.metrics import SPAN_SECONDS
+
+def span_count(name: str) -> float:
+    for sample in SPAN_SECONDS.collect()[0].samples:
+        if sample.name.endswith("_count") and sample.labels["span"] == name:
+            return sample.value
+    return 0
+
+@pytest.fixture(autouse=True)
+def spans_on():
+    enabled = instrumentation.spans_enabled()
+    set_spans_enabled(True)
+    yield
+    set_spans_enabled(enabled)
+
+def test_span_and_timed_record_observations():
+    @timed("test_sync")
+    def work():
+        return 1
+
+    @timed("test_async")
+    async def async_work():
+        return 2
+
+    with span("test_block"):
+        pass
+    assert work() == 1
+    assert asyncio.run(async_work()) == 2
+    assert span_count("test_block") == 1
+    assert span_count("test_sync") == 1
+    assert span_count("test_async") == 1
+
+def test_disabled_spans_record_nothing():
+    @timed("test_disabled")
+    def work():
+        return 1
+
+    work()
+    set_spans_enabled(False)
+    with span("test_disabled"):
+        pass
+    assert work() == 1
+    assert span_count("test_disabled") == 1
+
+def test_live_gauges_are_read_at_scrape_time():
+    state = {"size": 3}
+    collector = LiveGaugeCollector()
+    collector.register("test_size", "Size", lambda: state["size"])
+    collector.register("test_info", "Info", lambda: {("v1",): 1}, ["version"])
+    registry = CollectorRegistry()
+    registry.register(collector)
+
+    state["size"] = 5
+    text = generate_latest(registry).decode()
+    assert "test_size 5.0" in text
+    assert 'test_info{version="v1"} 1.0' in text
+
+def test_server_timing_header_includes_executor_spans():
+    from app.core.concurrency import StageExecutor
+    from app.core.instrumentation import ServerTimingMiddleware
+
+    executor = StageExecutor(max_workers=1, stage_limits={})
+
+    def score():
+        with span("faiss_search"):
+            pass
+
+    async def app(scope, receive, send):
+        await executor.run(score)
+        await executor.run(score)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(ServerTimingMiddleware(app)({"type": "http"}, None, send))
+    executor.shutdown()
+    header = dict(messages[0]["headers"])[b"server-timing"].decode()
+    assert header.startswith("faiss_search;dur=")
+    assert 'desc="2 calls"' in header and ", total;dur=" in header
+
+def test_profiler_samples_the_request_and_its_executor_work():
+    import time
+
+    from app.core.concurrency import StageExecutor
+    from app.core.profiling import StackSampler, _sampler
+
+    executor = StageExecutor(max_workers=1, stage_limits={})
+
+    def busy_scoring():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+
+    async def request():
+        sampler = StackSampler(0.001)
+        _sampler.set(sampler)
+        sampler.start(asyncio.current_task())
+        await executor.run(busy_scoring)
+        sampler.stop()
+        return sampler
+
+    sampler = asyncio.run(request())
+    executor.shutdown()
+    assert sampler.samples > 0
+    assert any(stack.split(";")[-1].startswith("busy_scoring") for stack in sampler.stacks)
+    line = sampler.collapsed().splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+def test_batched_embedding_span_is_reported_by_every_waiting_request():
+    from app.core.instrumentation import ServerTimingMiddleware, _request_timings
+    from app.services.embeddings import EmbeddingService, QueryEmbeddingBatcher
+
+    class Model:
+        def encode(self, texts):
+            return [[float(len(text))] for text in texts]
+
+    service = EmbeddingService()
+    service._model = Model()
+    batcher = QueryEmbeddingBatcher(service, max_wait_ms=0)
+    request_timings = []
+
+    async def app(scope, receive, send):
+        request_timings.append(_request_timings.get())
+        await batcher.embed(scope["query"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    headers = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            headers.append(dict(message["headers"])[b"server-timing"].decode())
+
+    async def serve():
+        middleware = ServerTimingMiddleware(app)
+        for query in ["core", "yoga", "rowing"]:
+            await middleware({"type": "http", "query": query}, None, send)
+        await batcher.close()
+
+    asyncio.run(serve())
+    assert len(headers) == 3
+    assert all(header.startswith("embedding_encode;dur=") and "calls" not in header for header in headers)
+    # The worker started by the first request must not keep recording into it
+    assert [len(timings) for timings in request_timings] == [1, 1, 1]
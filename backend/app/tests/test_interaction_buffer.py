@@ -0,0 +1,139 @@
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import Interaction, InteractionType, Item, ItemType, DifficultyLevel
+from app.services.interaction_buffer import BufferFull, InteractionBuffer
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """File-backed async database with one item, shared by buffer and assertions"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'buffer.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as db:
+        db.add(Item(
+            id=1,
+            title="Item",
+            type=ItemType.WORKOUT,
+            tags=[],
+            duration=10,
+            difficulty=DifficultyLevel.BEGINNER
+        ))
+        await db.commit()
+    yield Session
+    await engine.dispose()
+
+def make_rows(n):
+    return [
+        {
+            "user_id": 1,
+            "item_id": 1,
+            "interaction_type": InteractionType.VIEW,
+            "created_at": datetime.utcnow()
+        }
+        for _ in range(n)
+    ]
+
+async def count_interactions(Session):
+    async with Session() as db:
+        return await db.scalar(select(func.count(Interaction.id)))
+
+@pytest.mark.asyncio
+async def test_graceful_shutdown_flushes_everything(session_factory):
+    buffer = InteractionBuffer(
+        flush_interval_ms=60000, flush_batch_size=40, session_factory=session_factory
+    )
+    await buffer.start()
+
+    await asyncio.gather(*(buffer.put(row) for row in make_rows(100)))
+    await buffer.put_many(make_rows(25))
+    await buffer.stop()
+
+    assert await count_interactions(session_factory) == 125
+
+@pytest.mark.asyncio
+async def test_log_replays_unflushed_rows_after_crash(session_factory, tmp_path):
+    log_path = str(tmp_path / "interactions.log")
+    crashed = InteractionBuffer(
+        flush_interval_ms=60000, log_path=log_path, session_factory=session_factory
+    )
+    await crashed.start()
+    await crashed.put_many(make_rows(7))
+    await crashed.flush()
+    await crashed.put_many(make_rows(5))
+    # Simulated crash: the flush loop dies without stop() flushing the queue,
+    # and the process exit releases its log slot
+    crashed._worker.cancel()
+    crashed._log_slot.release()
+    assert await count_interactions(session_factory) == 7
+
+    recovered = InteractionBuffer(log_path=log_path, session_factory=session_factory)
+    await recovered.start()
+    await recovered.stop()
+
+    assert await count_interactions(session_factory) == 12
+
+@pytest.mark.asyncio
+async def test_full_buffer_applies_backpressure(session_factory):
+    buffer = InteractionBuffer(
+        max_size=3, flush_interval_ms=60000, put_timeout_ms=20, session_factory=session_factory
+    )
+    await buffer.start()
+    buffer._flush_lock = asyncio.Lock()
+    await buffer._flush_lock.acquire()  # Stall flushing so the queue cannot drain
+
+    await buffer.put_many(make_rows(3))
+    with pytest.raises(BufferFull):
+        await buffer.put(make_rows(1)[0])
+
+    buffer._flush_lock.release()
+    await buffer.stop()
+    assert await count_interactions(session_factory) == 3
+
+@pytest.mark.asyncio
+async def test_each_process_claims_its_own_log_slot(session_factory, tmp_path):
+    log_path = str(tmp_path / "interactions.log")
+    first = InteractionBuffer(log_path=log_path, session_factory=session_factory)
+    second = InteractionBuffer(log_path=log_path, session_factory=session_factory)
+    await first.start()
+    await second.start()
+
+    assert (first.log_file, second.log_file) == (log_path, f"{log_path}.1")
+    await first.stop()
+    await second.stop()
+
+@pytest.mark.asyncio
+async def test_unclaimed_slots_are_merged_after_scaling_down(session_factory, tmp_path):
+    log_path = str(tmp_path / "interactions.log")
+    first = InteractionBuffer(flush_interval_ms=60000, log_path=log_path, session_factory=session_factory)
+    second = InteractionBuffer(flush_interval_ms=60000, log_path=log_path, session_factory=session_factory)
+    await first.start()
+    await second.start()
+    await first.put_many(make_rows(2))
+    await second.put_many(make_rows(3))
+    # Both workers die with rows acknowledged but not flushed
+    for crashed in (first, second):
+        crashed._worker.cancel()
+        crashed._log_slot.release()
+
+    # Restarted with a single worker: it only claims slot 0
+    recovered = InteractionBuffer(log_path=log_path, session_factory=session_factory)
+    await recovered.start()
+    assert recovered.log_file == log_path
+    assert await count_interactions(session_factory) == 5
+    assert not os.path.exists(f"{log_path}.1")
+    await recovered.stop()
+
+    # Nothing is replayed twice on the next start
+    again = InteractionBuffer(log_path=log_path, session_factory=session_factory)
+    await again.start()
+    await again.stop()
+    assert await count_interactions(session_factory) == 5
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import Interaction, InteractionType
+from app.services.interaction_export import InteractionExporter
+from app.services.recommender import RecommenderService
+
+@pytest_asyncio.fixture
+async def db_session(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'export.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    session = Session()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+async def add_interactions(db, rows):
+    await db.execute(insert(Interaction), [
+        {"user_id": u, "item_id": i, "interaction_type": t, "created_at": at}
+        for u, i, t, at in rows
+    ])
+    await db.commit()
+
+@pytest.mark.asyncio
+async def test_export_is_incremental_and_partitioned(db_session, tmp_path):
+    exporter = InteractionExporter(str(tmp_path / "export"), lag_seconds=60)
+    old = datetime(2026, 1, 31, 12)
+    await add_interactions(db_session, [
+        (1, 10, InteractionType.VIEW, old),
+        (1, 11, InteractionType.LIKE, old + timedelta(days=1)),
+        (2, 10, InteractionType.COMPLETE, old + timedelta(days=1)),
+        (2, 11, InteractionType.VIEW, datetime.utcnow()),  # inside the lag window
+    ])
+
+    assert await exporter.export(db_session) == 3
+    assert [p.parent.name for p in exporter.files()] == ["month=2026-01", "month=2026-02"]
+    assert exporter.read_manifest()["high_water_mark"] == 3
+    assert await exporter.export(db_session) == 0
+
+    exporter.lag_seconds = 0
+    assert await exporter.export(db_session) == 1
+    assert exporter.read_manifest()["rows"] == 4
+
+@pytest.mark.asyncio
+async def test_concurrent_exports_write_each_row_once(db_session, tmp_path):
+    await add_interactions(db_session, [
+        (1, 10 + i, InteractionType.VIEW, datetime(2026, 1, 1) + timedelta(hours=i))
+        for i in range(5)
+    ])
+    # Separate instances, as in separate worker processes
+    exporters = [InteractionExporter(str(tmp_path / "export"), lag_seconds=0) for _ in range(3)]
+
+    exported = await asyncio.gather(*(exporter.export(db_session) for exporter in exporters))
+
+    assert sorted(exported) == [0, 0, 5]
+    assert exporters[0].read_manifest()["rows"] == 5
+
+@pytest.mark.asyncio
+async def test_rows_inside_lag_window_hold_back_later_ids(db_session, tmp_path):
+    exporter = InteractionExporter(str(tmp_path / "export"), lag_seconds=60)
+    old = datetime(2026, 1, 31, 12)
+    await add_interactions(db_session, [
+        (1, 10, InteractionType.VIEW, old),
+        (1, 11, InteractionType.VIEW, datetime.utcnow()),  # inside the lag window
+        (2, 10, InteractionType.LIKE, old),  # higher id, older timestamp
+    ])
+
+    assert await exporter.export(db_session) == 1
+    assert exporter.read_manifest()["high_water_mark"] == 1
+
+    exporter.lag_seconds = 0
+    assert await exporter.export(db_session) == 2
+    assert sorted(exporter.load_columns()["item_ids"].tolist()) == [10, 10, 11]
+
+@pytest.mark.asyncio
+async def test_training_columns_match_database_rows(db_session, tmp_path):
+    exporter = InteractionExporter(str(tmp_path / "export"), lag_seconds=0)
+    rows = [
+        (1, 10, InteractionType.VIEW, datetime(2026, 3, 1)),
+        (1, 10, InteractionType.LIKE, datetime(2026, 3, 2)),
+        (3, 12, InteractionType.COMPLETE, datetime(2026, 4, 1)),
+        (2, 11, InteractionType.VIEW, datetime(2026, 4, 2)),
+    ]
+    await add_interactions(db_session, rows)
+    await exporter.export(db_session)
+
+    columns = exporter.load_columns()
+    recommender = RecommenderService()
+    from_files = recommender.build_interaction_matrix_from_columns(**columns)
+    from_rows = recommender.build_interaction_matrix([
+        Interaction(user_id=u, item_id=i, interaction_type=t) for u, i, t, _ in rows
+    ])
+
+    assert np.array_equal(from_files[0].toarray(), from_rows[0].toarray())
+    assert from_files[1] == from_rows[1] == {1: 0, 2: 1, 3: 2}
+    assert from_files[0][0, 0] == 4.0  # view + like on the same item
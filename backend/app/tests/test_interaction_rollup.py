@@ -0,0 +1,125 @@
+from datetime import date, datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import crud
+from app.db.base import Base
+from app.db.models import (
+    DifficultyLevel,
+    Interaction,
+    InteractionDailyCount,
+    InteractionType,
+    Item,
+    ItemType
+)
+
+@pytest_asyncio.fixture
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    session = Session()
+    session.add_all([
+        Item(id=i, title=f"Item {i}", type=ItemType.WORKOUT, tags=[], duration=10,
+             difficulty=DifficultyLevel.BEGINNER)
+        for i in range(1, 4)
+    ])
+    await session.commit()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+def event(item_id, interaction_type, day, hour=0, user_id=1):
+    return {
+        "user_id": user_id,
+        "item_id": item_id,
+        "interaction_type": interaction_type,
+        "created_at": datetime(2026, 3, day, hour),
+    }
+
+def training_weights(rows):
+    totals = {}
+    for row in rows:
+        key = (row.user_id, row.item_id, row.interaction_type)
+        totals[key] = totals.get(key, 0) + row.events
+    return totals
+
+@pytest.mark.asyncio
+async def test_rollup_compacts_old_views_and_preserves_training_data(db_session):
+    await db_session.execute(insert(Interaction), [
+        event(1, InteractionType.VIEW, 1, 8),
+        event(1, InteractionType.VIEW, 1, 9),
+        event(2, InteractionType.VIEW, 1, 10),
+        event(1, InteractionType.VIEW, 2, 8),
+        event(1, InteractionType.LIKE, 2, 9),
+        event(3, InteractionType.VIEW, 20),
+    ])
+    await db_session.commit()
+    before = training_weights(await crud.interaction.get_all_for_training(db_session))
+
+    compacted = await crud.interaction.rollup_views(db_session, datetime(2026, 3, 10))
+    assert compacted == 4
+    # A second run over the same window finds nothing left to compact
+    assert await crud.interaction.rollup_views(db_session, datetime(2026, 3, 10)) == 0
+
+    counts = (await db_session.execute(
+        select(InteractionDailyCount.day, InteractionDailyCount.item_id, InteractionDailyCount.count)
+        .order_by(InteractionDailyCount.day, InteractionDailyCount.item_id)
+    )).all()
+    assert [tuple(row) for row in counts] == [
+        (date(2026, 3, 1), 1, 2),
+        (date(2026, 3, 1), 2, 1),
+        (date(2026, 3, 2), 1, 1),
+    ]
+    remaining = await db_session.scalar(select(func.count()).select_from(Interaction))
+    assert remaining == 2  # the like and the recent view
+    assert training_weights(await crud.interaction.get_all_for_training(db_session)) == before
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("dialect", ["sqlite", "generic"])
+async def test_rollup_merges_into_existing_counts_and_respects_max_id(db_session, monkeypatch, dialect):
+    if dialect == "generic":
+        # Take the path for databases without ON CONFLICT
+        monkeypatch.setattr(db_session.get_bind().dialect, "name", "mssql")
+    await db_session.execute(insert(Interaction), [event(1, InteractionType.VIEW, 1)])
+    await db_session.commit()
+    await crud.interaction.rollup_views(db_session, datetime(2026, 3, 10))
+
+    # A late-arriving view for an already compacted day, plus one not yet exported
+    await db_session.execute(insert(Interaction), [
+        event(1, InteractionType.VIEW, 1, 12),
+        event(1, InteractionType.VIEW, 1, 13),
+    ])
+    await db_session.commit()
+    max_id = await db_session.scalar(select(func.min(Interaction.id)))
+    assert await crud.interaction.rollup_views(db_session, datetime(2026, 3, 10), max_id=max_id) == 1
+
+    count = await db_session.scalar(select(InteractionDailyCount.count))
+    assert count == 2
+    remaining = await db_session.scalar(select(func.count()).select_from(Interaction))
+    assert remaining == 1
+
+@pytest.mark.asyncio
+async def test_profile_built_after_rollup_keeps_compacted_views(db_session):
+    await db_session.execute(insert(Interaction), [
+        event(1, InteractionType.VIEW, 1, 8),
+        event(1, InteractionType.VIEW, 1, 9),
+        event(2, InteractionType.VIEW, 2, 8),
+        event(3, InteractionType.LIKE, 2, 9),
+        event(3, InteractionType.VIEW, 20),
+    ])
+    await db_session.commit()
+    before = await crud.user_profile.get_or_build(db_session, 1)
+
+    assert await crud.interaction.rollup_views(db_session, datetime(2026, 3, 10)) == 3
+    profile = await crud.user_profile.get_or_build(db_session, 1)
+
+    assert profile["seen_item_ids"] == before["seen_item_ids"] == [1, 2, 3]
+    assert profile["view_count"] == before["view_count"] == 4
+    assert profile["like_count"] == 1 and profile["liked_item_ids"] == [3]
+    # Compacted views lost their time of day, so only raw rows are recent
+    assert [entry["interaction_type"] for entry in profile["recent"]] == ["view", "like"]
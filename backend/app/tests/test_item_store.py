@@ -0,0 +1,101 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cache import TTLCache
+from app.db.base import Base
+from app.db.models import Item, ItemType, DifficultyLevel
+from app.schemas.item import Item as ItemSchema
+from app.services.catalog import ItemCatalog
+from app.services.item_store import ItemStore
+
+@pytest_asyncio.fixture
+async def db_session():
+    """Create an async test database session that counts SELECT statements"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    session = Session()
+    session.selects = []
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_selects(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            session.selects.append(statement)
+
+    yield session
+
+    await session.close()
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def test_items(db_session):
+    """Create test items and return their ids"""
+    items = [
+        Item(
+            title=f"Item {i}",
+            type=ItemType.WORKOUT,
+            tags=["test"],
+            duration=10 + i,
+            difficulty=DifficultyLevel.BEGINNER
+        )
+        for i in range(5)
+    ]
+    db_session.add_all(items)
+    await db_session.commit()
+    db_session.selects.clear()
+    return [item.id for item in items]
+
+@pytest.mark.asyncio
+async def test_get_scored_items_single_query_keeps_order(db_session, test_items):
+    store = ItemStore()
+    scored = [(test_items[3], 0.9), (9999, 0.8), (test_items[0], 0.5)]
+
+    rows = await store.get_scored_items(db_session, scored)
+
+    assert [row["id"] for row in rows] == [test_items[3], test_items[0]]
+    assert [row["similarity_score"] for row in rows] == [0.9, 0.5]
+    assert len(db_session.selects) == 1
+
+@pytest.mark.asyncio
+async def test_cache_serves_repeat_lookups_until_invalidated(db_session, test_items):
+    store = ItemStore(TTLCache("items", max_size=100, ttl_seconds=60))
+
+    await store.get_items(db_session, test_items)
+    await store.get_items(db_session, test_items)
+    assert len(db_session.selects) == 1
+
+    store.invalidate()
+    await store.get_items(db_session, test_items)
+    assert len(db_session.selects) == 2
+
+@pytest.mark.asyncio
+async def test_catalog_rows_match_orm_serialization(db_session, test_items):
+    catalog = ItemCatalog()
+    await catalog.refresh(db_session)
+    store = ItemStore(catalog=catalog)
+    db_session.selects.clear()
+
+    rows = await store.get_items(db_session, list(reversed(test_items)))
+
+    assert len(db_session.selects) == 0
+    expected = [
+        ItemSchema.from_orm(await db_session.get(Item, item_id)).dict()
+        for item_id in reversed(test_items)
+    ]
+    assert rows == expected
+
+def test_ttl_cache_expiry_and_lru_bound():
+    cache = TTLCache("test", max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None  # least recently used was evicted
+    assert cache.get("a") == 1
+
+    cache.set("d", 4, ttl_seconds=-1)
+    assert cache.get("d") is None
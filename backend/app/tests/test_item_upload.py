@@ -0,0 +1,79 @@
+import io
+
+import pandas as pd
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.models import DifficultyLevel, ItemType
+from app.services.item_upload import ItemUploadService, validate_chunk
+
+CSV = """title,type,tags,duration,difficulty,description
+Morning yoga,Workout,"[""yoga"", ""am""]",20,beginner,Gentle start
+Bad type,podcast,yoga,20,beginner,
+Hill sprints,video,"hills, speed",15.0,Advanced,
+,article,x,abc,beginner,
+"""
+
+def read_chunk():
+    return pd.read_csv(io.StringIO(CSV), dtype=str, keep_default_na=False)
+
+def test_validate_chunk_keeps_valid_rows_and_reports_errors():
+    rows, errors = validate_chunk(read_chunk(), first_row=101)
+
+    assert rows == [
+        {
+            "title": "Morning yoga",
+            "type": ItemType.WORKOUT,
+            "description": "Gentle start",
+            "tags": ["yoga", "am"],
+            "duration": 20,
+            "difficulty": DifficultyLevel.BEGINNER,
+            "media_url": None,
+        },
+        {
+            "title": "Hill sprints",
+            "type": ItemType.VIDEO,
+            "description": None,
+            "tags": ["hills", "speed"],
+            "duration": 15,
+            "difficulty": DifficultyLevel.ADVANCED,
+            "media_url": None,
+        },
+    ]
+    assert errors == [
+        "row 102: unknown type",
+        "row 104: missing title, duration must be a positive whole number",
+    ]
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'upload.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_job_status_is_shared_across_workers(session_factory):
+    # Separate instances, as in separate worker processes
+    running = ItemUploadService(history=2, session_factory=session_factory)
+    polling = ItemUploadService(history=2, session_factory=session_factory)
+
+    job = await running.create_job("items.csv")
+    job.status, job.rows_read = "running", 40
+    await running._save(job)
+    status = await polling.get_job(job.id)
+    assert (status["job_id"], status["status"], status["rows_read"]) == (job.id, "running", 40)
+
+    # Finished jobs beyond the history are pruned; running ones are kept
+    job.status = "completed"
+    await running._save(job)
+    for name in ("b.csv", "c.csv"):
+        finished = await running.create_job(name)
+        finished.status = "failed"
+        await running._save(finished)
+    await running.create_job("d.csv")
+    assert await polling.get_job(job.id) is None
+    assert await polling.get_job("missing") is None
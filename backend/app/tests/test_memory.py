@@ -0,0 +1,33 @@
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.services.memory import MemoryReporter, deep_sizeof
+
+def test_deep_sizeof_counts_array_buffers_and_containers():
+    array = np.zeros(1000, dtype=np.float32)
+    assert deep_sizeof(array) >= 4000
+    assert deep_sizeof([array, array]) >= 8000
+    assert deep_sizeof({"a": "x" * 1000}) > 1000
+
+def test_report_lists_caches_with_entries_and_bytes():
+    cache = TTLCache("test-memory-report", max_size=10)
+    for i in range(5):
+        cache.set(i, "x" * 1000)
+
+    report = MemoryReporter().report()
+    entry = report["caches"]["test-memory-report"]
+    assert entry["entries"] == 5
+    assert entry["bytes"] >= 5000
+    assert {"faiss_index", "als", "transformer", "catalog", "process"} <= report.keys()
+
+def test_top_allocations_requires_tracing():
+    reporter = MemoryReporter()
+    assert reporter.top_allocations() == []
+    reporter.start_tracing()
+    try:
+        data = [bytearray(100000) for _ in range(10)]
+        top = reporter.top_allocations(5)
+        assert top and top[0]["bytes"] >= 100000
+        del data
+    finally:
+        reporter.stop_tracing()
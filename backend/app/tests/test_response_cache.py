@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.db.models import ItemType
+from app.services.response_cache import ResponseCache
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis.asyncio commands the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    async def incr(self, key):
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+class DownRedis:
+    def __getattr__(self, name):
+        async def fail(*args, **kwargs):
+            raise ConnectionError("redis is down")
+        return fail
+
+@pytest.fixture
+def cache():
+    return ResponseCache(client=FakeRedis())
+
+@pytest.mark.asyncio
+async def test_repeat_requests_are_served_from_redis(cache):
+    calls = []
+    key = await cache.make_key("hybrid", 1, {"topn": 10}, ("idx", "model"))
+
+    async def compute():
+        calls.append(1)
+        return [{"id": 1, "similarity_score": 0.5}]
+
+    assert await cache.get_or_compute_json(key, compute) == b'[{"id":1,"similarity_score":0.5}]'
+    assert await cache.get_or_compute_json(key, compute) == b'[{"id":1,"similarity_score":0.5}]'
+    assert len(calls) == 1
+    assert key in cache.redis.data
+
+@pytest.mark.asyncio
+async def test_interaction_and_snapshot_change_the_key(cache):
+    key = await cache.make_key("hybrid", 1, {"topn": 10}, ("idx", "model"))
+
+    await cache.invalidate_user(1)
+    assert await cache.make_key("hybrid", 1, {"topn": 10}, ("idx", "model")) != key
+    assert await cache.make_key("hybrid", 2, {"topn": 10}, ("idx", "model")) == \
+        await cache.make_key("hybrid", 2, {"topn": 10}, ("idx", "model"))
+    assert await cache.make_key("hybrid", 2, {"topn": 10}, ("idx2", "model")) != \
+        await cache.make_key("hybrid", 2, {"topn": 10}, ("idx", "model"))
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_lru_when_redis_is_down():
+    cache = ResponseCache(client=DownRedis())
+    calls = []
+    key = await cache.make_key("content", None, {"item_id": 1}, ("idx", "model"))
+
+    async def compute():
+        calls.append(1)
+        return [1]
+
+    await cache.get_or_compute_json(key, compute)
+    await cache.get_or_compute_json(key, compute)
+
+    assert len(calls) == 1
+    assert cache.redis is None  # marked unavailable until the retry window passes
+    assert len(cache.local) == 1
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_compute_once(cache):
+    calls = []
+    key = await cache.make_key("hybrid", 1, {"topn": 10}, ("idx", "model"))
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [42]
+
+    results = await asyncio.gather(*[cache.get_or_compute_json(key, compute) for _ in range(8)])
+
+    assert results == [b"[42]"] * 8
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_cached_body_is_served_as_stored_bytes(cache):
+    key = await cache.make_key("content", None, {"item_id": 1}, ("idx", "model"))
+
+    async def compute():
+        return [{"id": 1, "type": ItemType.WORKOUT, "created_at": datetime(2026, 1, 2, 3, 4, 5)}]
+
+    body = await cache.get_or_compute_json(key, compute)
+    assert body == b'[{"id":1,"type":"workout","created_at":"2026-01-02T03:04:05"}]'
+    assert await cache.get_or_compute_json(key, compute) is cache.redis.data[key]
+
+@pytest.mark.asyncio
+async def test_uncached_concurrent_calls_share_result_and_errors():
+    cache = ResponseCache(enabled=False)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        if len(calls) > 1:
+            raise LookupError("not found")
+        return [42]
+
+    results = await asyncio.gather(*[cache.get_or_compute_json("k", compute) for _ in range(8)])
+    assert results == [b"[42]"] * 8 and len(calls) == 1
+
+    # Not cached: the next burst computes again, and its failure is shared too
+    results = await asyncio.gather(
+        *[cache.get_or_compute_json("k", compute) for _ in range(4)], return_exceptions=True
+    )
+    assert all(isinstance(result, LookupError) for result in results) and len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_followers_take_over_from_a_cancelled_leader():
+    cache = ResponseCache(enabled=False)
+    started = asyncio.Event()
+
+    async def compute():
+        started.set()
+        await asyncio.sleep(0.05)
+        return [1]
+
+    leader = asyncio.create_task(cache.get_or_compute_json("k", compute))
+    await started.wait()
+    follower = asyncio.create_task(cache.get_or_compute_json("k", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == b"[1]"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+def test_key_versions_pick_up_artifacts_from_other_workers(monkeypatch):
+    from app.api import recommend
+    
+    def retrained_elsewhere():
+        recommend.recommender.model_version = "retrained"
+    
+    monkeypatch.setattr(recommend.indexer_service, "maybe_reload", lambda: None)
+    monkeypatch.setattr(recommend.recommender, "model_version", "stale")
+    monkeypatch.setattr(recommend.recommender, "refresh_als", retrained_elsewhere)
+    assert recommend._artifact_versions()[1] == "retrained"
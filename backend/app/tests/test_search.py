@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.cache import TTLCache
+from app.db.base import Base
+from app.db.fts import install_fts
+from app.db.models import Item, ItemType, DifficultyLevel
+from app.services.embeddings import EmbeddingService, QueryEmbeddingBatcher
+from app.services.search import SearchService, reciprocal_rank_fusion
+
+@pytest_asyncio.fixture
+async def db_session():
+    """Create an async test database with the full-text index installed"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(install_fts)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    session = Session()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def test_items(db_session):
+    """Create test items and return their ids keyed by title"""
+    items = [
+        Item(title="Morning yoga", description="Gentle stretching"),
+        Item(title="Hill sprints", description="Finish with yoga stretches"),
+        Item(title="Kettlebell basics", description="Swings and goblet squats"),
+    ]
+    for item in items:
+        item.type = ItemType.WORKOUT
+        item.tags = []
+        item.duration = 20
+        item.difficulty = DifficultyLevel.BEGINNER
+    db_session.add_all(items)
+    await db_session.commit()
+    return {item.title: item.id for item in items}
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_matches_first(db_session, test_items):
+    results = await SearchService().search(db_session, "yoga")
+
+    assert [item_id for item_id, _ in results] == [
+        test_items["Morning yoga"], test_items["Hill sprints"]
+    ]
+    assert results[0][1] > results[1][1]
+
+@pytest.mark.asyncio
+async def test_search_prefix_terms_all_required(db_session, test_items):
+    service = SearchService()
+
+    assert [i for i, _ in await service.search(db_session, "kettle swi")] == [
+        test_items["Kettlebell basics"]
+    ]
+    assert await service.search(db_session, "kettle yoga") == []
+    assert await service.search(db_session, "\"*) OR (") == []
+
+@pytest.mark.asyncio
+async def test_search_index_follows_updates_and_deletes(db_session, test_items):
+    service = SearchService()
+    await db_session.execute(
+        update(Item).where(Item.id == test_items["Kettlebell basics"]).values(title="Rowing intervals")
+    )
+    await db_session.execute(delete(Item).where(Item.id == test_items["Hill sprints"]))
+    await db_session.commit()
+
+    assert await service.search(db_session, "kettlebell") == []
+    assert [i for i, _ in await service.search(db_session, "rowing")] == [
+        test_items["Kettlebell basics"]
+    ]
+    assert [i for i, _ in await service.search(db_session, "yoga")] == [
+        test_items["Morning yoga"]
+    ]
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    lexical = [(1, 12.0), (2, 9.5), (3, 1.0)]
+    semantic = [(3, 0.9), (1, 0.8), (4, 0.7)]
+
+    fused = reciprocal_rank_fusion([lexical, semantic], k=60)
+
+    assert [item_id for item_id, _ in fused] == [1, 3, 2, 4]
+    assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+@pytest.mark.asyncio
+async def test_query_embedding_cache_skips_repeat_encodes():
+    class CountingModel:
+        calls = 0
+
+        def encode(self, texts):
+            CountingModel.calls += 1
+            return [[float(len(text))] for text in texts]
+
+    service = EmbeddingService(TTLCache("queries", max_size=1))
+    service._model = CountingModel()
+    batcher = QueryEmbeddingBatcher(service, max_wait_ms=0)
+
+    await batcher.embed("Hip  mobility")
+    await batcher.embed(" hip mobility ")
+    assert CountingModel.calls == 1
+
+    await batcher.embed("core")
+    await batcher.embed("hip mobility")
+    await batcher.close()
+    assert CountingModel.calls == 3
+
+@pytest.mark.asyncio
+async def test_concurrent_query_embeddings_share_one_batch():
+    batches = []
+
+    class RecordingModel:
+        def encode(self, texts):
+            batches.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+    service = EmbeddingService(TTLCache("queries"))
+    service._model = RecordingModel()
+    batcher = QueryEmbeddingBatcher(service, max_batch_size=8, max_wait_ms=50)
+
+    queries = ["core", "Core ", "hip mobility", "yoga", "rowing"]
+    results = await asyncio.gather(*(batcher.embed(q) for q in queries))
+    await batcher.close()
+
+    assert batches == [["core", "hip mobility", "yoga", "rowing"]]
+    assert [r[0] for r in results] == [4.0, 4.0, 12.0, 4.0, 6.0]
+    assert await batcher.embed("yoga") == [4.0]
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core import security
+from app.db.base import Base
+from app.db.models import User, UserRole
+
+@pytest_asyncio.fixture
+async def session_factory(monkeypatch):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as db:
+        db.add(User(id=1, email="a@example.com", username="a", hashed_password="x", role=UserRole.USER))
+        await db.commit()
+    monkeypatch.setattr(security, "AsyncSessionLocal", Session)
+    security.claims_cache.clear()
+    security.principal_cache.clear()
+    yield Session
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_principal_is_served_from_cache(session_factory, monkeypatch):
+    token = security.create_access_token({"sub": "1"}, timedelta(minutes=5))
+    decodes = []
+    real_decode = security.jwt.decode
+    monkeypatch.setattr(security.jwt, "decode", lambda *a, **kw: decodes.append(1) or real_decode(*a, **kw))
+    queries = []
+    real_factory = security.AsyncSessionLocal
+    monkeypatch.setattr(security, "AsyncSessionLocal", lambda: queries.append(1) or real_factory())
+
+    for _ in range(3):
+        principal = await security.get_current_principal(token)
+    assert principal == security.Principal(1, UserRole.USER)
+    assert len(decodes) == 1
+    assert len(queries) == 1
+
+@pytest.mark.asyncio
+async def test_role_change_invalidates_principal(session_factory):
+    token = security.create_access_token({"sub": "1"}, timedelta(minutes=5))
+    assert (await security.get_current_principal(token)).role == UserRole.USER
+
+    async with session_factory() as db:
+        user = (await db.execute(select(User).where(User.id == 1))).scalar_one()
+        user.role = UserRole.ADMIN
+        await db.commit()
+
+    assert 1 not in security.principal_cache.get_many([1])
+    assert (await security.get_current_principal(token)).role == UserRole.ADMIN
+
+@pytest.mark.asyncio
+async def test_expired_and_invalid_tokens_are_rejected(session_factory):
+    with pytest.raises(HTTPException):
+        await security.get_current_principal("not-a-token")
+    expired = security.create_access_token({"sub": "1"}, timedelta(seconds=-1))
+    with pytest.raises(HTTPException):
+        await security.get_current_principal(expired)
+    missing_user = security.create_access_token({"sub": "99"}, timedelta(minutes=5))
+    with pytest.raises(HTTPException):
+        await security.get_current_principal(missing_user)
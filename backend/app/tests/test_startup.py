@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.services.warmup import WarmupService
+
+HEAVY_MODULES = ["faiss", "implicit", "scipy", "pandas", "pyarrow", "sentence_transformers", "langchain"]
+
+def test_importing_the_app_does_not_import_heavy_dependencies():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[2],
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+@pytest.mark.asyncio
+async def test_warmup_reports_per_component_status():
+    warmup = WarmupService()
+    order = []
+
+    async def ok():
+        order.append("ok")
+
+    async def broken():
+        raise RuntimeError("model missing")
+
+    warmup.register("ok", ok)
+    warmup.register("broken", broken)
+    assert not warmup.ready
+
+    await warmup.warm(["ok"])
+    assert warmup.ready
+    assert warmup.report()["components"]["ok"]["state"] == "ready"
+
+    await warmup.warm(["ok", "broken", "nope"])
+    report = warmup.report()
+    assert not report["ready"]
+    assert report["components"]["broken"] == {
+        **report["components"]["broken"], "state": "failed", "error": "model missing"
+    }
+    assert report["components"]["nope"]["error"] == "unknown component"
+
+@pytest.mark.asyncio
+async def test_missing_faiss_index_is_reported_degraded(monkeypatch, tmp_path):
+    from app.core.config import settings
+    from app.services import warmup as warmup_module
+    from app.services.indexer import indexer_service
+
+    monkeypatch.setattr(settings, "FAISS_INDEX_PATH", str(tmp_path / "index.faiss"))
+    monkeypatch.setattr(settings, "ITEM_MAPPING_PATH", str(tmp_path / "mapping.json"))
+    monkeypatch.setattr(indexer_service, "_state", None)
+    warmup = WarmupService()
+    warmup.register("faiss_index", warmup_module._warm_faiss_index)
+
+    await warmup.warm(["faiss_index"])
+    report = warmup.report()
+    assert report["ready"] and report["degraded"]
+    assert report["components"]["faiss_index"]["state"] == "degraded"
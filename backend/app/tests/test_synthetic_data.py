@@ -0,0 +1,41 @@
+import numpy as np
+
+from app.services.interaction_export import InteractionExporter
+from scripts.generate_synthetic_data import Spec, generate_interactions
+
+SPEC = Spec(
+    seed=7,
+    users=3000,
+    items=400,
+    interactions=250000,
+    zipf=1.0,
+    activity_sigma=1.2,
+    clusters=10,
+    affinity=0.7,
+    session_length=8.0,
+    gap_seconds=90.0,
+    type_probs=(0.75, 0.15, 0.10),
+    days=90,
+    end="2026-01-01"
+)
+
+def generate(path, chunk_rows, workers):
+    exporter = InteractionExporter(str(path))
+    assert generate_interactions(SPEC, chunk_rows, workers, out_dir=str(path)) == SPEC.interactions
+    return exporter
+
+def test_same_seed_gives_same_data_for_any_chunking(tmp_path):
+    serial = generate(tmp_path / "serial", chunk_rows=10 ** 9, workers=1)
+    parallel = generate(tmp_path / "parallel", chunk_rows=60000, workers=3)
+
+    columns = serial.load_columns()
+    other = parallel.load_columns()
+    assert len(columns["user_ids"]) == SPEC.interactions
+    for name in columns:
+        assert np.array_equal(columns[name], other[name])
+    assert serial.read_manifest()["high_water_mark"] == SPEC.interactions
+
+    # Power-law popularity: the top 1% of items take a large share of interactions
+    counts = np.sort(np.bincount(columns["item_ids"]))[::-1]
+    assert counts[:4].sum() > 0.15 * SPEC.interactions
+    assert columns["item_ids"].min() >= 1 and columns["item_ids"].max() <= SPEC.items
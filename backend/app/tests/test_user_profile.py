@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import crud
+from app.db.base import Base
+from app.db.models import Interaction, InteractionType, Item, ItemType, DifficultyLevel, UserProfile, UserRole
+
+@pytest_asyncio.fixture
+async def db_session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    session = Session()
+    session.add_all([
+        Item(id=i, title=f"Item {i}", type=ItemType.WORKOUT, tags=[], duration=10,
+             difficulty=DifficultyLevel.BEGINNER)
+        for i in range(1, 6)
+    ])
+    await session.commit()
+    yield session
+    await session.close()
+    await engine.dispose()
+
+def event(item_id, interaction_type, minutes, user_id=1):
+    return {
+        "user_id": user_id,
+        "item_id": item_id,
+        "interaction_type": interaction_type,
+        "created_at": datetime(2026, 5, 1) + timedelta(minutes=minutes),
+    }
+
+@pytest.mark.asyncio
+async def test_profile_built_from_history_then_updated_on_write(db_session):
+    # History written before profiles existed
+    await db_session.execute(insert(Interaction), [
+        event(1, InteractionType.VIEW, 0),
+        event(1, InteractionType.LIKE, 1),
+        event(2, InteractionType.COMPLETE, 2),
+    ])
+    await db_session.commit()
+
+    await crud.interaction.create_many(db_session, [
+        event(3, InteractionType.LIKE, 3),
+        event(1, InteractionType.LIKE, 4),
+        event(4, InteractionType.VIEW, 5, user_id=2),
+    ])
+    profile = await crud.user_profile.get_or_build(db_session, 1)
+
+    assert (profile["view_count"], profile["like_count"], profile["complete_count"]) == (1, 3, 1)
+    assert profile["seen_item_ids"] == [1, 2, 3]
+    assert profile["liked_item_ids"] == [1, 3]
+    assert profile["completed_item_ids"] == [2]
+    assert [r["item_id"] for r in profile["recent"]] == [1, 3, 2, 1, 1]
+    assert profile["last_active_at"] == datetime(2026, 5, 1, 0, 4)
+
+    await crud.interaction.create_many(db_session, [event(5, InteractionType.COMPLETE, 6)])
+    db_session.expire_all()
+    profile = await crud.user_profile.get_or_build(db_session, 1)
+
+    assert profile["complete_count"] == 2
+    assert profile["completed_item_ids"] == [5, 2]
+    assert profile["seen_item_ids"] == [1, 2, 3, 5]
+    assert (await crud.user_profile.get_or_build(db_session, 2))["view_count"] == 1
+
+@pytest.mark.asyncio
+async def test_profile_read_never_writes(db_session):
+    await db_session.execute(insert(Interaction), [event(2, InteractionType.VIEW, 0)])
+    await db_session.commit()
+
+    assert (await crud.user_profile.get_or_build(db_session, 1))["seen_item_ids"] == [2]
+    assert (await crud.user_profile.get_or_build(db_session, 3))["view_count"] == 0
+    assert await db_session.get(UserProfile, 1) is None
+    assert await db_session.get(UserProfile, 3) is None
+
+    await crud.interaction.create_many(db_session, [event(3, InteractionType.VIEW, 1)])
+    assert (await db_session.get(UserProfile, 1)).seen_item_ids == [2, 3]
+
+@pytest.mark.asyncio
+async def test_recommendations_for_unknown_user_are_empty(db_session):
+    from httpx import AsyncClient
+
+    from app.core.security import Principal, get_current_principal
+    from app.db.session import get_async_db
+    from app.main import app
+
+    # Enforce the user_profile -> users foreign key as Postgres would
+    await db_session.execute(text("PRAGMA foreign_keys=ON"))
+
+    async def override_db():
+        yield db_session
+
+    app.dependency_overrides[get_async_db] = override_db
+    app.dependency_overrides[get_current_principal] = lambda: Principal(id=1, role=UserRole.USER)
+    try:
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/api/v1/recommend/collaborative/999")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == []
+    assert await db_session.get(UserProfile, 999) is None
@@ -0,0 +1,36 @@
+"""Gunicorn settings for serving the API with several uvicorn worker processes.
+
+The app is imported and its read-only model state preloaded once in the
+master, so every forked worker shares those pages instead of holding a copy.
+Per-process state is multi-worker safe: upload progress lives in the
+upload_jobs table, only one worker at a time runs the scheduled interaction
+export, and each worker's write-behind buffer claims its own append log slot.
+
+Usage: gunicorn -c gunicorn.conf.py app.main:app
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = 120
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before any worker forks"""
+    from app.core.config import settings
+    from app.services.warmup import preload
+
+    components = [name.strip() for name in settings.PRELOAD_COMPONENTS.split(",") if name.strip()]
+    loaded = preload(components)
+    # Keep the collector from touching (and so copying) objects inherited from the master
+    gc.freeze()
+    server.log.info(f"Preloaded {', '.join(loaded) or 'nothing'}; forking {server.num_workers} workers")
+
+def child_exit(server, worker):
+    """With PROMETHEUS_MULTIPROC_DIR set, drop a dead worker's live gauge files"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
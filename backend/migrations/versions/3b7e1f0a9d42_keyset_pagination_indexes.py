@@ -0,0 +1,23 @@
+"""Add composite indexes for keyset pagination."""
+from alembic import op
+
+revision = '3b7e1f0a9d42'
+down_revision = 'c9d9c5284c83'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_items_created_at_id',
+        'items',
+        ['created_at', 'id']
+    )
+    op.create_index(
+        'ix_interactions_user_id_created_at_id',
+        'interactions',
+        ['user_id', 'created_at', 'id']
+    )
+
+def downgrade() -> None:
+    op.drop_index('ix_interactions_user_id_created_at_id', table_name='interactions')
+    op.drop_index('ix_items_created_at_id', table_name='items')
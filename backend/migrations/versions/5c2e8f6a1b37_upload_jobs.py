@@ -0,0 +1,28 @@
+"""Add upload_jobs table so upload progress is visible from every worker."""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '5c2e8f6a1b37'
+down_revision = 'e1b93d7a5c04'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        'upload_jobs',
+        sa.Column('id', sa.String(32), primary_key=True),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('rows_read', sa.Integer(), nullable=False),
+        sa.Column('items_created', sa.Integer(), nullable=False),
+        sa.Column('items_indexed', sa.Integer(), nullable=False),
+        sa.Column('rows_rejected', sa.Integer(), nullable=False),
+        sa.Column('errors', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('finished_at', sa.DateTime())
+    )
+    op.create_index('ix_upload_jobs_created_at', 'upload_jobs', ['created_at'])
+
+def downgrade() -> None:
+    op.drop_index('ix_upload_jobs_created_at', table_name='upload_jobs')
+    op.drop_table('upload_jobs')
@@ -0,0 +1,28 @@
+"""Add full-text search index on items."""
+from alembic import op
+from sqlalchemy import text
+
+from app.db.fts import POSTGRES_DDL, POSTGRES_DROP, SQLITE_DDL, SQLITE_DROP
+
+revision = '7d2a4c1e5b90'
+down_revision = '3b7e1f0a9d42'
+branch_labels = None
+depends_on = None
+
+def _run(statements) -> None:
+    for statement in statements:
+        op.execute(text(statement))
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _run(POSTGRES_DDL)
+    elif dialect == 'sqlite':
+        _run(SQLITE_DDL)
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        _run(POSTGRES_DROP)
+    elif dialect == 'sqlite':
+        _run(SQLITE_DROP)
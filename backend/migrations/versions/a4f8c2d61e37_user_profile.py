@@ -0,0 +1,27 @@
+"""Add user_profile aggregates table."""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a4f8c2d61e37'
+down_revision = '7d2a4c1e5b90'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Rows are built from interaction history on a user's first write after this migration
+    op.create_table(
+        'user_profile',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('view_count', sa.Integer(), nullable=False),
+        sa.Column('like_count', sa.Integer(), nullable=False),
+        sa.Column('complete_count', sa.Integer(), nullable=False),
+        sa.Column('last_active_at', sa.DateTime()),
+        sa.Column('recent', sa.JSON(), nullable=False),
+        sa.Column('seen_item_ids', sa.JSON(), nullable=False),
+        sa.Column('liked_item_ids', sa.JSON(), nullable=False),
+        sa.Column('completed_item_ids', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime())
+    )
+
+def downgrade() -> None:
+    op.drop_table('user_profile')
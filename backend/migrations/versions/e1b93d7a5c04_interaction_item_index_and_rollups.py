@@ -0,0 +1,35 @@
+"""Add (item_id, interaction_type) index and daily interaction rollups.
+
+The (user_id, created_at) access path is already served by
+ix_interactions_user_id_created_at_id from the keyset pagination migration.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'e1b93d7a5c04'
+down_revision = 'a4f8c2d61e37'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_interactions_item_id_interaction_type',
+        'interactions',
+        ['item_id', 'interaction_type']
+    )
+    op.create_table(
+        'interaction_daily_counts',
+        sa.Column('day', sa.Date(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('item_id', sa.Integer(), sa.ForeignKey('items.id'), primary_key=True),
+        sa.Column(
+            'interaction_type',
+            sa.Enum('VIEW', 'LIKE', 'COMPLETE', name='interactiontype', create_type=False),
+            primary_key=True
+        ),
+        sa.Column('count', sa.Integer(), nullable=False)
+    )
+
+def downgrade() -> None:
+    op.drop_table('interaction_daily_counts')
+    op.drop_index('ix_interactions_item_id_interaction_type', table_name='interactions')
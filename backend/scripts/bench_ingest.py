@@ -0,0 +1,118 @@
+"""Measure interaction ingest throughput: one event per request vs batches.
+
+Replays the database work of POST /interactions/ (existence check, insert,
+commit, refresh per event) and POST /interactions/batch (one IN check, one
+bulk insert and commit per batch).
+
+Usage: python scripts/bench_ingest.py --events 5000 --batch-sizes 10 50 500
+       python scripts/bench_ingest.py --url postgresql+asyncpg://...  # COPY path
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import crud
+from app.db.base import Base
+from app.db.models import DifficultyLevel, Interaction, InteractionType, Item, ItemType, User, UserRole
+from app.schemas.interaction import InteractionCreate
+
+N_ITEMS = 1000
+
+async def setup(engine) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(Interaction))
+        if not (await conn.execute(select(User.id).where(User.id == 1))).first():
+            await conn.execute(insert(User), [{
+                "id": 1,
+                "email": "bench@example.com",
+                "username": "bench",
+                "hashed_password": "x",
+                "role": UserRole.USER
+            }])
+        if (await conn.execute(select(Item.id).limit(1))).first() is None:
+            await conn.execute(insert(Item), [{
+                "title": f"Item {i}",
+                "type": ItemType.WORKOUT,
+                "tags": [],
+                "duration": 20,
+                "difficulty": DifficultyLevel.BEGINNER
+            } for i in range(N_ITEMS)])
+
+def make_events(n: int, item_ids):
+    rng = random.Random(0)
+    return [
+        InteractionCreate(item_id=rng.choice(item_ids), interaction_type=rng.choice(list(InteractionType)))
+        for _ in range(n)
+    ]
+
+async def ingest_single(Session, events) -> None:
+    async with Session() as db:
+        for event in events:
+            await db.scalar(select(Item.id).where(Item.id == event.item_id))
+            await crud.interaction.create(db, user_id=1, obj_in=event)
+
+async def ingest_batched(Session, events, batch_size: int) -> None:
+    async with Session() as db:
+        for start in range(0, len(events), batch_size):
+            batch = events[start:start + batch_size]
+            existing = await crud.item.get_existing_ids(db, (e.item_id for e in batch))
+            now = datetime.utcnow()
+            await crud.interaction.create_many(db, [
+                {
+                    "user_id": 1,
+                    "item_id": e.item_id,
+                    "interaction_type": e.interaction_type,
+                    "created_at": now
+                }
+                for e in batch if e.item_id in existing
+            ])
+
+async def run(url: str, n_events: int, batch_sizes) -> None:
+    engine = create_async_engine(url)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    await setup(engine)
+    async with Session() as db:
+        item_ids = list((await db.execute(select(Item.id))).scalars())
+    events = make_events(n_events, item_ids)
+
+    cases = [("single", lambda: ingest_single(Session, events))]
+    cases += [
+        (f"batch={size}", lambda size=size: ingest_batched(Session, events, size))
+        for size in batch_sizes
+    ]
+    for label, ingest in cases:
+        async with engine.begin() as conn:
+            await conn.execute(delete(Interaction))
+        start = time.perf_counter()
+        await ingest()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<12} {n_events / elapsed:10.0f} events/s  ({elapsed:.2f}s)")
+    await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Async database URL (default: temporary SQLite file)")
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 50, 500])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite+aiosqlite:///{Path(tmp) / 'ingest.db'}"
+        print(f"{args.events} events against {url.split('://')[0]}")
+        asyncio.run(run(url, args.events, args.batch_sizes))
+
+if __name__ == "__main__":
+    main()
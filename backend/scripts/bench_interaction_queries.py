@@ -0,0 +1,184 @@
+"""Query plans and timings for the hot interaction queries, before and after
+the composite indexes (user_id, created_at, id) and (item_id, interaction_type).
+
+Loads `--rows` synthetic interactions (default 10M, generated server-side),
+drops the composite indexes, times each query and prints its plan, then
+creates the indexes and repeats. Item popularity is skewed so a few items
+carry most interactions, like real traffic.
+
+Point --url at an empty scratch database: the schema is created there and
+data is generated only while the interactions table is empty, so re-runs
+reuse it.
+
+Usage: python scripts/bench_interaction_queries.py --url postgresql://.../bench
+       python scripts/bench_interaction_queries.py --rows 1000000  # temporary SQLite file
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from sqlalchemy import create_engine, text
+
+from app.db.base import Base
+from app.db.models import Interaction
+
+COMPOSITE_INDEXES = [
+    "ix_interactions_user_id_created_at_id",
+    "ix_interactions_item_id_interaction_type",
+]
+CHUNK_ROWS = 1_000_000
+
+QUERIES = {
+    "user history page": (
+        "SELECT id, item_id, interaction_type, created_at FROM interactions "
+        "WHERE user_id = :user_id ORDER BY created_at DESC, id DESC LIMIT 50"
+    ),
+    "user seen items": "SELECT DISTINCT item_id FROM interactions WHERE user_id = :user_id",
+    "item like count": (
+        "SELECT count(*) FROM interactions WHERE item_id = :item_id AND interaction_type = 'LIKE'"
+    ),
+    "most liked items": (
+        "SELECT item_id, count(*) AS n FROM interactions WHERE interaction_type = 'LIKE' "
+        "GROUP BY item_id ORDER BY n DESC LIMIT 20"
+    ),
+}
+
+POSTGRES_LOAD = {
+    "users": (
+        "INSERT INTO users (id, email, username, hashed_password, role, created_at) "
+        "SELECT g, 'bench' || g || '@example.com', 'bench' || g, 'x', 'USER', now() "
+        "FROM generate_series(1, :n) g"
+    ),
+    "items": (
+        "INSERT INTO items (id, title, type, tags, duration, difficulty, created_at) "
+        "SELECT g, 'Item ' || g, 'WORKOUT', '[]'::json, 20, 'BEGINNER', now() "
+        "FROM generate_series(1, :n) g"
+    ),
+    "interactions": (
+        "INSERT INTO interactions (user_id, item_id, interaction_type, created_at) "
+        "SELECT 1 + floor(random() * :users)::int, 1 + floor(:items * x * x * x)::int, "
+        "(CASE WHEN p < 80 THEN 'VIEW' WHEN p < 95 THEN 'LIKE' ELSE 'COMPLETE' END)::interactiontype, "
+        "now() - random() * interval '365 days' "
+        "FROM (SELECT random() AS x, floor(random() * 100) AS p FROM generate_series(1, :n)) s"
+    ),
+    "analyze": "VACUUM ANALYZE interactions",
+    "explain": "EXPLAIN (ANALYZE, BUFFERS) ",
+}
+
+SQLITE_LOAD = {
+    "users": (
+        "INSERT INTO users (id, email, username, hashed_password, role, created_at) "
+        "WITH RECURSIVE g(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM g WHERE n < :n) "
+        "SELECT n, 'bench' || n || '@example.com', 'bench' || n, 'x', 'USER', datetime('now') FROM g"
+    ),
+    "items": (
+        "INSERT INTO items (id, title, type, tags, duration, difficulty, created_at) "
+        "WITH RECURSIVE g(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM g WHERE n < :n) "
+        "SELECT n, 'Item ' || n, 'WORKOUT', '[]', 20, 'BEGINNER', datetime('now') FROM g"
+    ),
+    "interactions": (
+        "INSERT INTO interactions (user_id, item_id, interaction_type, created_at) "
+        "WITH RECURSIVE g(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM g WHERE n < :n) "
+        "SELECT 1 + abs(random()) % :users, 1 + CAST(:items * x * x * x AS INTEGER), "
+        "CASE WHEN p < 80 THEN 'VIEW' WHEN p < 95 THEN 'LIKE' ELSE 'COMPLETE' END, "
+        "datetime('now', '-' || (abs(random()) % 31536000) || ' seconds') "
+        "FROM (SELECT (abs(random()) % 1000000) / 1000000.0 AS x, abs(random()) % 100 AS p FROM g)"
+    ),
+    "analyze": "ANALYZE",
+    "explain": "EXPLAIN QUERY PLAN ",
+}
+
+def load(engine, sql: dict, rows: int, users: int, items: int) -> None:
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        if conn.scalar(text("SELECT count(*) FROM interactions")):
+            print("Reusing existing interactions")
+            return
+        conn.execute(text(sql["users"]), {"n": users})
+        conn.execute(text(sql["items"]), {"n": items})
+    start = time.perf_counter()
+    for offset in range(0, rows, CHUNK_ROWS):
+        with engine.begin() as conn:
+            conn.execute(text(sql["interactions"]), {
+                "n": min(CHUNK_ROWS, rows - offset),
+                "users": users,
+                "items": items,
+            })
+        print(f"  loaded {min(offset + CHUNK_ROWS, rows)} rows", end="\r")
+    print(f"Loaded {rows} interactions in {time.perf_counter() - start:.1f}s")
+
+def analyze(engine, sql: dict) -> None:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(sql["analyze"]))
+
+def plan(conn, sql: dict, query: str, params: dict) -> str:
+    rows = conn.execute(text(sql["explain"] + query), params).all()
+    # Postgres returns one text line per row; SQLite's detail is the last column
+    lines = [str(row[-1]).strip() for row in rows]
+    return "\n".join(f"      {line}" for line in lines if "Planning" not in line)
+
+def measure(engine, sql: dict, repeat: int, users: int, items: int) -> dict:
+    rng = random.Random(0)
+    timings = {}
+    with engine.connect() as conn:
+        for label, query in QUERIES.items():
+            runs = repeat if ":" in query else min(repeat, 3)
+            samples = []
+            for _ in range(runs):
+                params = {"user_id": rng.randint(1, users), "item_id": rng.randint(1, items // 20)}
+                start = time.perf_counter()
+                conn.execute(text(query), params).all()
+                samples.append((time.perf_counter() - start) * 1000)
+            timings[label] = statistics.median(samples)
+            print(f"    {label:<18} {timings[label]:10.2f} ms")
+            print(plan(conn, sql, query, params))
+    return timings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Database URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{Path(tmp) / 'interactions.db'}"
+        engine = create_engine(url)
+        sql = POSTGRES_LOAD if engine.dialect.name == "postgresql" else SQLITE_LOAD
+        load(engine, sql, args.rows, args.users, args.items)
+
+        with engine.begin() as conn:
+            for name in COMPOSITE_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        analyze(engine, sql)
+        print("Without composite indexes (median of runs):")
+        before = measure(engine, sql, args.repeat, args.users, args.items)
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            for index in Interaction.__table__.indexes:
+                if index.name in COMPOSITE_INDEXES:
+                    index.create(conn)
+        print(f"Built composite indexes in {time.perf_counter() - start:.1f}s")
+        analyze(engine, sql)
+        print("With composite indexes (median of runs):")
+        after = measure(engine, sql, args.repeat, args.users, args.items)
+
+        print("Summary:")
+        for label in QUERIES:
+            print(f"  {label:<18} {before[label]:10.2f} ms -> {after[label]:8.2f} ms "
+                  f"({before[label] / max(after[label], 1e-6):.0f}x)")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
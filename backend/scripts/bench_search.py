@@ -0,0 +1,101 @@
+"""Compare ILIKE scans with the full-text index for /items/search.
+
+ILIKE is timed the way the endpoint used it before the index existed: every
+match, unranked. FTS returns the top 20 by BM25.
+
+Usage: python scripts/bench_search.py --items 10000 100000 --queries 200
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import crud
+from app.db.base import Base
+from app.db.fts import install_fts
+from app.db.models import DifficultyLevel, Item, ItemType
+from app.services.search import SearchService
+
+BASE_WORDS = (
+    "yoga strength cardio mobility core balance stretch interval endurance power "
+    "beginner recovery breathing tempo hill sprint kettlebell barbell bodyweight "
+    "pilates flow hips shoulders posture running cycling rowing swim plank squat"
+).split()
+# Suffixed variants give a long-tailed vocabulary so most queries are selective
+WORDS = [f"{word}{suffix}" for word in BASE_WORDS for suffix in ("", *map(str, range(1, 100)))]
+
+def make_items(n: int, rng: random.Random):
+    for i in range(n):
+        yield {
+            "title": " ".join(rng.choices(WORDS, k=3)) + f" {i}",
+            "type": rng.choice(list(ItemType)),
+            "description": " ".join(rng.choices(WORDS, k=30)),
+            "tags": rng.sample(BASE_WORDS, 3),
+            "duration": rng.randint(5, 90),
+            "difficulty": rng.choice(list(DifficultyLevel)),
+        }
+
+def populate(path: str, n: int) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        install_fts(connection)
+        rows = list(make_items(n, random.Random(0)))
+        for start in range(0, n, 5000):
+            connection.execute(insert(Item), rows[start:start + 5000])
+    engine.dispose()
+
+def summarize(label: str, samples) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"  {label:<6} p50={statistics.median(ms):8.2f}ms  p95={p95:8.2f}ms")
+
+async def bench(path: str, n: int, queries: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    service = SearchService()
+    rng = random.Random(1)
+    terms = [rng.choice(WORDS) for _ in range(queries)]
+
+    async with Session() as db:
+        await service.search(db, "warmup")
+        ilike, fts = [], []
+        for q in terms:
+            start = time.perf_counter()
+            await crud.item.search_ids(db, q, limit=n)
+            ilike.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await service.search(db, q)
+            fts.append(time.perf_counter() - start)
+    await engine.dispose()
+
+    summarize("ILIKE", ilike)
+    summarize("FTS", fts)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    for n in args.items:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = str(Path(tmp) / "search.db")
+            populate(path, n)
+            print(f"{n} items, {args.queries} queries")
+            asyncio.run(bench(path, n, args.queries))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Serialization cost of one recommendation response (default 100 items).
+
+Compares the old per-item path (from_orm -> dict -> add score, then
+response_model validation, jsonable_encoder and stdlib json) with the
+prevalidated orjson path, for a cache miss and a cache hit, and reports
+what gzip costs and saves on the body.
+
+Usage: python scripts/bench_serialization.py [--items 100] [--repeat 2000]
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_response_field
+
+from app.core.responses import FastJSONResponse, RawJSONResponse, dumps
+from app.db.models import DifficultyLevel, Item, ItemType
+from app.schemas.item import ItemWithSimilarity
+
+RESPONSE_FIELD = create_response_field(name="response", type_=List[ItemWithSimilarity])
+
+def make_rows(n: int) -> List[dict]:
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            "title": f"Full body strength session {i}",
+            "type": ItemType.WORKOUT,
+            "description": "Compound lifts with a mobility warm-up and a short finisher. " * 3,
+            "tags": ["strength", "full-body", f"tag{i % 17}", f"tag{i % 5}"],
+            "duration": 20 + i % 40,
+            "difficulty": DifficultyLevel.INTERMEDIATE,
+            "media_url": f"https://cdn.example.com/media/{i}.mp4",
+            "id": i,
+            "created_at": start + timedelta(minutes=i),
+        }
+        for i in range(n)
+    ]
+
+def validate_and_encode(content) -> bytes:
+    """What FastAPI does with a plain return value and a response_model"""
+    value, errors = RESPONSE_FIELD.validate(content, {}, loc=("response",))
+    assert not errors
+    return JSONResponse(jsonable_encoder(value)).body
+
+def old_miss(rows, scores) -> bytes:
+    items = []
+    for row, score in zip(rows, scores):
+        item = ItemWithSimilarity.from_orm(Item(**row)).dict()
+        item["similarity_score"] = score
+        items.append(item)
+    # The response cache stored the jsonable_encoder'd value as JSON text
+    json.dumps(jsonable_encoder(items))
+    return validate_and_encode(items)
+
+def old_hit(cached: str) -> bytes:
+    return validate_and_encode(json.loads(cached))
+
+def new_miss(rows, scores) -> bytes:
+    items = [{**row, "similarity_score": score} for row, score in zip(rows, scores)]
+    return FastJSONResponse(items).body
+
+def new_hit(cached: bytes) -> bytes:
+    return RawJSONResponse(cached).body
+
+def timeit(fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rows = make_rows(args.items)
+    scores = [1.0 / (i + 1) for i in range(args.items)]
+    old_cached = json.dumps(jsonable_encoder([{**r, "similarity_score": s} for r, s in zip(rows, scores)]))
+    new_cached = dumps([{**r, "similarity_score": s} for r, s in zip(rows, scores)])
+    assert json.loads(old_miss(rows, scores)) == json.loads(new_miss(rows, scores))
+
+    cases = [
+        ("cache miss", lambda: old_miss(rows, scores), lambda: new_miss(rows, scores)),
+        ("cache hit", lambda: old_hit(old_cached), lambda: new_hit(new_cached)),
+    ]
+    print(f"Serialization per {args.items}-item response:")
+    for label, old, new in cases:
+        before, after = timeit(old, args.repeat), timeit(new, args.repeat)
+        print(f"  {label:<11} {before:9.1f} us -> {after:7.1f} us  ({before / after:.0f}x)")
+
+    print(f"Body: {len(new_cached)} bytes")
+    for level in (1, 5, 9):
+        compressed = gzip.compress(new_cached, compresslevel=level)
+        cost = timeit(lambda: gzip.compress(new_cached, compresslevel=level), args.repeat // 4)
+        print(f"  gzip level {level}: {len(compressed)} bytes "
+              f"({len(compressed) / len(new_cached):.0%}), {cost:.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Export new interactions to Arrow IPC files under INTERACTION_EXPORT_DIR.
+
+Incremental by id high-water mark; safe to run from cron.
+
+Usage: python scripts/export_interactions.py [--export-dir DIR]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.interaction_export import InteractionExporter
+
+async def export(export_dir: str) -> None:
+    exporter = InteractionExporter(
+        export_dir,
+        batch_rows=settings.INTERACTION_EXPORT_BATCH_ROWS,
+        lag_seconds=settings.INTERACTION_EXPORT_LAG_SECONDS
+    )
+    async with AsyncSessionLocal() as db:
+        exported = await exporter.export(db)
+    manifest = exporter.read_manifest()
+    print(f"Exported {exported} interactions; high-water mark {manifest['high_water_mark']}, "
+          f"{manifest['rows']} rows in {len(exporter.files())} files")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--export-dir", default=settings.INTERACTION_EXPORT_DIR)
+    args = parser.parse_args()
+    asyncio.run(export(args.export_dir))
@@ -0,0 +1,476 @@
+"""Generate deterministic synthetic users, items and interactions at scale.
+
+Item popularity follows a Zipf law over a seeded random ranking of items,
+and user activity is log-normal. Each user's interactions are grouped into
+sessions of geometric length. A session starts with a view, stays close in
+time, and mostly browses the user's taste cluster. Likes and completes refer
+back to the item viewed just before them.
+
+Users are split into fixed blocks, each with its own random stream derived
+from --seed, so the output depends only on the seed, the sizes and --end,
+never on --workers or --chunk-rows. Blocks are grouped into chunks that run
+in parallel processes and are written either as Arrow IPC files in the interaction export layout
+(`<out-dir>/interactions`, readable by InteractionExporter.load_columns and
+POST /interactions/retrain?source=export once INTERACTION_EXPORT_DIR points
+there) or straight into the database (COPY on Postgres). Users and items
+go to `users.arrow` / `items.arrow`, or to their tables.
+
+Usage: python scripts/generate_synthetic_data.py --users 2000000 --items 200000 \\
+           --interactions 300000000 --out-dir ../data/synthetic --workers 8
+       python scripts/generate_synthetic_data.py --format db --users 10000 --items 2000 \\
+           --interactions 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+import numpy as np
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.db.fts import install_fts
+from app.db.models import DifficultyLevel, Interaction, InteractionType, Item, ItemType, User, UserRole
+from app.db.session import get_async_url
+from app.services.interaction_export import INTERACTION_TYPES, TYPE_CODES, InteractionExporter
+
+# Independent random streams, combined with --seed
+ITEM_STREAM, USER_STREAM, INTERACTION_STREAM = 1, 2, 3
+
+ITEM_TYPES = list(ItemType)
+DIFFICULTIES = list(DifficultyLevel)
+TAGS = [
+    "yoga", "strength", "cardio", "hiit", "mobility", "running", "cycling", "pilates",
+    "core", "stretching", "nutrition", "sleep", "recovery", "mindfulness", "boxing",
+    "kettlebell", "swimming", "rowing", "walking", "dance", "balance", "posture",
+]
+ADJECTIVES = ["Quick", "Gentle", "Intense", "Daily", "Complete", "Morning", "Evening", "Essential"]
+NOUNS = {
+    ItemType.ARTICLE: "guide",
+    ItemType.WORKOUT: "workout",
+    ItemType.VIDEO: "session",
+}
+# Shared by every generated user: hashing millions of passwords would dominate the run
+PASSWORD = "synthetic"
+# Rows per INSERT on databases without COPY
+INSERT_BATCH_ROWS = 10000
+# Upper bounds on a block, the unit of generation; fixed so chunking never changes the data
+BLOCK_USERS = 1000
+BLOCK_ROWS = 100000
+# End of the history window unless --end is given
+DEFAULT_END = "2026-01-01"
+
+class Spec(NamedTuple):
+    seed: int
+    users: int
+    items: int
+    interactions: int
+    zipf: float
+    activity_sigma: float
+    clusters: int
+    affinity: float
+    session_length: float
+    gap_seconds: float
+    type_probs: Tuple[float, ...]
+    days: int
+    end: str
+
+class Block(NamedTuple):
+    index: int
+    first_user: int
+    end_user: int
+    first_id: int
+    rows: int
+
+def plan_blocks(spec: Spec) -> List[Block]:
+    """Split users and the interaction total evenly into blocks; depends on sizes only"""
+    n_blocks = min(
+        max(-(-spec.users // BLOCK_USERS), -(-spec.interactions // BLOCK_ROWS)),
+        spec.users
+    )
+    user_bounds = np.linspace(0, spec.users, n_blocks + 1).astype(np.int64) + 1
+    row_bounds = np.linspace(0, spec.interactions, n_blocks + 1).astype(np.int64)
+    return [
+        Block(
+            i,
+            int(user_bounds[i]),
+            int(user_bounds[i + 1]),
+            int(row_bounds[i]) + 1,
+            int(row_bounds[i + 1] - row_bounds[i])
+        )
+        for i in range(n_blocks)
+    ]
+
+def plan_chunks(blocks: List[Block], chunk_rows: int) -> List[List[Block]]:
+    """Group consecutive blocks into chunks of about chunk_rows interactions"""
+    chunks, current, rows = [], [], 0
+    for block in blocks:
+        current.append(block)
+        rows += block.rows
+        if rows >= chunk_rows:
+            chunks.append(current)
+            current, rows = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+def sample(cdf: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Inverse-CDF sampling: positions for uniform draws u"""
+    return np.minimum(np.searchsorted(cdf, u, side="right"), len(cdf) - 1)
+
+class ItemModel(NamedTuple):
+    cdf: np.ndarray
+    clusters: np.ndarray
+    cluster_items: List[np.ndarray]
+    cluster_cdfs: List[np.ndarray]
+
+@lru_cache(maxsize=1)
+def item_model(spec: Spec) -> ItemModel:
+    """Zipf popularity over a random item ranking, and taste clusters; rebuilt per process"""
+    rng = np.random.default_rng([spec.seed, ITEM_STREAM])
+    ranks = rng.permutation(spec.items) + 1
+    weights = ranks.astype(np.float64) ** -spec.zipf
+    clusters = rng.integers(spec.clusters, size=spec.items)
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+
+    order = np.argsort(clusters, kind="stable")
+    bounds = np.searchsorted(clusters[order], np.arange(spec.clusters + 1))
+    cluster_items, cluster_cdfs = [], []
+    for c in range(spec.clusters):
+        members = order[bounds[c]:bounds[c + 1]]
+        member_cdf = np.cumsum(weights[members])
+        cluster_items.append(members + 1)
+        cluster_cdfs.append(member_cdf / member_cdf[-1] if len(members) else member_cdf)
+    return ItemModel(cdf, clusters, cluster_items, cluster_cdfs)
+
+def generate_block(spec: Spec, block: Block) -> Dict[str, np.ndarray]:
+    """Interaction columns for one block of users, ids ascending from block.first_id"""
+    rng = np.random.default_rng([spec.seed, INTERACTION_STREAM, block.index])
+    model = item_model(spec)
+    rows = block.rows
+    n_users = block.end_user - block.first_user
+
+    activity = rng.lognormal(0.0, spec.activity_sigma, n_users)
+    counts = rng.multinomial(rows, activity / activity.sum())
+    user_ids = np.repeat(np.arange(block.first_user, block.end_user, dtype=np.int64), counts)
+    # A user's taste is the cluster of an item drawn by popularity, so no taste is empty
+    taste = model.clusters[sample(model.cdf, rng.random(n_users))]
+    event_taste = np.repeat(taste, counts)
+
+    # Sessions: geometric lengths, and every user starts a new one
+    new_session = rng.random(rows) < 1.0 / spec.session_length
+    new_session[np.cumsum(counts)[:-1][counts[1:] > 0]] = True
+    if rows:
+        new_session[0] = True
+    session = np.cumsum(new_session) - 1
+    session_first = np.flatnonzero(new_session)
+    n_sessions = len(session_first)
+
+    window_us = spec.days * 86400 * 10**6
+    end = np.datetime64(spec.end, "us")
+    session_start = end - rng.integers(window_us, size=n_sessions).astype("timedelta64[us]")
+    gaps = rng.exponential(spec.gap_seconds * 1e6, rows)
+    gaps[new_session] = 0.0
+    elapsed = np.cumsum(gaps)
+    elapsed -= elapsed[session_first][session]
+    created_at = session_start[session] + elapsed.astype("timedelta64[us]")
+
+    codes = rng.choice(len(INTERACTION_TYPES), size=rows, p=spec.type_probs).astype(np.int8)
+    codes[new_session] = TYPE_CODES[InteractionType.VIEW]
+    views = codes == TYPE_CODES[InteractionType.VIEW]
+
+    # Views draw from the taste cluster or, off-taste, from global popularity
+    item_ids = np.zeros(rows, dtype=np.int64)
+    in_taste = (rng.random(n_sessions) < spec.affinity)[session]
+    browse = np.flatnonzero(views & ~in_taste)
+    item_ids[browse] = sample(model.cdf, rng.random(len(browse))) + 1
+    focused = np.flatnonzero(views & in_taste)
+    focused = focused[np.argsort(event_taste[focused], kind="stable")]
+    bounds = np.searchsorted(event_taste[focused], np.arange(spec.clusters + 1))
+    for c in range(spec.clusters):
+        positions = focused[bounds[c]:bounds[c + 1]]
+        if len(positions):
+            picks = sample(model.cluster_cdfs[c], rng.random(len(positions)))
+            item_ids[positions] = model.cluster_items[c][picks]
+
+    # Likes and completes act on the session's last viewed item
+    last_view = np.where(views, np.arange(rows), 0)
+    np.maximum.accumulate(last_view, out=last_view)
+    item_ids = item_ids[last_view]
+
+    return {
+        "ids": np.arange(block.first_id, block.first_id + rows, dtype=np.int64),
+        "user_ids": user_ids,
+        "item_ids": item_ids,
+        "codes": codes,
+        "created_at": created_at,
+    }
+
+def generate_items(spec: Spec) -> List[dict]:
+    rng = np.random.default_rng([spec.seed, ITEM_STREAM, 1])
+    types = rng.integers(len(ITEM_TYPES), size=spec.items)
+    difficulties = rng.integers(len(DIFFICULTIES), size=spec.items)
+    durations = rng.integers(5, 91, size=spec.items)
+    n_tags = rng.integers(1, 5, size=spec.items)
+    tag_picks = rng.integers(len(TAGS), size=(spec.items, 4))
+    adjectives = rng.integers(len(ADJECTIVES), size=spec.items)
+    created_at = (
+        np.datetime64(spec.end, "us")
+        - np.timedelta64(spec.days, "D")
+        - rng.integers(365 * 86400 * 10**6, size=spec.items).astype("timedelta64[us]")
+    ).tolist()
+
+    items = []
+    for i in range(spec.items):
+        item_type = ITEM_TYPES[types[i]]
+        tags = list(dict.fromkeys(TAGS[t] for t in tag_picks[i, :n_tags[i]]))
+        title = f"{ADJECTIVES[adjectives[i]]} {tags[0]} {NOUNS[item_type]} {i + 1}"
+        items.append({
+            "id": i + 1,
+            "title": title,
+            "type": item_type,
+            "description": f"{title}: {', '.join(tags)} for {DIFFICULTIES[difficulties[i]].value} level.",
+            "tags": tags,
+            "duration": int(durations[i]),
+            "difficulty": DIFFICULTIES[difficulties[i]],
+            "media_url": None,
+            "created_at": created_at[i],
+        })
+    return items
+
+def generate_users(spec: Spec, hashed_password: str) -> Iterable[List[dict]]:
+    """Users in batches of INSERT_BATCH_ROWS"""
+    rng = np.random.default_rng([spec.seed, USER_STREAM])
+    signup = (
+        np.datetime64(spec.end, "us")
+        - rng.integers(spec.days * 86400 * 10**6, 2 * spec.days * 86400 * 10**6, size=spec.users)
+        .astype("timedelta64[us]")
+    )
+    for start in range(0, spec.users, INSERT_BATCH_ROWS):
+        created_at = signup[start:start + INSERT_BATCH_ROWS].tolist()
+        yield [
+            {
+                "id": user_id,
+                "email": f"user{user_id}@synthetic.example.com",
+                "username": f"user{user_id}",
+                "hashed_password": hashed_password,
+                "role": UserRole.USER,
+                "created_at": created_at[pos],
+            }
+            for pos, user_id in enumerate(range(start + 1, min(start + INSERT_BATCH_ROWS, spec.users) + 1))
+        ]
+
+def _copy_value(value):
+    """COPY takes enum columns by member name (as SQLAlchemy stores them) and JSON as text"""
+    if isinstance(value, (ItemType, DifficultyLevel, InteractionType, UserRole)):
+        return value.name
+    if isinstance(value, list):
+        return json.dumps(value)
+    return value
+
+async def bulk_write(conn, table, rows: Sequence[dict]) -> None:
+    """COPY on asyncpg, batched executemany INSERT elsewhere"""
+    if not rows:
+        return
+    if conn.dialect.driver == "asyncpg":
+        columns = list(rows[0])
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            table.name,
+            records=[tuple(_copy_value(row[column]) for column in columns) for row in rows],
+            columns=columns
+        )
+    else:
+        for start in range(0, len(rows), INSERT_BATCH_ROWS):
+            await conn.execute(insert(table), rows[start:start + INSERT_BATCH_ROWS])
+
+def interaction_rows(columns: Dict[str, np.ndarray]) -> List[dict]:
+    types = np.array(INTERACTION_TYPES, dtype=object)[columns["codes"]]
+    return [
+        {"id": i, "user_id": u, "item_id": t, "interaction_type": k, "created_at": c}
+        for i, u, t, k, c in zip(
+            columns["ids"].tolist(),
+            columns["user_ids"].tolist(),
+            columns["item_ids"].tolist(),
+            types.tolist(),
+            columns["created_at"].tolist()
+        )
+    ]
+
+async def write_chunk_db(url: str, columns: Dict[str, np.ndarray]) -> None:
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await bulk_write(conn, Interaction.__table__, interaction_rows(columns))
+    finally:
+        await engine.dispose()
+
+def run_chunk(spec: Spec, chunk: List[Block], out_dir: Optional[str], url: Optional[str]) -> int:
+    """Generate and write one chunk of blocks; runs in a worker process"""
+    blocks = [generate_block(spec, block) for block in chunk]
+    columns = {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+    if out_dir is not None:
+        InteractionExporter(out_dir).write_columns(**columns)
+    else:
+        asyncio.run(write_chunk_db(url, columns))
+    return len(columns["ids"])
+
+def generate_interactions(
+    spec: Spec,
+    chunk_rows: int,
+    workers: int,
+    out_dir: Optional[str] = None,
+    url: Optional[str] = None
+) -> int:
+    """Generate every interaction into the export layout at out_dir, or the database at url"""
+    chunks = plan_chunks(plan_blocks(spec), chunk_rows)
+    start = time.perf_counter()
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_chunk, spec, chunk, out_dir, url) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), 1):
+            written += future.result()
+            elapsed = time.perf_counter() - start
+            print(f"  chunk {done}/{len(chunks)}: {written} interactions, {written / elapsed:,.0f}/s")
+    if out_dir is not None:
+        InteractionExporter(out_dir).write_manifest({
+            "high_water_mark": spec.interactions,
+            "rows": written,
+            "updated_at": datetime.utcnow().isoformat(),
+            "synthetic": spec._asdict(),
+        })
+    return written
+
+def write_arrow_batches(path: Path, batches: Iterable[List[dict]]) -> None:
+    """Write row batches to one Arrow IPC file, enums as their values"""
+    import pyarrow as pa
+
+    writer = None
+    with pa.OSFile(str(path), "wb") as sink:
+        for rows in batches:
+            batch = pa.RecordBatch.from_pylist([
+                {key: value.value if isinstance(value, Enum) else value for key, value in row.items()}
+                for row in rows
+            ])
+            if writer is None:
+                writer = pa.ipc.new_file(sink, batch.schema)
+            writer.write_batch(batch)
+        if writer is not None:
+            writer.close()
+
+async def write_entities_db(url: str, spec: Spec, hashed_password: str) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(install_fts)
+        await bulk_write(conn, Item.__table__, generate_items(spec))
+        for batch in generate_users(spec, hashed_password):
+            await bulk_write(conn, User.__table__, batch)
+    await engine.dispose()
+
+async def reset_sequences(url: str) -> None:
+    """Explicit ids bypass Postgres sequences; move them past the generated rows"""
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            for table in ("users", "items", "interactions"):
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT coalesce(max(id), 1) FROM {table}))"
+                ))
+    await engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=100000)
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--interactions", type=int, default=5000000)
+    parser.add_argument("--format", choices=["arrow", "db"], default="arrow")
+    parser.add_argument("--out-dir", help="Output directory for --format arrow")
+    parser.add_argument("--url", help="Database URL for --format db (default: DATABASE_URL)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-rows", type=int, default=2000000,
+                        help="Interactions per chunk; bounds each worker's memory (~100 bytes/row)")
+    parser.add_argument("--zipf", type=float, default=1.0, help="Item popularity exponent")
+    parser.add_argument("--activity-sigma", type=float, default=1.2,
+                        help="Log-normal sigma of per-user activity")
+    parser.add_argument("--clusters", type=int, default=50, help="Item taste clusters")
+    parser.add_argument("--affinity", type=float, default=0.7,
+                        help="Share of sessions spent in the user's taste cluster")
+    parser.add_argument("--session-length", type=float, default=8.0, help="Mean events per session")
+    parser.add_argument("--gap-seconds", type=float, default=90.0, help="Mean time between session events")
+    parser.add_argument("--type-probs", type=float, nargs=3, default=[0.75, 0.15, 0.10],
+                        metavar=("VIEW", "LIKE", "COMPLETE"),
+                        help="Interaction type mix after each session's first view")
+    parser.add_argument("--days", type=int, default=90, help="Days of history before --end")
+    parser.add_argument("--end", default=DEFAULT_END,
+                        help=f"End of the history window (default: {DEFAULT_END}); part of the seed")
+    args = parser.parse_args()
+
+    if args.format == "arrow" and not args.out_dir:
+        parser.error("--out-dir is required with --format arrow")
+    if min(args.users, args.items, args.interactions) < 1:
+        parser.error("--users, --items and --interactions must be positive")
+    total = sum(args.type_probs)
+    spec = Spec(
+        seed=args.seed,
+        users=args.users,
+        items=args.items,
+        interactions=args.interactions,
+        zipf=args.zipf,
+        activity_sigma=args.activity_sigma,
+        clusters=args.clusters,
+        affinity=args.affinity,
+        session_length=args.session_length,
+        gap_seconds=args.gap_seconds,
+        type_probs=tuple(p / total for p in args.type_probs),
+        days=args.days,
+        end=args.end
+    )
+    hashed_password = get_password_hash(PASSWORD)
+    start = time.perf_counter()
+
+    interactions_dir = url = None
+    workers = args.workers
+    if args.format == "arrow":
+        out_dir = Path(args.out_dir)
+        exporter = InteractionExporter(str(out_dir / "interactions"))
+        if exporter.files():
+            sys.exit(f"{exporter.export_dir} already holds interaction files; use an empty directory")
+        exporter.export_dir.mkdir(parents=True, exist_ok=True)
+        write_arrow_batches(out_dir / "items.arrow", [generate_items(spec)])
+        write_arrow_batches(out_dir / "users.arrow", generate_users(spec, hashed_password))
+        interactions_dir = str(exporter.export_dir)
+    else:
+        async_url = get_async_url(args.url or settings.DATABASE_URL)
+        url = async_url.render_as_string(hide_password=False)
+        if async_url.get_backend_name() != "postgresql":
+            # SQLite takes one writer at a time
+            workers = 1
+        asyncio.run(write_entities_db(url, spec, hashed_password))
+    print(f"{spec.users} users and {spec.items} items written in {time.perf_counter() - start:.1f}s")
+
+    generate_interactions(spec, args.chunk_rows, workers, out_dir=interactions_dir, url=url)
+    if args.format == "db":
+        asyncio.run(reset_sequences(url))
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Report memory of a pre-fork server: shared vs private pages per process.
+
+RSS counts shared pages once per process and so overstates multi-worker
+memory; PSS splits each shared page between the processes mapping it, and
+summed over the process tree gives real host usage. The marginal PSS of one
+more worker is what has to fit when scaling WEB_CONCURRENCY.
+
+Usage: python scripts/memory_report.py --pid <gunicorn master pid>
+       python scripts/memory_report.py --spawn 1 2 4  # start gunicorn at each worker count
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+FIELDS = ["Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"]
+
+def smaps_rollup(pid: int) -> Dict[str, int]:
+    """Memory fields of one process in KiB (Linux 4.14+)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in FIELDS:
+                values[key] = int(rest.split()[0])
+    return values
+
+def children(pid: int) -> List[int]:
+    pids = []
+    for task in Path(f"/proc/{pid}/task").iterdir():
+        pids += [int(child) for child in (task / "children").read_text().split()]
+    return pids
+
+def report(master: int) -> int:
+    """Print per-process memory for a master and its workers; returns total PSS in KiB"""
+    pids = [master] + children(master)
+    print(f"  {'pid':>8} {'role':<7} {'rss MiB':>9} {'pss MiB':>9} {'shared MiB':>11} {'private MiB':>12}")
+    total = 0
+    for pid in pids:
+        m = smaps_rollup(pid)
+        shared = m["Shared_Clean"] + m["Shared_Dirty"]
+        private = m["Private_Clean"] + m["Private_Dirty"]
+        total += m["Pss"]
+        role = "master" if pid == master else "worker"
+        print(
+            f"  {pid:>8} {role:<7} {m['Rss'] / 1024:>9.1f} {m['Pss'] / 1024:>9.1f} "
+            f"{shared / 1024:>11.1f} {private / 1024:>12.1f}"
+        )
+    print(f"  total PSS {total / 1024:.1f} MiB over {len(pids)} processes")
+    return total
+
+def spawn(workers: int, settle: float) -> int:
+    """Start gunicorn with the given worker count, report once it settles, stop it"""
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers))
+    server = subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=root_dir,
+        env=env
+    )
+    try:
+        deadline = time.monotonic() + settle
+        while time.monotonic() < deadline and len(children(server.pid)) < workers:
+            time.sleep(0.5)
+        # Let worker startup (warmup, first allocations) finish before measuring
+        time.sleep(settle)
+        print(f"{workers} worker(s):")
+        return report(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pid", type=int, help="Master process to inspect")
+    parser.add_argument("--spawn", type=int, nargs="+", metavar="WORKERS", help="Worker counts to start and measure")
+    parser.add_argument("--settle", type=float, default=30.0, help="Seconds to wait for workers to warm up")
+    args = parser.parse_args()
+
+    if args.pid:
+        report(args.pid)
+    if args.spawn:
+        totals = {workers: spawn(workers, args.settle) for workers in sorted(set(args.spawn))}
+        counts = sorted(totals)
+        for low, high in zip(counts, counts[1:]):
+            marginal = (totals[high] - totals[low]) / (high - low)
+            print(f"marginal PSS per worker ({low} -> {high}): {marginal / 1024:.1f} MiB")
+    if not args.pid and not args.spawn:
+        parser.error("give --pid or --spawn")
+
+if __name__ == "__main__":
+    main()
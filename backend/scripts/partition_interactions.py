@@ -0,0 +1,127 @@
+"""Optional monthly range partitioning of the interactions table (Postgres only).
+
+--convert turns the existing table into a partitioned one in a single
+transaction, without copying rows: the old table is renamed to
+interactions_unpartitioned and attached as the partition for everything
+before the first monthly partition. Monthly partitions are then created
+`--months-ahead` months ahead, plus a DEFAULT partition as a safety net.
+Re-run from cron (without --convert) to keep creating partitions ahead of
+time so the DEFAULT partition stays empty.
+
+Partitioning keys on created_at, so the primary key becomes (id, created_at);
+ids still come from the same sequence. Existing indexes, including the
+composite ones, are recreated on the parent and cascade to every partition.
+
+Usage: python scripts/partition_interactions.py --convert [--months-ahead 3]
+       python scripts/partition_interactions.py [--months-ahead 3]
+"""
+import argparse
+import re
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+
+TABLE = "interactions"
+LEGACY = "interactions_unpartitioned"
+
+def add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+def is_partitioned(conn) -> bool:
+    return conn.scalar(text("SELECT relkind FROM pg_class WHERE relname = :name"), {"name": TABLE}) == "p"
+
+def convert(conn) -> None:
+    """Swap the plain table for a partitioned one, keeping its rows as the first partition"""
+    conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+    index_defs = conn.execute(text(
+        "SELECT indexname, indexdef FROM pg_indexes "
+        "WHERE tablename = :name AND indexname <> :pkey"
+    ), {"name": TABLE, "pkey": f"{TABLE}_pkey"}).all()
+    latest = conn.scalar(text(f"SELECT max(created_at) FROM {TABLE}")) or datetime.utcnow()
+    boundary = add_months(max(latest, datetime.utcnow()).date().replace(day=1), 1)
+
+    # Free the names for the parent; the renamed indexes are adopted by the
+    # parent's indexes on attach, so nothing is rebuilt
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {LEGACY}"))
+    conn.execute(text(f"ALTER INDEX {TABLE}_pkey RENAME TO {LEGACY}_pkey"))
+    for name, _ in index_defs:
+        conn.execute(text(f"ALTER INDEX {name} RENAME TO {name}_unpartitioned"))
+
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} (LIKE {LEGACY} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)"
+    ))
+    conn.execute(text(f"ALTER TABLE {TABLE} ALTER COLUMN created_at SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)"))
+    conn.execute(text(f"ALTER TABLE {TABLE} ADD FOREIGN KEY (user_id) REFERENCES users (id)"))
+    conn.execute(text(f"ALTER TABLE {TABLE} ADD FOREIGN KEY (item_id) REFERENCES items (id)"))
+    conn.execute(text(f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id"))
+    for _, index_def in index_defs:
+        conn.execute(text(index_def))
+
+    # A validated CHECK matching the bound lets ATTACH skip its own full scan
+    conn.execute(text(f"ALTER TABLE {LEGACY} ALTER COLUMN created_at SET NOT NULL"))
+    conn.execute(text(
+        f"ALTER TABLE {LEGACY} ADD CONSTRAINT {LEGACY}_bound "
+        f"CHECK (created_at < '{boundary.isoformat()}') NOT VALID"
+    ))
+    conn.execute(text(f"ALTER TABLE {LEGACY} VALIDATE CONSTRAINT {LEGACY}_bound"))
+    conn.execute(text(
+        f"ALTER TABLE {TABLE} ATTACH PARTITION {LEGACY} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+    ))
+    print(f"Converted {TABLE}; existing rows form partition {LEGACY} (before {boundary})")
+
+def ensure_partitions(conn, months_ahead: int) -> None:
+    """Create monthly partitions through `months_ahead` months from now, and the DEFAULT one"""
+    bounds = conn.execute(text(
+        "SELECT pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = CAST(:name AS regclass)"
+    ), {"name": TABLE}).scalars()
+    upper_bounds = [
+        date.fromisoformat(match.group(1)[:10])
+        for bound in bounds
+        for match in [re.search(r"TO \('([^']+)'\)", bound)]
+        if match
+    ]
+    month = max(upper_bounds + [date.today().replace(day=1)])
+    last = add_months(date.today().replace(day=1), months_ahead)
+    while month <= last:
+        end = add_months(month, 1)
+        name = f"{TABLE}_y{month.year}m{month.month:02d}"
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+        print(f"Partition {name}: {month} to {end}")
+        month = end
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {TABLE}_default PARTITION OF {TABLE} DEFAULT"))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--convert", action="store_true", help="Partition the existing table")
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if engine.dialect.name != "postgresql":
+        sys.exit("Interaction partitioning requires Postgres")
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            if not args.convert:
+                sys.exit(f"{TABLE} is not partitioned; run with --convert first")
+            convert(conn)
+        ensure_partitions(conn, args.months_ahead)
+    engine.dispose()
+
+if __name__ == "__main__":
+    main()
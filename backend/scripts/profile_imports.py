@@ -0,0 +1,95 @@
+"""Profile the import time of app.main and enforce a startup budget.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters,
+keeps the fastest run, and prints the slowest modules by cumulative and
+self time. Exits non-zero when the import takes longer than --budget-ms or
+pulls in one of the heavy modules that must only load lazily, so it can
+gate CI.
+
+Usage: python scripts/profile_imports.py [--budget-ms 1000] [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+root_dir = Path(__file__).resolve().parent.parent
+
+# Must be imported on first use or by warmup, never by `import app.main`
+LAZY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "faiss",
+    "implicit",
+    "scipy",
+    "pandas",
+    "pyarrow",
+    "langchain",
+    "openai",
+]
+
+Entry = Tuple[int, int, int, str]  # self us, cumulative us, depth, module
+
+def run_once(module: str) -> List[Entry]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root_dir,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((int(self_us), int(cumulative_us), depth, name.strip()))
+    return entries
+
+def total_us(entries: List[Entry]) -> int:
+    return sum(cumulative for _, cumulative, depth, _ in entries if depth == 0)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    entries = min((run_once(args.module) for _ in range(args.runs)), key=total_us)
+    total_ms = total_us(entries) / 1000
+
+    print(f"Slowest modules by cumulative time (ms), best of {args.runs}:")
+    # Top-level imports and their direct children: where the time actually goes
+    shallow = [entry for entry in entries if entry[2] <= 1]
+    for _, cumulative_us, _, name in sorted(shallow, key=lambda e: -e[1])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f}  {name}")
+    print("Slowest modules by self time (ms):")
+    for self_us, _, _, name in sorted(entries, key=lambda e: -e[0])[:10]:
+        print(f"  {self_us / 1000:8.1f}  {name}")
+
+    imported: Dict[str, bool] = {name: False for name in LAZY_MODULES}
+    for _, _, _, name in entries:
+        top = name.split(".")[0]
+        if top in imported:
+            imported[top] = True
+    eager = [name for name, seen in imported.items() if seen]
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print("FAIL: over budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
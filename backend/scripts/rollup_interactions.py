@@ -0,0 +1,42 @@
+"""Compact raw VIEW interactions older than the retention window into daily counts.
+
+Views are the bulk of the interactions table but only matter to training as
+per-day counts; likes and completions are kept raw. Training reads both the
+raw table and interaction_daily_counts, so results are unchanged.
+
+If the Arrow export is in use, rows it has not exported yet are never
+compacted, so run this after export_interactions.py. Safe to run from cron.
+
+Usage: python scripts/rollup_interactions.py [--retention-days N] [--export-dir DIR]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to PYTHONPATH
+root_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(root_dir))
+
+from app import crud
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.interaction_export import InteractionExporter
+
+async def rollup(retention_days: int, export_dir: str) -> None:
+    before = datetime.utcnow() - timedelta(days=retention_days)
+    max_id = None
+    exporter = InteractionExporter(export_dir)
+    if exporter.manifest_path.exists():
+        max_id = exporter.read_manifest()["high_water_mark"]
+    async with AsyncSessionLocal() as db:
+        compacted = await crud.interaction.rollup_views(db, before, max_id=max_id)
+    print(f"Compacted {compacted} VIEW interactions created before {before:%Y-%m-%d}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--retention-days", type=int, default=settings.INTERACTION_VIEW_RETENTION_DAYS)
+    parser.add_argument("--export-dir", default=settings.INTERACTION_EXPORT_DIR)
+    args = parser.parse_args()
+    asyncio.run(rollup(args.retention_days, args.export_dir))